@@ -7,9 +7,11 @@ from models.user import UserCreate, UserDB
 from core.config import settings
 from services.auth import (
     authenticate_user,
+    build_token_claims,
     create_access_token,
     get_password_hash,
     get_current_active_user,
+    get_user,
 )
 from services.database import get_user_collection
 
@@ -18,7 +20,7 @@ router = APIRouter()
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,7 +30,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
+        data=build_token_claims(user), expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -39,14 +41,14 @@ async def register_user(user_data: UserCreate):
     user_collection = get_user_collection()
     
     # Check if user already exists
-    if user_collection.find_one({"email": user_data.email}):
+    if await user_collection.find_one({"email": user_data.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     user_db = UserDB(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -55,12 +57,14 @@ async def register_user(user_data: UserCreate):
         role="clinician",
     )
     
-    user_collection.insert_one(user_db.dict())
+    user_dict = user_db.dict()
+    result = await user_collection.insert_one(user_dict)
+    user_dict["_id"] = result.inserted_id
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user_db.email}, expires_delta=access_token_expires
+        data=build_token_claims(user_dict), expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -68,4 +72,7 @@ async def register_user(user_data: UserCreate):
 
 @router.get("/me")
 async def read_users_me(current_user = Depends(get_current_active_user)):
+    if "full_name" not in current_user:
+        # Claims-only user from the token; read the full profile
+        return await get_user(current_user["email"])
     return current_user 
\ No newline at end of file
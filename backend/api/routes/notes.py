@@ -1,10 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import List, Optional
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 from models.user import User
-from models.note import ClinicalNote, GenerateNoteRequest, NoteResponse
-from services.auth import get_current_active_user
-from services.notes import generate_soap_note, get_notes, get_note_by_id, save_note
+from models.note import ClinicalNote, GenerateNoteRequest, NoteResponse, NoteSummary
+from services.auth import get_current_active_user, get_current_admin_user
+from nlp.batching import BatchQueueFull
+from nlp.executor import NlpTaskTimeout
+from services.notes import (
+    generate_soap_note,
+    get_notes,
+    get_note_summaries,
+    get_note_by_id,
+    save_note,
+    stream_soap_note,
+)
+from services.pagination import NEXT_CURSOR_HEADER
+from services.soap_cache import soap_cache
 
 router = APIRouter()
 
@@ -18,38 +32,156 @@ async def generate_note(
     Generate a SOAP note using the NLP model based on transcription
     """
     try:
-        note = generate_soap_note(
+        note = await generate_soap_note(
             transcription_id=request.transcription_id,
             user_id=current_user.id,
             patient_id=request.patient_id,
-            specialty=request.specialty
+            specialty=request.specialty,
+            force_regenerate=request.force_regenerate
         )
         return note
+    except BatchQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except NlpTaskTimeout as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate note: {str(e)}"
+        )
+
+
+def _sse_event(event: str, data: Any) -> str:
+    payload = data.json(by_alias=True) if isinstance(data, BaseModel) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _sse_stream(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield _sse_event(event, data)
+    except NlpTaskTimeout as e:
+        yield _sse_event("error", {"status": status.HTTP_504_GATEWAY_TIMEOUT, "detail": str(e)})
+    except Exception as e:
+        yield _sse_event("error", {
+            "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "detail": f"Failed to generate note: {str(e)}"
+        })
+
+
+@router.post("/generate/stream")
+async def generate_note_stream(
+    request: GenerateNoteRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Generate a SOAP note, streaming progress as Server-Sent Events
+    
+    Events are `status`, `token` (seq2seq output as it is generated),
+    `section` (each SOAP section as soon as it is final) and finally
+    `note` with the saved note, or `error` if generation failed.
+    """
+    try:
+        events = await stream_soap_note(
+            transcription_id=request.transcription_id,
+            user_id=current_user.id,
+            patient_id=request.patient_id,
+            specialty=request.specialty,
+            force_regenerate=request.force_regenerate
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate note: {str(e)}"
         )
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        # Proxies such as nginx would otherwise hold events back in their buffers
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/", response_model=List[NoteResponse])
 async def list_notes(
+    response: Response,
     patient_id: Optional[str] = None,
     limit: int = 10,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    List clinical notes, optionally filtered by patient
+    List clinical notes, optionally filtered by patient.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    pass it back as `cursor` instead of increasing `offset`.
     """
     try:
-        notes = get_notes(
+        notes, next_cursor = await get_notes(
             user_id=current_user.id,
             patient_id=patient_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return notes
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve notes: {str(e)}"
+        )
+
+
+@router.get("/summary", response_model=List[NoteSummary])
+async def list_note_summaries(
+    response: Response,
+    patient_id: Optional[str] = None,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    List note summaries (patient, status, dates) for the Notes and Dashboard pages.
+    
+    Paginates like the full listing, via the X-Next-Cursor header.
+    """
+    try:
+        summaries, next_cursor = await get_note_summaries(
+            user_id=current_user.id,
+            patient_id=patient_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return summaries
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,6 +189,16 @@ async def list_notes(
         )
 
 
+@router.get("/cache/stats")
+async def read_soap_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Generated SOAP sections cache hit rates for this worker. Admin access only.
+    """
+    return soap_cache.stats()
+
+
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: str,
@@ -65,7 +207,7 @@ async def get_note(
     """
     Get a specific clinical note by ID
     """
-    note = get_note_by_id(note_id, current_user.id)
+    note = await get_note_by_id(note_id, current_user.id)
     if not note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,7 +225,7 @@ async def save_clinical_note(
     Save or update a clinical note
     """
     try:
-        saved_note = save_note(note, current_user.id)
+        saved_note = await save_note(note, current_user.id)
         return saved_note
     except Exception as e:
         raise HTTPException(
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body, Query, WebSocket
+from typing import List, Optional
 
 from models.user import User
-from models.transcription import TranscriptionRequest, TranscriptionResponse
-from services.auth import get_current_active_user
-from services.transcription import start_transcription, get_transcription_result
+from models.note import DraftUpdate
+from models.transcription import TranscriptionRequest, TranscriptionResponse, TranscriptionSegment
+from services.auth import get_current_active_user, get_current_user
+from services.drafts import append_segments, complete_live_transcription
+from services.live import live_sessions
+from services.transcription import (
+    start_transcription,
+    get_transcription_result,
+    upload_and_start_transcription,
+)
 
 router = APIRouter()
 
@@ -18,7 +25,7 @@ async def start_transcription_job(
     Start a real-time transcription job with AWS Transcribe Medical
     """
     try:
-        transcription_job = start_transcription(
+        transcription_job = await start_transcription(
             user_id=current_user.id,
             specialty=request.specialty,
             language_code=request.language_code
@@ -40,6 +47,8 @@ async def upload_audio_file(
 ):
     """
     Upload an audio file for transcription
+    
+    The file is streamed to S3 in parts; the job records its object key.
     """
     if not audio_file.filename.endswith(('.mp3', '.wav', '.flac')):
         raise HTTPException(
@@ -48,14 +57,18 @@ async def upload_audio_file(
         )
     
     try:
-        audio_content = await audio_file.read()
-        transcription_job = start_transcription(
+        transcription_job = await upload_and_start_transcription(
             user_id=current_user.id,
+            audio_file=audio_file,
             specialty=specialty,
-            language_code=language_code,
-            audio_data=audio_content
+            language_code=language_code
         )
         return transcription_job
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,6 +76,87 @@ async def upload_audio_file(
         )
 
 
+@router.websocket("/stream")
+async def stream_audio(
+    websocket: WebSocket,
+    token: str = Query(...),
+    specialty: str = Query("PRIMARY_CARE"),
+    language_code: str = Query("en-US"),
+    sample_rate: int = Query(16000)
+):
+    """
+    Transcribe live audio sent over a WebSocket
+    
+    Binary frames carry 16-bit mono PCM; a text frame {"type": "end"} ends
+    the audio. The server sends JSON messages: "started" with the job ID,
+    "partial" and "final" segments, "draft" updates of the job's draft note,
+    "backpressure" with paused true/false, and "completed". Browsers cannot
+    set headers on a WebSocket, so the access token goes in the query string.
+    """
+    try:
+        current_user = await get_current_user(token)
+    except HTTPException:
+        current_user = None
+
+    await websocket.accept()
+    if current_user is None or not current_user.get("is_active", False):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+
+    await live_sessions.serve(
+        websocket,
+        user_id=str(current_user["_id"]),
+        specialty=specialty,
+        language_code=language_code,
+        sample_rate=sample_rate
+    )
+
+
+@router.post("/{job_id}/segments", response_model=DraftUpdate)
+async def add_segments(
+    job_id: str,
+    segments: List[TranscriptionSegment] = Body(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Add live transcript segments and update the job's draft note
+    """
+    try:
+        return await append_segments(job_id, current_user.id, segments)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update draft note: {str(e)}"
+        )
+
+
+@router.post("/{job_id}/complete", response_model=TranscriptionResponse)
+async def complete_transcription(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    End a live transcription; its draft note is already up to date
+    """
+    try:
+        return await complete_live_transcription(job_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete transcription: {str(e)}"
+        )
+
+
 @router.get("/{job_id}", response_model=TranscriptionResponse)
 async def get_transcription(
     job_id: str,
@@ -72,7 +166,7 @@ async def get_transcription(
     Get the result of a transcription job
     """
     try:
-        result = get_transcription_result(job_id, current_user.id)
+        result = await get_transcription_result(job_id, current_user.id)
         return result
     except Exception as e:
         raise HTTPException(
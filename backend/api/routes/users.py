@@ -1,26 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from typing import List, Optional
 
 from models.user import User, UserUpdate
-from services.auth import get_current_active_user, get_current_admin_user
+from services.auth import (
+    get_current_active_user,
+    get_current_admin_user,
+    get_user_cache_stats,
+)
 from services.users import get_users, update_user, delete_user
+from services.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[User])
 async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user)
 ):
     """
     Retrieve users. Admin access only.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    users = get_users(skip=skip, limit=limit)
+    try:
+        users, next_cursor = await get_users(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
+@router.get("/cache/stats")
+async def read_user_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Authenticated-user cache hit/miss counters for this worker. Admin access only.
+    """
+    return get_user_cache_stats()
+
+
 @router.put("/{user_id}", response_model=User)
 async def update_user_info(
     user_id: str,
@@ -37,7 +64,7 @@ async def update_user_info(
             detail="You can only update your own user information"
         )
     
-    updated_user = update_user(user_id, user_data)
+    updated_user = await update_user(user_id, user_data)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +81,7 @@ async def remove_user(
     """
     Delete a user. Admin access only.
     """
-    success = delete_user(user_id)
+    success = await delete_user(user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
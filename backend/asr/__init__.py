@@ -0,0 +1,3 @@
+from asr.streaming import StreamingEngine, StreamingSession, StreamResult, get_streaming_engine
+
+__all__ = ["StreamingEngine", "StreamingSession", "StreamResult", "get_streaming_engine"]
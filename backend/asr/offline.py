@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import math
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.workers import WorkerPool, WorkerTaskTimeout
+
+logger = logging.getLogger(__name__)
+
+# Whisper models take 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+
+# Energy is measured over frames of this length
+FRAME_MS = 30
+
+# Silence kept around the speech in each chunk
+CHUNK_PADDING_MS = 150
+
+
+class AsrSegment(NamedTuple):
+    text: str
+    start_time: float  # Seconds from the start of the recording
+    end_time: float
+    confidence: float
+
+
+def load_audio(path: str) -> np.ndarray:
+    """Decode any audio file (wav, mp3, flac...) to 16 kHz mono float32."""
+    from faster_whisper import decode_audio
+
+    return decode_audio(path, sampling_rate=SAMPLE_RATE)
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 30.0,
+    min_silence_ms: int = 400,
+    silence_db: float = 35.0
+) -> List[Tuple[int, int]]:
+    """
+    Cut a recording into chunks at pauses in the speech.
+
+    A frame is silent when its RMS energy is more than silence_db below the
+    loud parts of the recording (its 95th percentile frame). Chunks end in
+    the middle of a silence at least min_silence_ms long and are as long as
+    possible up to max_chunk_seconds; speech running longer than that
+    without a pause is cut at max_chunk_seconds. Silence at the edges of a
+    chunk is trimmed and chunks with no speech at all are dropped.
+
+    Returns:
+        (start, end) sample offsets of the chunks, in order
+    """
+    frame = sample_rate * FRAME_MS // 1000
+    frames = len(audio) // frame
+    if frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    framed = audio[:frames * frame].astype(np.float32).reshape(frames, frame)
+    rms = np.sqrt(np.mean(framed ** 2, axis=1))
+    threshold = max(np.percentile(rms, 95) * 10 ** (-silence_db / 20), 1e-4)
+    silent = rms < threshold
+
+    # Midpoints of silent runs long enough to cut at
+    min_silence = max(1, min_silence_ms // FRAME_MS)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    cuts = [
+        int((start + end) // 2)
+        for start, end in zip(edges[::2], edges[1::2])
+        if end - start >= min_silence
+    ]
+
+    max_frames = max(1, int(max_chunk_seconds * 1000 // FRAME_MS))
+    bounds = []
+    start = 0
+    last: Optional[int] = None
+    for cut in cuts + [frames]:
+        while cut - start > max_frames:
+            end = last if last is not None and last > start else start + max_frames
+            bounds.append((start, end))
+            start, last = end, None
+        last = cut
+    if start < frames:
+        bounds.append((start, frames))
+
+    padding = CHUNK_PADDING_MS // FRAME_MS
+    chunks = []
+    for start, end in bounds:
+        voiced = np.flatnonzero(~silent[start:end])
+        if not len(voiced):
+            continue
+        first = max(start, start + int(voiced[0]) - padding)
+        stop = min(end, start + int(voiced[-1]) + 1 + padding)
+        # The samples left over after the last whole frame belong to the last chunk
+        chunks.append((first * frame, len(audio) if stop == frames else stop * frame))
+    return chunks
+
+
+_model: Any = None
+
+
+def _init_worker(model_path: str, compute_type: str, cpu_threads: int) -> None:
+    # Each pool process loads its own copy of the model once
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(model_path, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _decode_chunk(samples: np.ndarray, offset: float, language: str, beam_size: int) -> List[AsrSegment]:
+    duration = len(samples) / SAMPLE_RATE
+    segments, _ = _model.transcribe(
+        samples,
+        language=language,
+        beam_size=beam_size,
+        vad_filter=False,  # Chunks are already cut at silences
+        condition_on_previous_text=False,
+    )
+    results = []
+    for segment in segments:
+        text = segment.text.strip()
+        if not text:
+            continue
+        # Timestamps are relative to the chunk; a model may run past its end
+        start = min(max(segment.start, 0.0), duration)
+        end = min(max(segment.end, start), duration)
+        results.append(AsrSegment(
+            text=text,
+            start_time=round(offset + start, 3),
+            end_time=round(offset + end, 3),
+            confidence=round(min(1.0, math.exp(segment.avg_logprob)), 3),
+        ))
+    return results
+
+
+def stitch(chunk_results: List[List[AsrSegment]]) -> List[AsrSegment]:
+    """Join per-chunk segments, in chunk order, into one non-overlapping timeline."""
+    segments: List[AsrSegment] = []
+    for results in chunk_results:
+        for segment in results:
+            if segments and segment.start_time < segments[-1].end_time:
+                start = segments[-1].end_time
+                segment = segment._replace(start_time=start, end_time=max(segment.end_time, start))
+            segments.append(segment)
+    return segments
+
+
+class AsrTaskTimeout(WorkerTaskTimeout):
+    """Raised when decoding a chunk takes longer than the engine's chunk timeout."""
+
+
+class AsrWorkerPool(WorkerPool):
+    name = "ASR"
+    timeout_error = AsrTaskTimeout
+
+
+class LocalAsrEngine:
+    """
+    Offline speech-to-text on CPU with a CTranslate2 (faster-whisper) model.
+
+    A recording is cut into chunks at pauses (see split_on_silence), the
+    chunks are decoded in parallel by a pool of worker processes that each
+    load the model once, and the results are stitched back together with
+    timestamps relative to the whole recording. The cores are split between
+    the worker processes, as with the NLP executor, and the pool recovers
+    from stuck or crashed workers the same way (see WorkerPool).
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int = 0,
+        compute_type: str = "int8",
+        beam_size: int = 1,
+        max_chunk_seconds: float = 30.0,
+        min_silence_ms: int = 400,
+        chunk_timeout: float = 300,
+        cores: int = 0
+    ):
+        self.model_path = model_path
+        self._workers = workers
+        self._use_cores(cores)
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_silence_ms = min_silence_ms
+        self.chunk_timeout = chunk_timeout
+        self._pool: Optional[AsrWorkerPool] = None
+        self.transcribed = 0
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def _use_cores(self, cores: int) -> None:
+        self.cores = cores or os.cpu_count() or 1
+        self.workers = self._workers or self.cores
+        self.cpu_threads = max(1, self.cores // self.workers)
+
+    def start(self, cores: int = 0) -> None:
+        """
+        Start the worker processes and load the model in each.
+
+        Args:
+            cores: Cores to use instead of those given to the constructor
+        """
+        if self._pool is not None:
+            return
+        if cores:
+            self._use_cores(cores)
+        if not self.model_path:
+            raise ValueError("The local speech-to-text engine needs a model path (ASR_MODEL_PATH)")
+        self._pool = AsrWorkerPool(
+            self.workers,
+            self.cores,
+            self.chunk_timeout,
+            initializer=_init_worker,
+            initargs=(self.model_path, self.compute_type, self.cpu_threads),
+        )
+        logger.info(
+            f"Local ASR engine started: {self.workers} workers x {self.cpu_threads} threads, "
+            f"model {self.model_path}"
+        )
+
+    def chunks(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Sample ranges the recording will be decoded in."""
+        return split_on_silence(
+            audio,
+            max_chunk_seconds=self.max_chunk_seconds,
+            min_silence_ms=self.min_silence_ms,
+        )
+
+    async def transcribe(self, audio: np.ndarray, language_code: str = "en-US") -> List[AsrSegment]:
+        """
+        Transcribe a 16 kHz mono recording.
+
+        Every chunk is submitted at once but waits for a free worker, so
+        chunk_timeout bounds each chunk's decoding however long the
+        recording is.
+
+        Args:
+            audio: Samples as float32 in [-1, 1] (see load_audio)
+            language_code: Language of the audio, e.g. en-US
+
+        Returns:
+            Segments with timestamps from the start of the recording
+
+        Raises:
+            AsrTaskTimeout: If a chunk took longer than chunk_timeout to decode
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        language = language_code.split("-")[0].lower()
+        started = loop.time()
+        chunk_results = await asyncio.gather(*(
+            self._pool.run(_decode_chunk, audio[start:end], start / SAMPLE_RATE, language, self.beam_size)
+            for start, end in self.chunks(audio)
+        ))
+        self.transcribed += 1
+        self.audio_seconds += len(audio) / SAMPLE_RATE
+        self.decode_seconds += loop.time() - started
+        return stitch(chunk_results)
+
+    def stats(self) -> Dict[str, Any]:
+        """Decoding throughput since startup, and the pool's chunk counters and restarts."""
+        stats = {
+            "started": self._pool is not None,
+            "cores": self.cores,
+            "workers": self.workers,
+            "threads_per_worker": self.cpu_threads,
+            "transcribed": self.transcribed,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "real_time_factor": round(self.decode_seconds / self.audio_seconds, 3) if self.audio_seconds else None,
+        }
+        if self._pool is not None:
+            stats["chunks"] = self._pool.stats()
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            logger.info("Local ASR engine shut down")
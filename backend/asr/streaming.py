@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+# Audio is 16-bit little-endian mono PCM
+BYTES_PER_SAMPLE = 2
+
+# What the fake engine "hears", one sentence per utterance
+FAKE_SCRIPT = [
+    "The patient is a 45-year-old male with a history of hypertension and type 2 diabetes.",
+    "He presents today with complaints of chest pain that started yesterday.",
+    "The pain is pressure-like and radiates to the left arm.",
+    "Blood pressure today is 150 over 90 and heart rate 92.",
+    "He is currently taking lisinopril 10 mg daily and metformin 500 mg twice daily.",
+    "No prior history of cardiac issues.",
+]
+
+
+class StreamResult(NamedTuple):
+    text: str
+    start_time: float
+    end_time: float
+    confidence: float
+    is_final: bool  # Partial results are replaced by later results for the same utterance
+    speaker: Optional[str] = None
+
+
+class StreamingSession:
+    """
+    One audio stream being transcribed.
+
+    Audio goes in with send_audio() and end_audio(); results() yields
+    partial and final results as the engine produces them and ends once
+    the engine has flushed everything after end_audio(). send_audio() may
+    wait while the engine catches up, which is how the engine pushes back
+    on its caller.
+    """
+
+    async def send_audio(self, frame: bytes) -> None:
+        raise NotImplementedError
+
+    async def end_audio(self) -> None:
+        raise NotImplementedError
+
+    def results(self) -> AsyncIterator[StreamResult]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Abandon the stream, e.g. when the client went away."""
+
+
+class StreamingEngine:
+    """Opens streaming transcription sessions."""
+
+    name = ""
+
+    async def open(self, sample_rate: int, language_code: str, specialty: str) -> StreamingSession:
+        raise NotImplementedError
+
+
+class FakeStreamingSession(StreamingSession):
+    def __init__(self, engine: "FakeStreamingEngine", sample_rate: int):
+        self.engine = engine
+        self.bytes_per_second = sample_rate * BYTES_PER_SAMPLE
+        self.received = 0
+        self.utterance_start = 0.0
+        self.next_partial = engine.partial_seconds
+        self.utterances = 0
+        self._results: asyncio.Queue = asyncio.Queue()
+
+    def _sentence(self) -> str:
+        return FAKE_SCRIPT[self.utterances % len(FAKE_SCRIPT)]
+
+    def _final(self, end: float) -> StreamResult:
+        result = StreamResult(self._sentence(), self.utterance_start, end, 0.95, True, "clinician")
+        self.utterances += 1
+        self.utterance_start = end
+        self.next_partial = end + self.engine.partial_seconds
+        return result
+
+    async def send_audio(self, frame: bytes) -> None:
+        if self.engine.decode_delay:
+            await asyncio.sleep(self.engine.decode_delay)
+        self.received += len(frame)
+        heard = self.received / self.bytes_per_second
+        while heard - self.utterance_start >= self.engine.utterance_seconds:
+            self._results.put_nowait(self._final(self.utterance_start + self.engine.utterance_seconds))
+        if heard >= self.next_partial:
+            words = self._sentence().split()
+            progress = (heard - self.utterance_start) / self.engine.utterance_seconds
+            text = " ".join(words[:max(1, int(len(words) * progress))])
+            self._results.put_nowait(StreamResult(text, self.utterance_start, heard, 0.8, False, "clinician"))
+            self.next_partial = heard + self.engine.partial_seconds
+
+    async def end_audio(self) -> None:
+        heard = self.received / self.bytes_per_second
+        if heard - self.utterance_start >= self.engine.partial_seconds:
+            self._results.put_nowait(self._final(heard))
+        self._results.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[StreamResult]:
+        while True:
+            result = await self._results.get()
+            if result is None:
+                return
+            yield result
+
+    async def close(self) -> None:
+        self._results.put_nowait(None)
+
+
+class FakeStreamingEngine(StreamingEngine):
+    """
+    Scripted engine for development, tests and load tests.
+
+    Ignores what the audio says and only counts it: every utterance_seconds
+    of audio becomes a final result with the next sentence of FAKE_SCRIPT,
+    preceded by partial results every partial_seconds. decode_delay_ms
+    makes each frame take that long to "decode", to exercise backpressure.
+    """
+
+    name = "fake"
+
+    def __init__(self, utterance_seconds: float = 3.0, partial_seconds: float = 0.5, decode_delay_ms: float = 0):
+        self.utterance_seconds = utterance_seconds
+        self.partial_seconds = partial_seconds
+        self.decode_delay = decode_delay_ms / 1000
+
+    async def open(self, sample_rate: int, language_code: str, specialty: str) -> StreamingSession:
+        return FakeStreamingSession(self, sample_rate)
+
+
+class AwsStreamingSession(StreamingSession):
+    def __init__(self, stream: Any):
+        self.stream = stream
+
+    async def send_audio(self, frame: bytes) -> None:
+        await self.stream.input_stream.send_audio_event(audio_chunk=frame)
+
+    async def end_audio(self) -> None:
+        await self.stream.input_stream.end_stream()
+
+    async def results(self) -> AsyncIterator[StreamResult]:
+        from amazon_transcribe.model import TranscriptEvent
+
+        async for event in self.stream.output_stream:
+            if not isinstance(event, TranscriptEvent):
+                continue
+            for result in event.transcript.results:
+                if not result.alternatives:
+                    continue
+                alternative = result.alternatives[0]
+                confidences = [item.confidence for item in alternative.items or [] if item.confidence is not None]
+                yield StreamResult(
+                    text=alternative.transcript,
+                    start_time=result.start_time,
+                    end_time=result.end_time,
+                    confidence=sum(confidences) / len(confidences) if confidences else 0.0,
+                    is_final=not result.is_partial,
+                )
+
+    async def close(self) -> None:
+        try:
+            await self.stream.input_stream.end_stream()
+        except Exception as e:
+            logger.warning(f"Error closing transcription stream: {str(e)}")
+
+
+class AwsStreamingEngine(StreamingEngine):
+    """Amazon Transcribe streaming over HTTP/2 (amazon-transcribe SDK)."""
+
+    name = "aws"
+
+    def __init__(self, region: str = "us-east-1"):
+        self.region = region
+
+    async def open(self, sample_rate: int, language_code: str, specialty: str) -> StreamingSession:
+        from amazon_transcribe.client import TranscribeStreamingClient
+
+        client = TranscribeStreamingClient(region=self.region)
+        stream = await client.start_stream_transcription(
+            language_code=language_code,
+            media_sample_rate_hz=sample_rate,
+            media_encoding="pcm",
+        )
+        return AwsStreamingSession(stream)
+
+
+ENGINES: Dict[str, Type[StreamingEngine]] = {
+    FakeStreamingEngine.name: FakeStreamingEngine,
+    AwsStreamingEngine.name: AwsStreamingEngine,
+}
+
+
+def get_streaming_engine(name: str, **options: Any) -> StreamingEngine:
+    """
+    Build the streaming engine selected by name.
+
+    Raises:
+        ValueError: If no engine has that name
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown streaming engine {name!r}, expected one of {sorted(ENGINES)}")
+    return ENGINES[name](**options)
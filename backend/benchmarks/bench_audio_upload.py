@@ -0,0 +1,89 @@
+"""
+Memory benchmark for streamed audio uploads.
+
+Uploads synthetic recordings of increasing size through upload_audio_stream
+into an S3 stand-in and reports the peak Python heap during each upload and
+the process's peak RSS. Both should stay flat, around two upload parts,
+whatever the file size. --baseline instead reads the whole file and sends
+it with one put_object, as the upload route used to.
+
+Usage (from backend/, with an S3 stand-in such as `moto_server -p 5000` running):
+    AWS_ENDPOINT_URL=http://localhost:5000 AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test \\
+        python -m benchmarks.bench_audio_upload --sizes 16,128,512
+"""
+import argparse
+import asyncio
+import resource
+import time
+import tracemalloc
+
+from core.config import settings
+from services.aws import aws_clients
+from services.transcription import upload_audio_stream
+
+MB = 1024 * 1024
+
+
+class SyntheticRecording:
+    """File-like upload that generates its (silent) bytes as they are read."""
+
+    filename = "recording.wav"
+
+    def __init__(self, size: int):
+        self.size = size
+        self.position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = self.size
+        size = min(size, self.size - self.position)
+        self.position += size
+        return bytes(size)
+
+
+async def read_all_and_put(recording: SyntheticRecording, key: str) -> int:
+    body = await recording.read()
+    await aws_clients.s3.put_object(Bucket=settings.AWS_S3_BUCKET, Key=key, Body=body)
+    return len(body)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(sizes, baseline: bool):
+    s3 = aws_clients.s3.client
+    try:
+        s3.head_bucket(Bucket=settings.AWS_S3_BUCKET)
+    except Exception:
+        s3.create_bucket(Bucket=settings.AWS_S3_BUCKET)
+
+    print(f"part size {settings.AUDIO_UPLOAD_PART_SIZE_MB} MB, {'read + put_object' if baseline else 'streamed multipart'}")
+    print(f"{'file MB':>8} {'seconds':>8} {'peak heap MB':>13} {'peak RSS MB':>12}")
+    tracemalloc.start()
+    for size in sizes:
+        recording = SyntheticRecording(size * MB)
+        key = f"bench/{size}mb.wav"
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        if baseline:
+            await read_all_and_put(recording, key)
+        else:
+            await upload_audio_stream(recording, key, "audio/wav")
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        print(f"{size:>8} {elapsed:>8.2f} {peak / MB:>13.1f} {peak_rss_mb():>12.1f}")
+        s3.delete_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="16,128,512", help="File sizes in MB, ascending")
+    parser.add_argument("--baseline", action="store_true", help="Read the whole file, then put_object")
+    args = parser.parse_args()
+    asyncio.run(run([int(value) for value in args.sizes.split(",")], args.baseline))
+
+
+if __name__ == "__main__":
+    main()
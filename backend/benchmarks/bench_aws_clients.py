@@ -0,0 +1,126 @@
+"""
+Per-call overhead benchmark for shared AWS clients.
+
+Starts a local stub S3 endpoint that answers every request at once, then
+makes the same cheap call (head_bucket) three ways: building a new boto3
+client for every call, as get_s3_client() used to; through the shared
+client; and concurrently through the shared client's async wrapper,
+against new clients run with asyncio.to_thread. With a stub that does no
+work, the difference is the client construction and connection setup
+saved on every call.
+
+Usage (from backend/):
+    python -m benchmarks.bench_aws_clients --calls 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+
+from benchmarks.bench_batching import percentile
+from services.aws import AwsClients
+
+BUCKET = "bench-bucket"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled connections are reused as they would be with S3
+    protocol_version = "HTTP/1.1"
+
+    def _empty(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_HEAD = do_GET = do_PUT = _empty
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def new_client(endpoint: str):
+    return boto3.client(
+        "s3",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-east-1",
+        endpoint_url=endpoint,
+    )
+
+
+def timed(calls: int, call):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def timed_concurrently(calls: int, concurrency: int, call):
+    timings = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return timings, time.perf_counter() - start
+
+
+def report(label: str, timings, elapsed=None):
+    elapsed = elapsed if elapsed is not None else sum(timings)
+    print(
+        f"{label:<34} {percentile(timings, 50) * 1000:>8.2f} {percentile(timings, 99) * 1000:>8.2f} "
+        f"{len(timings) / elapsed:>9.0f}"
+    )
+
+
+async def run(calls: int, concurrency: int):
+    endpoint = start_stub()
+    shared = AwsClients(
+        endpoint_url=endpoint,
+        access_key_id="test",
+        secret_access_key="test",
+        max_pool_connections=concurrency,
+    )
+    s3 = shared.s3
+    s3.client.head_bucket(Bucket=BUCKET)  # Warm up the pool
+
+    print(f"{'':<34} {'p50 ms':>8} {'p99 ms':>8} {'calls/s':>9}")
+    report("new client per call", timed(calls, lambda: new_client(endpoint).head_bucket(Bucket=BUCKET)))
+    report("shared client", timed(calls, lambda: s3.client.head_bucket(Bucket=BUCKET)))
+
+    timings, elapsed = await timed_concurrently(
+        calls, concurrency, lambda: asyncio.to_thread(lambda: new_client(endpoint).head_bucket(Bucket=BUCKET))
+    )
+    report(f"new client, to_thread x{concurrency}", timings, elapsed)
+    timings, elapsed = await timed_concurrently(calls, concurrency, lambda: s3.head_bucket(Bucket=BUCKET))
+    report(f"shared async client x{concurrency}", timings, elapsed)
+    shared.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Eager PyTorch vs ONNX Runtime benchmark for the SOAP model.
+
+Loads one model directory with each inference backend in its own process
+(so resident memory is measured in isolation), generates notes for the same
+transcripts, and reports per-note latency, peak RSS and how often the ONNX
+output matches the eager output.
+
+Usage (from backend/):
+    python -m benchmarks.bench_backends /models/soap/default --notes 20
+"""
+import argparse
+import difflib
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+
+from benchmarks.bench_soap_scan import build_transcript
+from nlp.backends import get_backend
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(name, options, model_path, transcripts, max_length, results):
+    backend = get_backend(name, **options)
+    start = time.perf_counter()
+    generator = backend.load(model_path, max_length)
+    load_seconds = time.perf_counter() - start
+    generator(transcripts[0])
+
+    latencies = []
+    outputs = []
+    for transcript in transcripts:
+        start = time.perf_counter()
+        outputs.append(generator(transcript)[0]["generated_text"])
+        latencies.append(time.perf_counter() - start)
+
+    results[name] = {
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "outputs": outputs,
+        "rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model_path", help="Local Hugging Face seq2seq model directory")
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--chars", type=int, default=1500)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    transcripts = [build_transcript(args.chars, seed=seed) for seed in range(args.notes)]
+    configs = [
+        ("eager", {"intra_op_threads": args.threads}),
+        ("onnx", {"intra_op_threads": args.threads, "quantize": not args.no_quantize}),
+    ]
+
+    manager = multiprocessing.Manager()
+    results = manager.dict()
+    for name, options in configs:
+        process = multiprocessing.Process(
+            target=run_backend,
+            args=(name, options, args.model_path, transcripts, args.max_length, results),
+        )
+        process.start()
+        process.join()
+
+    print(f"{'backend':<8} {'load s':>7} {'p50 ms':>8} {'mean ms':>8} {'peak RSS MB':>12}")
+    for name, _ in configs:
+        result = results[name]
+        print(
+            f"{name:<8} {result['load_seconds']:>7.1f} "
+            f"{statistics.median(result['latencies']) * 1000:>8.1f} "
+            f"{statistics.mean(result['latencies']) * 1000:>8.1f} {result['rss_mb']:>12.0f}"
+        )
+
+    eager, onnx = results["eager"]["outputs"], results["onnx"]["outputs"]
+    exact = sum(a == b for a, b in zip(eager, onnx))
+    similarity = statistics.mean(
+        difflib.SequenceMatcher(None, a.split(), b.split()).ratio() for a, b in zip(eager, onnx)
+    )
+    print(f"agreement: {exact}/{len(eager)} identical, mean token similarity {similarity:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput vs latency benchmark for the SOAP micro-batching queue.
+
+Drives the MicroBatcher with a fixed number of concurrent clients for a grid
+of batch sizes and wait times and reports throughput and p50/p99 latency.
+Point --model-dir at a model directory to measure real batched inference;
+without one the rule-based extractor is used, which shows only the queueing
+overhead. With --workers, batches run on an NLP process pool of that size,
+one batch per worker at a time, as in the API.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batching --model-dir /models/soap --clients 32 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.bench_soap_scan import build_transcript
+from nlp.batching import MicroBatcher
+from nlp.executor import NlpExecutor
+from nlp.registry import model_registry
+from nlp.soap import extract_soap_sections_batch
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(batch_size: int, wait_ms: float, clients: int, requests: int, transcripts, executor=None):
+    if executor is not None:
+        await executor.start()
+    batcher = MicroBatcher(
+        extract_soap_sections_batch,
+        max_batch_size=batch_size,
+        max_wait_ms=wait_ms,
+        max_queue_depth=requests,
+        executor=executor,
+    )
+    batcher.start()
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for index in counter:
+            start = time.perf_counter()
+            await batcher.submit(transcripts[index % len(transcripts)], "PRIMARY_CARE")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    stats = batcher.stats()
+    await batcher.stop()
+    return requests / elapsed, latencies, stats["mean_batch_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-dir", default="")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--waits-ms", default="0,10,25")
+    parser.add_argument("--workers", type=int, default=0, help="NLP worker processes; 0 = a thread in this process")
+    args = parser.parse_args()
+
+    model_registry.load(args.model_dir)
+    if not model_registry.get("PRIMARY_CARE"):
+        print("No model loaded; measuring rule-based extraction only")
+    executor = NlpExecutor(workers=args.workers, model_options={"model_dir": args.model_dir}) if args.workers else None
+
+    # Mixed lengths so length bucketing has something to do
+    transcripts = [build_transcript(size, seed=size) for size in (400, 800, 1600, 3200)]
+
+    print(f"{'batch':>5} {'wait ms':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for batch_size in (int(value) for value in args.batch_sizes.split(",")):
+        for wait_ms in (float(value) for value in args.waits_ms.split(",")):
+            throughput, latencies, mean_batch = asyncio.run(
+                run(batch_size, wait_ms, args.clients, args.requests, transcripts, executor)
+            )
+            print(
+                f"{batch_size:>5} {wait_ms:>8.0f} {throughput:>8.1f} "
+                f"{statistics.median(latencies) * 1000:>8.1f} "
+                f"{percentile(latencies, 99) * 1000:>8.1f} {mean_batch:>11.1f}"
+            )
+    if executor is not None:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time-to-draft benchmark for incremental SOAP drafts.
+
+Feeds synthetic visits segment by segment into IncrementalSoapDraft and
+compares the work left when the visit ends (applying the last segment)
+with re-running the rule-based extractor over the whole transcript, for
+visits of increasing length. Also checks both give the same sections.
+
+Usage (from backend/):
+    python -m benchmarks.bench_incremental --segments 50,200,1000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_batching import percentile
+from benchmarks.bench_soap_scan import SENTENCES
+from nlp.incremental import IncrementalSoapDraft
+from nlp.soap import extract_rule_based_sections
+
+# Sentences with vitals and doses so the structured fields change along the way
+LIVE_SENTENCES = SENTENCES + [
+    "Blood pressure today is 148 over 92 and pulse 84.",
+    "She takes metformin 500 mg twice daily.",
+    "Temperature 99.1 and oxygen saturation 97 percent.",
+    "Lisinopril 20 mg by mouth once a day.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", default="50,200,1000")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'segments':>8} {'p50 seg ms':>11} {'p99 seg ms':>11} {'last seg ms':>12} {'full ms':>8} {'same':>5}")
+    for count in (int(value) for value in args.segments.split(",")):
+        rng = random.Random(args.seed)
+        segments = [rng.choice(LIVE_SENTENCES) for _ in range(count)]
+
+        draft = IncrementalSoapDraft()
+        timings = []
+        for segment in segments:
+            start = time.perf_counter()
+            draft.add_segment(segment)
+            timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        full = extract_rule_based_sections(" ".join(segments))
+        full_seconds = time.perf_counter() - start
+
+        print(
+            f"{count:>8} {percentile(timings, 50) * 1000:>11.3f} {percentile(timings, 99) * 1000:>11.3f} "
+            f"{timings[-1] * 1000:>12.3f} {full_seconds * 1000:>8.2f} {str(draft.sections == full):>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
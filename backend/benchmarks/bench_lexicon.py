@@ -0,0 +1,63 @@
+"""
+Scaling benchmark for the memory-mapped clinical lexicon.
+
+Pads the bundled lexicon with synthetic terms up to each target size,
+compiles it, and reports compile time, file size, time to open (map) the
+file and entity extraction time for a note-sized text. Open time should
+stay flat and scan time grow only logarithmically with the term count.
+
+Usage (from backend/):
+    python -m benchmarks.bench_lexicon --sizes 1000,100000,500000
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from benchmarks.bench_soap_scan import best_of, build_transcript
+from nlp.lexicon import CATEGORIES, DEFAULT_LEXICON_SOURCE, Lexicon, compile_lexicon, read_source
+
+
+def synthetic_terms(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        yield " ".join(words), rng.choice(CATEGORIES), ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000,500000")
+    parser.add_argument("--chars", type=int, default=3000, help="Length of the scanned text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bundled = list(read_source(DEFAULT_LEXICON_SOURCE))
+    text = build_transcript(args.chars)
+
+    print(f"{'terms':>8} {'compile s':>10} {'file MB':>8} {'open ms':>8} {'scan ms':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(value) for value in args.sizes.split(",")):
+            path = os.path.join(directory, f"lexicon-{size}.bin")
+            start = time.perf_counter()
+            compile_lexicon(bundled + list(synthetic_terms(max(0, size - len(bundled)))), path)
+            compiled = time.perf_counter() - start
+
+            start = time.perf_counter()
+            lexicon = Lexicon(path)
+            opened = time.perf_counter() - start
+            scan = best_of(args.repeat, lexicon.scan, text)
+            lexicon.close()
+            print(
+                f"{size:>8} {compiled:>10.2f} {os.path.getsize(path) / 1e6:>8.1f} "
+                f"{opened * 1000:>8.2f} {scan * 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
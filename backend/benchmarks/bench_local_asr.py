@@ -0,0 +1,88 @@
+"""
+Real-time factor benchmark for the offline speech-to-text engine.
+
+Transcribes one recording with LocalAsrEngine using increasing numbers of
+worker processes, each getting an equal share of the cores, and reports the
+real-time factor (decode time / audio duration) and the real-time factor
+per core (core-seconds spent per second of audio), which stays flat while
+parallel chunk decoding scales. Models are loaded and warmed up before
+timing. Without --audio a synthetic recording of noise bursts separated by
+pauses is used: the text is meaningless, but chunking and decode load are
+realistic.
+
+Usage (from backend/, with a CTranslate2 Whisper model on disk):
+    python -m benchmarks.bench_local_asr --model models/whisper-small-ct2 --audio visit.wav --workers 1,2,4
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from asr.offline import SAMPLE_RATE, LocalAsrEngine, load_audio
+
+
+def synthetic_recording(seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0.0
+    while total < seconds:
+        speech, pause = rng.uniform(2, 8), rng.uniform(0.3, 1.2)
+        parts.append(rng.normal(0, 0.1, int(speech * SAMPLE_RATE)))
+        parts.append(rng.normal(0, 0.0005, int(pause * SAMPLE_RATE)))
+        total += speech + pause
+    return np.concatenate(parts)[:int(seconds * SAMPLE_RATE)].astype(np.float32)
+
+
+async def measure(model: str, audio: np.ndarray, workers: int, compute_type: str, beam_size: int):
+    engine = LocalAsrEngine(model, workers=workers, compute_type=compute_type, beam_size=beam_size)
+    engine.start()
+    try:
+        # Load the model in every worker before timing
+        warmup = audio[:5 * SAMPLE_RATE]
+        await asyncio.gather(*(engine.transcribe(warmup) for _ in range(workers)))
+        start = time.perf_counter()
+        segments = await engine.transcribe(audio)
+        elapsed = time.perf_counter() - start
+        return engine, len(engine.chunks(audio)), len(segments), elapsed
+    finally:
+        engine.shutdown()
+
+
+async def run(args):
+    audio = load_audio(args.audio) if args.audio else synthetic_recording(args.seconds, args.seed)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"audio {duration:.1f}s, {os.cpu_count()} cores, model {args.model} ({args.compute_type})")
+    print(
+        f"{'workers':>7} {'threads':>7} {'chunks':>6} {'segments':>8} {'seconds':>8} "
+        f"{'RTF':>7} {'RTF/core':>8} {'speedup':>7}"
+    )
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        engine, chunks, segments, elapsed = await measure(
+            args.model, audio, workers, args.compute_type, args.beam_size
+        )
+        cores = engine.workers * engine.cpu_threads
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>7} {engine.cpu_threads:>7} {chunks:>6} {segments:>8} {elapsed:>8.2f} "
+            f"{elapsed / duration:>7.3f} {elapsed * cores / duration:>8.3f} {baseline / elapsed:>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", required=True, help="CTranslate2 Whisper model directory")
+    parser.add_argument("--audio", default="", help="Recording to transcribe; synthetic if empty")
+    parser.add_argument("--seconds", type=float, default=300, help="Length of the synthetic recording")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
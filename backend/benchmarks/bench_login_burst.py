@@ -0,0 +1,95 @@
+"""
+Login-burst load test.
+
+Fires a burst of concurrent logins at /api/auth/token while probing an
+unrelated endpoint, and reports the probe latency alongside how many logins
+succeeded or were shed with 503. With bcrypt on the event loop the probe
+latency grows with the burst; with the hashing pool it stays flat.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.bench_login_burst --url http://localhost:8000 --logins 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+EMAIL = "burst-test@example.com"
+PASSWORD = "burst-test-password"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def ensure_user(client: httpx.AsyncClient):
+    response = await client.post(
+        "/api/auth/register",
+        json={"email": EMAIL, "full_name": "Burst Test", "password": PASSWORD},
+    )
+    if response.status_code not in (200, 400):
+        response.raise_for_status()
+
+
+async def login(client: httpx.AsyncClient, statuses: Counter):
+    response = await client.post(
+        "/api/auth/token", data={"username": EMAIL, "password": PASSWORD}
+    )
+    statuses[response.status_code] += 1
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run(url: str, logins: int):
+    limits = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        await ensure_user(client)
+
+        baseline = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, baseline))
+        await asyncio.sleep(1)
+        stop.set()
+        await probe_task
+
+        during = []
+        statuses = Counter()
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, during))
+        start = time.perf_counter()
+        await asyncio.gather(*(login(client, statuses) for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    for label, samples in (("idle", baseline), ("burst", during)):
+        print(
+            f"GET / {label:<6} p50={statistics.median(samples) * 1000:8.2f} ms  "
+            f"p99={percentile(samples, 99) * 1000:8.2f} ms  n={len(samples)}"
+        )
+    print(f"{logins} logins in {elapsed:.2f}s: " + ", ".join(
+        f"{code}={count}" for code, count in sorted(statuses.items())
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Event-loop responsiveness benchmark for the NLP process pool.
+
+Saturates SOAP extraction with concurrent requests while a ticker measures
+how late the event loop wakes up, first with extraction in threads of the
+API process and then on the NlpExecutor process pool. Reports throughput
+and p50/p99/max loop lag for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_loop_lag --requests 400 --chars 20000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_batching import percentile
+from benchmarks.bench_soap_scan import build_transcript
+from nlp.batching import MicroBatcher
+from nlp.executor import NlpExecutor
+from nlp.registry import model_registry
+from nlp.soap import extract_soap_sections_batch
+
+TICK_SECONDS = 0.01
+
+
+async def measure_lag(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def run(executor, requests: int, transcripts):
+    batcher = MicroBatcher(extract_soap_sections_batch, max_queue_depth=requests, executor=executor)
+    batcher.start()
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(lags, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        batcher.submit(transcripts[index % len(transcripts)], "PRIMARY_CARE")
+        for index in range(requests)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    await batcher.stop()
+    return requests / elapsed, lags
+
+
+async def run_pool(workers: int, model_dir: str, requests: int, transcripts):
+    executor = NlpExecutor(workers=workers, model_options={"model_dir": model_dir})
+    await executor.start()
+    try:
+        return await run(executor, requests, transcripts)
+    finally:
+        executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-dir", default="")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--chars", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU core")
+    args = parser.parse_args()
+
+    transcripts = [build_transcript(args.chars, seed=seed) for seed in range(8)]
+
+    model_registry.load(args.model_dir)
+    results = [("threads", asyncio.run(run(None, args.requests, transcripts)))]
+    results.append((
+        "process pool",
+        asyncio.run(run_pool(args.workers, args.model_dir, args.requests, transcripts)),
+    ))
+
+    print(f"{'mode':<13} {'req/s':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for mode, (throughput, lags) in results:
+        print(
+            f"{mode:<13} {throughput:>8.1f} {percentile(lags, 50) * 1000:>11.1f} "
+            f"{percentile(lags, 99) * 1000:>11.1f} {max(lags) * 1000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
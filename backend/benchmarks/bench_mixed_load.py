@@ -0,0 +1,120 @@
+"""
+Mixed-load latency benchmark for the MongoDB data layer.
+
+Runs a stream of fast point lookups (what every authenticated request does)
+concurrently with slow unindexed scans, once with the old synchronous pymongo
+client called from coroutines and once with the Motor client used by
+services/database.py. Reports p50/p99 latency of the fast lookups.
+
+Usage (from backend/, with MongoDB running at MONGODB_URL):
+    python -m benchmarks.bench_mixed_load --docs 200000 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from core.config import settings
+
+COLLECTION = "bench_mixed_load"
+
+
+def seed(docs: int):
+    """Populate the benchmark collection if it is not already the right size."""
+    collection = MongoClient(settings.MONGODB_URL)[settings.DATABASE_NAME][COLLECTION]
+    if collection.estimated_document_count() == docs:
+        return
+    collection.drop()
+    collection.create_index("seq")
+    batch = []
+    for i in range(docs):
+        batch.append({"seq": i, "email": f"user{i}@example.com", "text": f"note body {i}"})
+        if len(batch) == 10000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_sync(requests: int, slow_every: int, concurrency: int):
+    """Before: blocking pymongo calls made directly from coroutines."""
+    collection = MongoClient(settings.MONGODB_URL)[settings.DATABASE_NAME][COLLECTION]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def fast(i):
+        start = time.perf_counter()
+        async with semaphore:
+            collection.find_one({"seq": i})
+            latencies.append(time.perf_counter() - start)
+
+    async def slow():
+        async with semaphore:
+            collection.count_documents({"text": {"$regex": "9999$"}})
+
+    tasks = []
+    for i in range(requests):
+        tasks.append(asyncio.ensure_future(slow() if i % slow_every == 0 else fast(i)))
+        # Spread arrivals so latency reflects event-loop stalls, not one burst
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def run_async(requests: int, slow_every: int, concurrency: int):
+    """After: Motor, as used by the service layer."""
+    collection = AsyncIOMotorClient(settings.MONGODB_URL)[settings.DATABASE_NAME][COLLECTION]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def fast(i):
+        start = time.perf_counter()
+        async with semaphore:
+            await collection.find_one({"seq": i})
+            latencies.append(time.perf_counter() - start)
+
+    async def slow():
+        async with semaphore:
+            await collection.count_documents({"text": {"$regex": "9999$"}})
+
+    tasks = []
+    for i in range(requests):
+        tasks.append(asyncio.ensure_future(slow() if i % slow_every == 0 else fast(i)))
+        # Spread arrivals so latency reflects event-loop stalls, not one burst
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def report(label: str, latencies):
+    print(
+        f"{label:<8} n={len(latencies):<6} "
+        f"p50={statistics.median(latencies) * 1000:8.2f} ms  "
+        f"p99={percentile(latencies, 99) * 1000:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--slow-every", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.docs)
+    report("pymongo", asyncio.run(run_sync(args.requests, args.slow_every, args.concurrency)))
+    report("motor", asyncio.run(run_async(args.requests, args.slow_every, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
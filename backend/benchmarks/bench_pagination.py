@@ -0,0 +1,112 @@
+"""
+Offset vs cursor pagination benchmark for GET /api/notes.
+
+Seeds a separate benchmark database with one clinician owning N notes, then
+times services.notes.get_notes for page 1 and a deep page using the offset
+fallback and the keyset cursor.
+
+Usage (from backend/, with MongoDB running at MONGODB_URL):
+    python -m benchmarks.bench_pagination --notes 1000000 --page 10000 --limit 100
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from core.config import settings
+
+settings.DATABASE_NAME = f"{settings.DATABASE_NAME}_bench"
+
+from services import database  # noqa: E402
+from services.notes import get_notes, NOTE_SORT_FIELDS  # noqa: E402
+from services.pagination import encode_cursor  # noqa: E402
+
+USER_ID = ObjectId("000000000000000000000001")
+
+
+def seed(notes: int):
+    """Insert the benchmark notes unless the collection already holds them."""
+    collection = MongoClient(settings.MONGODB_URL)[settings.DATABASE_NAME]["notes"]
+    if collection.count_documents({"user_id": USER_ID}) == notes:
+        return
+    collection.delete_many({"user_id": USER_ID})
+    start = datetime(2015, 1, 1)
+    batch = []
+    for i in range(notes):
+        created_at = start + timedelta(minutes=i)
+        batch.append({
+            "user_id": USER_ID,
+            "patient_id": f"P{i % 5000:05d}",
+            "transcription_id": ObjectId(),
+            "subjective": "Patient presents with chest pain.",
+            "objective": "Vital Signs: BP 120/80, HR 75",
+            "assessment": "1. Acute chest pain",
+            "plan": "1. ECG and cardiac enzymes.",
+            "status": "draft",
+            "specialty": "PRIMARY_CARE",
+            "tags": [],
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+        if len(batch) == 10000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def cursor_before(offset: int) -> str:
+    """Cursor token for the document just before the given offset."""
+    collection = MongoClient(settings.MONGODB_URL)[settings.DATABASE_NAME]["notes"]
+    document = (
+        collection.find({"user_id": USER_ID})
+        .sort([(field, -1) for field in NOTE_SORT_FIELDS])
+        .skip(offset - 1)
+        .limit(1)
+        .next()
+    )
+    return encode_cursor(document, NOTE_SORT_FIELDS)
+
+
+async def timed(repeat: int, **kwargs) -> float:
+    """Best-of-N wall time in milliseconds for one get_notes call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await get_notes(user_id=str(USER_ID), **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(page: int, limit: int, repeat: int):
+    await database.ensure_indexes()
+    deep_offset = (page - 1) * limit
+    deep_cursor = cursor_before(deep_offset)
+
+    results = [
+        ("offset", 1, await timed(repeat, limit=limit, offset=0)),
+        ("offset", page, await timed(repeat, limit=limit, offset=deep_offset)),
+        ("cursor", 1, await timed(repeat, limit=limit)),
+        ("cursor", page, await timed(repeat, limit=limit, cursor=deep_cursor)),
+    ]
+    for mode, page_number, millis in results:
+        print(f"{mode:<7} page {page_number:<6} {millis:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=1000000)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.notes)
+    asyncio.run(run(args.page, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
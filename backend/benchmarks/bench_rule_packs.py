@@ -0,0 +1,100 @@
+"""
+Per-note latency benchmark for rule packs of increasing size.
+
+Writes synthetic rule packs (the bundled primary care rules plus N made-up
+complaint, assessment and plan terms) to a temporary directory, loads each
+through the rule pack store and times the rule-based extractor on the same
+note-length transcripts. Compiling grows with the pack; per-note latency
+should not. Also times a hot reload, from rewriting a pack file until
+lookups return the recompiled pack, and the note latency while the
+reload compiles in the background.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rule_packs --terms 0,1000,10000,50000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_batching import percentile
+from benchmarks.bench_soap_scan import build_transcript
+from nlp.rule_packs import DEFAULT_RULE_PACK_DIR, rule_packs
+from nlp.soap import extract_rule_based_sections
+
+SYLLABLES = ["ka", "lo", "mi", "zen", "tor", "vex", "ul", "pra", "dos", "ine", "ra", "quo"]
+
+
+def synthetic_terms(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        terms.add(" ".join(words))
+    return sorted(terms)
+
+
+def write_pack(directory: str, extra_terms: int) -> str:
+    with open(os.path.join(DEFAULT_RULE_PACK_DIR, "primary_care.json")) as source:
+        pack = json.load(source)
+    terms = synthetic_terms(extra_terms)
+    pack["complaints"] += terms[::3]
+    pack["assessments"] += [{"term": term, "text": f"Synthetic condition {term}"} for term in terms]
+    pack["plans"] += [{"term": term, "text": f"Synthetic plan for {term}"} for term in terms]
+    path = os.path.join(directory, "primary_care.json")
+    with open(path, "w") as output:
+        json.dump(pack, output)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--terms", default="0,1000,10000,50000", help="Synthetic terms added to the pack")
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--chars", type=int, default=3000)
+    args = parser.parse_args()
+
+    notes = [build_transcript(args.chars, seed=index) for index in range(args.notes)]
+    print(f"{'rules':>7} {'compile s':>10} {'p50 note ms':>12} {'p99 note ms':>12} {'reload s':>9} {'p99 reloading ms':>17}")
+    for extra in (int(value) for value in args.terms.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_pack(directory, extra)
+            start = time.perf_counter()
+            # Checking on every lookup is the worst case for note latency
+            rule_packs.configure(directory, check_interval=0)
+            compile_seconds = time.perf_counter() - start
+            rules = rule_packs.get("PRIMARY_CARE").size
+
+            extract_rule_based_sections(notes[0])
+            timings = []
+            for note in notes:
+                start = time.perf_counter()
+                extract_rule_based_sections(note)
+                timings.append(time.perf_counter() - start)
+
+            # A changed file is picked up by the next lookup
+            with open(path) as source:
+                pack = json.load(source)
+            pack["plans"][0]["text"] += " Reloaded."
+            with open(path, "w") as output:
+                json.dump(pack, output)
+            start = time.perf_counter()
+            reloading = []
+            while "Reloaded." not in rule_packs.get("PRIMARY_CARE").plans(["hypertension"])[0]:
+                note_start = time.perf_counter()
+                extract_rule_based_sections(notes[len(reloading) % len(notes)])
+                reloading.append(time.perf_counter() - note_start)
+            reload_seconds = time.perf_counter() - start
+
+            print(
+                f"{rules:>7} {compile_seconds:>10.3f} {percentile(timings, 50) * 1000:>12.3f} "
+                f"{percentile(timings, 99) * 1000:>12.3f} {reload_seconds:>9.3f} "
+                f"{percentile(reloading, 99) * 1000 if reloading else 0.0:>17.3f}"
+            )
+    rule_packs.configure()
+
+
+if __name__ == "__main__":
+    main()
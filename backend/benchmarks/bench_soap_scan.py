@@ -0,0 +1,64 @@
+"""
+Scaling benchmark for the rule-based SOAP extractor on long transcripts.
+
+Builds synthetic transcripts from 10k to 800k characters (an hour-long
+encounter is well over 100k) and times the single term scan and the whole
+extract_soap_sections call. Time per character should stay flat as the
+transcript grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_soap_scan
+"""
+import argparse
+import random
+import time
+
+from nlp.soap import extract_soap_sections, scan_terms
+
+SENTENCES = [
+    "The patient reports a headache that started three days ago.",
+    "She has a history of hypertension and type 2 diabetes.",
+    "Currently taking lisinopril and metformin as prescribed.",
+    "Denies fever, cough or shortness of breath.",
+    "We discussed diet, exercise and sleep at some length.",
+    "Blood pressure readings at home have been in the one forties.",
+    "No recent travel and no sick contacts at work.",
+]
+
+
+def build_transcript(chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < chars:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:chars]
+
+
+def best_of(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,50000,100000,200000,400000,800000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'chars':>8} {'scan ms':>9} {'extract ms':>11} {'ns/char':>8}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        transcript = build_transcript(size)
+        scan = best_of(args.repeat, scan_terms, transcript)
+        extract = best_of(args.repeat, extract_soap_sections, transcript)
+        print(f"{size:>8} {scan * 1000:>9.2f} {extract * 1000:>11.2f} {extract / size * 1e9:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Time-to-first-content benchmark for streamed note generation.
+
+Creates a completed transcription through the live segments endpoints,
+then generates a note from it repeatedly with POST /api/notes/generate and
+with POST /api/notes/generate/stream, bypassing the SOAP cache. Reports
+when the first section (or generated token) reached the client and when
+the note was complete. Without streaming both are the full response time.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.bench_sse --url http://localhost:8000 --runs 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.bench_batching import percentile
+from benchmarks.bench_soap_scan import build_transcript
+
+EMAIL = "sse-test@example.com"
+PASSWORD = "sse-test-password"
+
+
+async def authenticate(client: httpx.AsyncClient):
+    response = await client.post(
+        "/api/auth/register",
+        json={"email": EMAIL, "full_name": "SSE Test", "password": PASSWORD},
+    )
+    if response.status_code not in (200, 400):
+        response.raise_for_status()
+    response = await client.post("/api/auth/token", data={"username": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+async def create_transcription(client: httpx.AsyncClient, chars: int) -> str:
+    response = await client.post("/api/transcribe/start", json={"specialty": "PRIMARY_CARE"})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    segments = [
+        {"start_time": float(index), "end_time": float(index + 1), "text": sentence + ".", "confidence": 0.95}
+        for index, sentence in enumerate(build_transcript(chars).split(". "))
+    ]
+    response = await client.post(f"/api/transcribe/{job_id}/segments", json=segments)
+    response.raise_for_status()
+    response = await client.post(f"/api/transcribe/{job_id}/complete")
+    response.raise_for_status()
+    return response.json()["_id"]
+
+
+async def generate(client: httpx.AsyncClient, request):
+    start = time.perf_counter()
+    response = await client.post("/api/notes/generate", json=request)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def generate_stream(client: httpx.AsyncClient, request):
+    start = time.perf_counter()
+    first = None
+    event = None
+    async with client.stream("POST", "/api/notes/generate/stream", json=request) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event in ("token", "section") and first is None:
+                    first = time.perf_counter() - start
+                elif event == "error":
+                    raise RuntimeError(json.loads(line[len("data: "):])["detail"])
+    return first, time.perf_counter() - start
+
+
+async def run(url: str, runs: int, chars: int):
+    async with httpx.AsyncClient(base_url=url, timeout=300) as client:
+        await authenticate(client)
+        request = {"transcription_id": await create_transcription(client, chars), "force_regenerate": True}
+
+        print(f"{'endpoint':<18} {'p50 first ms':>13} {'p99 first ms':>13} {'p50 total ms':>13}")
+        for label, call in (("generate", generate), ("generate/stream", generate_stream)):
+            firsts, totals = [], []
+            for _ in range(runs):
+                first, total = await call(client, request)
+                firsts.append(first)
+                totals.append(total)
+            print(
+                f"{label:<18} {percentile(firsts, 50) * 1000:>13.1f} "
+                f"{percentile(firsts, 99) * 1000:>13.1f} {percentile(totals, 50) * 1000:>13.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--chars", type=int, default=3000, help="Transcript length")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.runs, args.chars))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Accuracy and throughput benchmark for the structured vitals and dosage extractor.
+
+Scores extract_structured against the annotated encounters in
+benchmarks/data/structured_corpus.jsonl (per-field vitals accuracy and
+medication precision/recall), then measures notes per second on one core
+for note-sized transcripts built from the corpus plus filler conversation.
+Exits non-zero if throughput falls below --target.
+
+Usage (from backend/):
+    python -m benchmarks.bench_structured --target 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.bench_soap_scan import build_transcript
+from nlp.structured import extract_structured
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "structured_corpus.jsonl")
+
+MEDICATION_FIELDS = ["drug", "dose", "unit", "route", "frequency"]
+
+
+def load_corpus(path: str = CORPUS):
+    with open(path) as corpus:
+        return [json.loads(line) for line in corpus if line.strip()]
+
+
+def score(cases):
+    vitals_correct = vitals_total = 0
+    true_positives = predicted = expected = 0
+    for case in cases:
+        findings = extract_structured(case["text"])
+        found = findings.vitals._asdict()
+        for field, value in found.items():
+            vitals_total += 1
+            vitals_correct += case["vitals"].get(field) == value
+
+        medications = {
+            tuple(medication._asdict()[field] for field in MEDICATION_FIELDS)
+            for medication in findings.medications
+        }
+        gold = {tuple(medication[field] for field in MEDICATION_FIELDS) for medication in case["medications"]}
+        true_positives += len(medications & gold)
+        predicted += len(medications)
+        expected += len(gold)
+    return (
+        vitals_correct / vitals_total,
+        true_positives / predicted if predicted else 1.0,
+        true_positives / expected if expected else 1.0,
+    )
+
+
+def build_notes(cases, count: int, chars: int, seed: int = 0):
+    # Annotated snippets scattered through a note-length conversation
+    rng = random.Random(seed)
+    notes = []
+    for index in range(count):
+        filler = build_transcript(chars, seed=index)
+        snippets = [case["text"] for case in rng.sample(cases, 3)]
+        cut = len(filler) // 3
+        notes.append(" ".join([filler[:cut], snippets[0], filler[cut:2 * cut], snippets[1], filler[2 * cut:], snippets[2]]))
+    return notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--chars", type=int, default=6000, help="Filler characters per note")
+    parser.add_argument("--target", type=float, default=1000, help="Minimum notes/sec/core")
+    args = parser.parse_args()
+
+    cases = load_corpus()
+    vitals_accuracy, precision, recall = score(cases)
+    print(f"{len(cases)} annotated encounters")
+    print(f"vitals field accuracy {vitals_accuracy:.1%}, medication precision {precision:.1%}, recall {recall:.1%}")
+
+    notes = build_notes(cases, args.notes, args.chars)
+    extract_structured(notes[0])
+    start = time.perf_counter()
+    for note in notes:
+        extract_structured(note)
+    elapsed = time.perf_counter() - start
+    throughput = len(notes) / elapsed
+    mean_chars = sum(len(note) for note in notes) / len(notes)
+    print(f"{throughput:.0f} notes/sec/core ({mean_chars:.0f} chars/note, target {args.target:.0f})")
+    if throughput < args.target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
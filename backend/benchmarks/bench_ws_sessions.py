@@ -0,0 +1,149 @@
+"""
+Load test for live transcription over WebSockets.
+
+Opens many concurrent sessions on /api/transcribe/stream, each streaming
+100 ms frames of silent 16 kHz PCM at real-time pace (or faster with
+--speed), and reads results while it sends. Reports how many sessions were
+held at once, how they ended, the lag between sending the audio that
+completes an utterance and receiving its final segment, and how often the
+server paused a client. Run the API with STREAM_ENGINE=fake so the load is
+on the server and not on a transcription service.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.bench_ws_sessions --url http://localhost:8000 --sessions 300 --seconds 30
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import time
+from collections import Counter
+
+import httpx
+import websockets
+
+from benchmarks.bench_batching import percentile
+
+EMAIL = "ws-test@example.com"
+PASSWORD = "ws-test-password"
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.1
+FRAME = bytes(int(SAMPLE_RATE * FRAME_SECONDS) * 2)
+
+
+async def authenticate(url: str) -> str:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        response = await client.post(
+            "/api/auth/register",
+            json={"email": EMAIL, "full_name": "WebSocket Test", "password": PASSWORD},
+        )
+        if response.status_code not in (200, 400):
+            response.raise_for_status()
+        response = await client.post("/api/auth/token", data={"username": EMAIL, "password": PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+
+class Stats:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.outcomes = Counter()
+        self.lags = []
+        self.finals = 0
+        self.partials = 0
+        self.pauses = 0
+
+
+async def session(ws_url: str, seconds: float, speed: float, stats: Stats):
+    sent_audio = []  # audio seconds sent so far, one entry per frame
+    sent_at = []  # when each frame was sent
+    paused = asyncio.Event()
+    paused.set()
+    try:
+        async with websockets.connect(ws_url, max_queue=None) as ws:
+            started = json.loads(await ws.recv())
+            if started.get("type") != "started":
+                raise RuntimeError(f"Unexpected first message {started}")
+            stats.active += 1
+            stats.peak = max(stats.peak, stats.active)
+
+            async def send():
+                begin = time.perf_counter()
+                for index in range(int(seconds / FRAME_SECONDS)):
+                    await paused.wait()
+                    await ws.send(FRAME)
+                    sent_audio.append((index + 1) * FRAME_SECONDS)
+                    sent_at.append(time.perf_counter())
+                    delay = begin + (index + 1) * FRAME_SECONDS / speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await ws.send(json.dumps({"type": "end"}))
+
+            sender = asyncio.ensure_future(send())
+            try:
+                async for raw in ws:
+                    message = json.loads(raw)
+                    if message["type"] == "final":
+                        stats.finals += 1
+                        end = message["segment"]["end_time"]
+                        position = min(bisect.bisect_left(sent_audio, end - 1e-6), len(sent_at) - 1)
+                        stats.lags.append(time.perf_counter() - sent_at[position])
+                    elif message["type"] == "partial":
+                        stats.partials += 1
+                    elif message["type"] == "backpressure":
+                        if message["paused"]:
+                            stats.pauses += 1
+                            paused.clear()
+                        else:
+                            paused.set()
+                    elif message["type"] == "completed":
+                        break
+                await sender
+            finally:
+                sender.cancel()
+                stats.active -= 1
+        stats.outcomes["completed"] += 1
+    except websockets.ConnectionClosed as e:
+        stats.outcomes[f"closed {e.code}"] += 1
+    except Exception as e:
+        stats.outcomes[type(e).__name__] += 1
+
+
+async def run(url: str, sessions: int, seconds: float, speed: float, ramp: float):
+    token = await authenticate(url)
+    ws_url = url.replace("http", "ws", 1) + f"/api/transcribe/stream?token={token}&sample_rate={SAMPLE_RATE}"
+    stats = Stats()
+
+    async def staggered(index: int):
+        await asyncio.sleep(ramp * index / sessions)
+        await session(ws_url, seconds, speed, stats)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(staggered(index) for index in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    print(f"sessions: {sessions}, peak concurrent: {stats.peak}, elapsed: {elapsed:.1f}s")
+    print(f"outcomes: {dict(stats.outcomes)}")
+    print(f"finals: {stats.finals}, partials: {stats.partials}, backpressure pauses: {stats.pauses}")
+    if stats.lags:
+        print(
+            f"final segment lag: p50 {percentile(stats.lags, 50) * 1000:.1f} ms, "
+            f"p99 {percentile(stats.lags, 99) * 1000:.1f} ms, max {max(stats.lags) * 1000:.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=30, help="Audio per session")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiple of real time to send audio at")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions are opened")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.sessions, args.seconds, args.speed, args.ramp))
+
+
+if __name__ == "__main__":
+    main()
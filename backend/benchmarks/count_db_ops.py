@@ -0,0 +1,150 @@
+"""
+Count the MongoDB commands each service-layer mutation issues.
+
+Registers a pymongo command listener, drives the services behind the note,
+transcription and user endpoints against a separate benchmark database, and
+exits non-zero if any of them issues more round trips than expected. The
+same check runs as part of the test suite (tests/test_db_ops.py) whenever
+MongoDB is reachable.
+
+Usage (from backend/, with MongoDB running at MONGODB_URL):
+    python -m benchmarks.count_db_ops
+"""
+import asyncio
+import sys
+from collections import Counter
+
+from bson import ObjectId
+from pymongo import monitoring
+
+from core.config import settings
+
+settings.DATABASE_NAME = f"{settings.DATABASE_NAME}_bench"
+# Transcription jobs use the simulated transcript instead of downloading audio
+settings.ASR_ENGINE = "aws"
+
+from models.note import ClinicalNote  # noqa: E402
+from models.transcription import TranscriptionSegment  # noqa: E402
+from models.user import UserUpdate  # noqa: E402
+from services import database  # noqa: E402
+from services.drafts import append_segments  # noqa: E402
+from services.notes import generate_soap_note, save_note  # noqa: E402
+from services.transcription import (  # noqa: E402
+    get_transcription_result,
+    process_transcription_job,
+    start_transcription,
+)
+from services.users import update_user  # noqa: E402
+
+# Commands that are not part of serving a request
+IGNORED_COMMANDS = {"ping", "hello", "isMaster", "ismaster", "endSessions", "killCursors"}
+
+# Maximum database round trips per operation
+EXPECTED_OPS = {
+    "start_transcription": 1,
+    "process_transcription_job": 2,  # Transcription read, completion write
+    "get_transcription_result": 1,
+    "generate_soap_note": 4,  # Transcription read, SOAP cache lookup and fill, insert
+    "save_note (insert)": 1,
+    "save_note (update)": 1,
+    "update_user": 1,  # Renames do not touch token versions
+    "append_segments": 3,  # Transcription read, versioned segments and state write, note upsert
+}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts started commands by name."""
+
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.commands = Counter()
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+
+async def measure(label, coroutine, results):
+    counter.reset()
+    value = await coroutine
+    results[label] = dict(counter.commands)
+    return value
+
+
+async def run():
+    results = {}
+    await database.connect_to_mongo()
+    user_id = str(
+        (await database.get_user_collection().insert_one({
+            "email": f"ops-{ObjectId()}@example.com",
+            "full_name": "Op Counter",
+            "hashed_password": "x",
+            "is_active": True,
+            "role": "clinician",
+        })).inserted_id
+    )
+
+    job = await measure("start_transcription", start_transcription(user_id), results)
+    # What the job runner does for an uploaded recording
+    await measure(
+        "process_transcription_job", process_transcription_job({"job_id": job.job_id}), results
+    )
+    transcription = await measure(
+        "get_transcription_result", get_transcription_result(job.job_id, user_id), results
+    )
+    note = await measure(
+        "generate_soap_note", generate_soap_note(str(transcription.id), user_id), results
+    )
+
+    new_note = ClinicalNote(
+        user_id=user_id,
+        transcription_id=str(transcription.id),
+        subjective="S", objective="O", assessment="A", plan="P",
+    )
+    await measure("save_note (insert)", save_note(new_note, user_id), results)
+    note.subjective = "Updated subjective."
+    await measure(
+        "save_note (update)",
+        save_note(ClinicalNote(**note.dict(by_alias=True)), user_id),
+        results,
+    )
+    await measure("update_user", update_user(user_id, UserUpdate(full_name="Renamed")), results)
+
+    live = await start_transcription(user_id)
+    segment = TranscriptionSegment(start_time=0.0, end_time=4.0, text="History of hypertension.", confidence=0.9)
+    await append_segments(live.job_id, user_id, [segment])
+    segment = TranscriptionSegment(start_time=4.0, end_time=8.0, text="Blood pressure 150/90.", confidence=0.9)
+    await measure("append_segments", append_segments(live.job_id, user_id, [segment]), results)
+    return results
+
+
+def over_budget(results):
+    """Operations that issued more commands than EXPECTED_OPS allows."""
+    return [label for label, commands in results.items() if sum(commands.values()) > EXPECTED_OPS[label]]
+
+
+def main():
+    results = asyncio.run(run())
+    failed = over_budget(results)
+    for label, commands in results.items():
+        total = sum(commands.values())
+        ok = label not in failed
+        detail = ", ".join(f"{name}={count}" for name, count in sorted(commands.items()))
+        print(f"{'ok ' if ok else 'FAIL'} {label:<26} {total} ops ({detail})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "CHANGE_THIS_TO_A_RANDOM_SECRET"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    AUTH_TOKEN_MODE: str = "claims"  # "claims" (role/status in token) or "lookup"
+    TOKEN_VERSION_REFRESH_SECONDS: float = 5  # Revocation propagation across nodes
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 30  # Max staleness of a cached user record
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent bcrypt operations
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Waiting bcrypt operations before 503
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -17,15 +24,71 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "scribely"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    VERIFY_QUERY_PLANS: bool = False  # Fail startup if a hot query does a COLLSCAN
     
     # AWS
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "us-east-1"
+    AWS_ENDPOINT_URL: str = ""  # S3-compatible stand-in (MinIO, moto); empty = AWS
+    AWS_S3_BUCKET: str = "scribely-audio"
+    AUDIO_UPLOAD_PART_SIZE_MB: int = 8  # Multipart upload part size; S3 needs at least 5
+    AWS_MAX_POOL_CONNECTIONS: int = 50  # Pooled connections per client, and AWS call threads
+    AWS_MAX_ATTEMPTS: int = 3  # Including the first; retries use botocore's standard mode
+    AWS_CONNECT_TIMEOUT_SECONDS: float = 5
+    AWS_READ_TIMEOUT_SECONDS: float = 60
+    
+    # Speech-to-text for uploaded recordings
+    ASR_ENGINE: str = "aws"  # "aws" (Transcribe Medical) or "local" (offline model on CPU)
+    ASR_MODEL_PATH: str = ""  # CTranslate2 (faster-whisper) model directory for the local engine
+    ASR_CORES: int = 0  # Cores for local decoding; 0 = half in the API (NLP gets the rest), all in worker.py
+    ASR_WORKERS: int = 0  # Local decoding processes; 0 = one per ASR core
+    ASR_COMPUTE_TYPE: str = "int8"  # CTranslate2 weight type: int8, int8_float32, float32
+    ASR_BEAM_SIZE: int = 1
+    ASR_MAX_CHUNK_SECONDS: float = 30  # Recordings are cut at pauses into chunks up to this long
+    ASR_MIN_SILENCE_MS: int = 400  # Shortest pause a chunk may end in
+    ASR_CHUNK_TIMEOUT_SECONDS: float = 300  # A slower chunk restarts the decoding pool
+    
+    # Background jobs
+    JOB_WORKER_CONCURRENCY: int = 4  # Jobs run at once per process; 0 = this process runs none
+    JOB_LEASE_SECONDS: float = 30  # A job whose runner stops renewing this is run again elsewhere
+    JOB_POLL_SECONDS: float = 1  # How often idle runners look for due jobs
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 5  # Doubles with every failed attempt, up to 5 minutes
+    JOB_RETENTION_DAYS: int = 7  # Lifetime of finished job records
+    
+    # Live transcription (WebSocket)
+    STREAM_ENGINE: str = "fake"  # "fake" (scripted, for development) or "aws" (Transcribe streaming)
+    STREAM_MAX_SESSIONS: int = 500  # Concurrent live sessions per worker process
+    STREAM_AUDIO_QUEUE_FRAMES: int = 50  # Frames buffered per session before the client is paused
+    STREAM_RESULT_QUEUE_SIZE: int = 100  # Results buffered per session; partials are dropped beyond
+    STREAM_SEND_TIMEOUT_SECONDS: float = 10  # A client this far behind on results is disconnected
+    STREAM_MAX_FRAME_BYTES: int = 65536
     
     # Hugging Face
     HUGGINGFACE_API_TOKEN: str = ""
     
+    # NLP
+    NLP_MODEL_DIR: str = ""  # One subdirectory per specialty; empty = rule-based only
+    NLP_MAX_LENGTH: int = 512
+    NLP_BACKEND: str = "eager"  # "eager" (PyTorch) or "onnx" (ONNX Runtime)
+    NLP_ONNX_QUANTIZE: bool = True  # int8 dynamic quantization for the onnx backend
+    NLP_INTRA_OP_THREADS: int = 0  # Threads per inference; 0 = the NLP cores split between workers
+    NLP_BATCH_MAX_SIZE: int = 8  # Transcripts per batched inference
+    NLP_BATCH_MAX_WAIT_MS: float = 20  # Longest wait for a batch to fill
+    NLP_BATCH_QUEUE_DEPTH: int = 256  # Waiting requests before 503
+    NLP_CHUNK_MAX_TOKENS: int = 0  # Longer transcripts are processed in chunks; 0 = the model's input limit
+    NLP_CHUNK_OVERLAP_SEGMENTS: int = 1
+    NLP_CORES: int = 0  # Cores for the NLP workers; 0 = all, or half when ASR_ENGINE is "local"
+    NLP_WORKERS: int = 0  # NLP worker processes; 0 = one per NLP core
+    NLP_TASK_TIMEOUT_SECONDS: float = 120  # A slower task restarts the worker pool
+    NLP_LEXICON_PATH: str = ""  # Compiled clinical lexicon; empty = bundled lexicon
+    NLP_RULE_PACK_DIR: str = ""  # Per-specialty rule packs; empty = bundled packs
+    NLP_RULE_PACK_CHECK_SECONDS: float = 2  # How often rule pack files are checked for changes
+    SOAP_CACHE_SIZE: int = 1024  # In-process entries
+    SOAP_CACHE_TTL_DAYS: int = 30  # Lifetime of persisted entries
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
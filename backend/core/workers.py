@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Worker processes are started from a clean server process instead of forked
+# from the API process, whose threads (event loop, Mongo and AWS pools) may
+# hold locks a forked child would inherit locked
+MP_CONTEXT = multiprocessing.get_context("forkserver")
+
+
+def core_share(pools: int) -> int:
+    """Cores for one of pools worker pools sharing this machine equally."""
+    return max(1, (os.cpu_count() or 1) // pools)
+
+
+class WorkerTaskTimeout(Exception):
+    """Raised when a task runs longer than its worker pool's task timeout."""
+
+
+class WorkerPool:
+    """
+    Process pool for CPU-bound work, with timeouts and crash recovery.
+
+    Shared by the NLP executor (SOAP models) and the local speech-to-text
+    engine (Whisper decoding). A pool is given a number of cores, all of
+    them by default, and starts one worker process per core unless told
+    otherwise, splitting the cores between the workers' threads. When both
+    pools run in one API process each gets core_share(2), half the cores,
+    so together they do not oversubscribe the machine; the standalone job
+    worker gives the speech-to-text pool every core.
+
+    Every worker process runs initializer(*initargs) once, e.g. to load a
+    model. A task waits for a free worker and is then bounded by a
+    timeout; a running task that overruns it has its pool torn down, since
+    a stuck worker cannot be interrupted, and a pool broken by a crashed
+    worker is replaced with a fresh one. Tasks that were merely caught in
+    a restart are retried once on the new pool.
+    """
+
+    # Used in log messages
+    name = "worker"
+
+    # Raised when a task times out
+    timeout_error = WorkerTaskTimeout
+
+    def __init__(
+        self,
+        workers: int = 0,
+        cores: int = 0,
+        task_timeout: float = 120,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ):
+        self.cores = cores or os.cpu_count() or 1
+        self.workers = workers or self.cores
+        # Threads each worker may run without oversubscribing the pool's cores
+        self.threads_per_worker = max(1, self.cores // self.workers)
+        self.task_timeout = task_timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # A task is handed to the pool only once a worker is free for it
+        self._slots = asyncio.Semaphore(self.workers)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.restarts = 0
+        self.total_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=self.initializer,
+                initargs=self.initargs,
+                mp_context=MP_CONTEXT,
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, reason: str) -> None:
+        # Another task may already have replaced the pool
+        if self._pool is not pool:
+            return
+        logger.warning(f"Restarting {self.name} worker pool: {reason}")
+        self._pool = None
+        self.restarts += 1
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run func(*args) in a worker process.
+
+        Tasks wait for a free worker first; the timeout only starts once
+        the task is handed to one, so a long queue does not time tasks out
+        or restart the pool under the tasks that are running.
+
+        Args:
+            func: Module-level (picklable) function
+            args: Picklable arguments
+            timeout: Seconds before giving up; defaults to the pool's task_timeout
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            WorkerTaskTimeout: (timeout_error) If the task did not finish in time
+        """
+        timeout = timeout or self.task_timeout
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            async with self._slots:
+                for attempt in range(2):
+                    pool = self._get_pool()
+                    try:
+                        result = await asyncio.wait_for(loop.run_in_executor(pool, func, *args), timeout)
+                        self.completed += 1
+                        return result
+                    except asyncio.TimeoutError:
+                        self.timed_out += 1
+                        self._discard_pool(pool, f"{getattr(func, '__name__', func)} exceeded {timeout}s")
+                        raise self.timeout_error(f"{self.name} task timed out after {timeout}s")
+                    except BrokenProcessPool:
+                        self._discard_pool(pool, "a worker process died")
+                        if attempt:
+                            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, task counters and pool restarts."""
+        finished = self.completed + self.failed
+        return {
+            "cores": self.cores,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "restarts": self.restarts,
+            "mean_task_seconds": self.total_seconds / finished if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
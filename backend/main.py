@@ -1,18 +1,57 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from api.routes import transcribe, notes, auth, users
 from core.config import settings
+from nlp.registry import model_registry
+from nlp.rule_packs import rule_packs
+from services.pagination import NEXT_CURSOR_HEADER
+from services.hashing import HashingPoolBusy, hash_pool
+from services.revocation import token_versions
+from services.aws import aws_clients
+from services.jobs import job_runner
+from services.live import live_sessions
+from services.notes import RULE_PACK_OPTIONS, soap_batcher, nlp_executor
+from services.transcription import local_asr
+from services.database import (
+    connect_to_mongo,
+    close_mongo_connection,
+    ensure_indexes,
+    verify_query_plans,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Load NLP models, establish connections
     print("Starting up the application...")
+    await connect_to_mongo()
+    await ensure_indexes()
+    if settings.VERIFY_QUERY_PLANS:
+        await verify_query_plans()
+    await token_versions.start(settings.TOKEN_VERSION_REFRESH_SECONDS)
+    aws_clients.start()
+    # Drafts and cache keys use the rule packs in this process too
+    rule_packs.configure(**RULE_PACK_OPTIONS)
+    # Models load in the NLP worker processes; this process only mirrors their status
+    model_registry.mirror(await nlp_executor.start(), model_dir=settings.NLP_MODEL_DIR)
+    soap_batcher.start()
+    if settings.ASR_ENGINE == "local":
+        local_asr.start()
+    job_runner.start()
     yield
     # Shutdown: Release resources
     print("Shutting down the application...")
+    await job_runner.stop()
+    await token_versions.stop()
+    await soap_batcher.stop()
+    nlp_executor.shutdown()
+    local_asr.shutdown()
+    close_mongo_connection()
+    aws_clients.close()
+    hash_pool.shutdown()
 
 app = FastAPI(
     title="Scribely API",
@@ -28,8 +67,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(request: Request, exc: HashingPoolBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Include API routes
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -40,5 +88,21 @@ app.include_router(notes.router, prefix="/api/notes", tags=["Clinical Notes"])
 async def root():
     return {"message": "Welcome to Scribely API! Visit /docs for API documentation."}
 
+@app.get("/health/ready")
+async def readiness():
+    """Report whether NLP models are loaded and warmed up, with NLP queue metrics."""
+    model_status = model_registry.status()
+    status_code = status.HTTP_200_OK if model_status["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    content = {
+        **model_status,
+        "rule_packs": rule_packs.status(),
+        "executor": nlp_executor.stats(),
+        "batcher": soap_batcher.stats(),
+        "live": live_sessions.stats(),
+        "jobs": job_runner.stats(),
+        "local_asr": local_asr.stats(),
+    }
+    return JSONResponse(status_code=status_code, content=content)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -9,6 +9,27 @@ class GenerateNoteRequest(BaseModel):
     transcription_id: PyObjectId
     patient_id: Optional[str] = None
     specialty: Optional[str] = "PRIMARY_CARE"
+    force_regenerate: bool = False  # Bypass the generated-sections cache
+
+
+class VitalSigns(BaseModel):
+    bp_systolic: Optional[int] = None
+    bp_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    respiratory_rate: Optional[int] = None
+    temperature: Optional[float] = None
+    temperature_unit: Optional[str] = None  # "F" or "C"
+    spo2: Optional[int] = None
+    weight: Optional[float] = None
+    weight_unit: Optional[str] = None  # "kg" or "lb"
+
+
+class MedicationOrder(BaseModel):
+    drug: str
+    dose: float
+    unit: str
+    route: Optional[str] = None
+    frequency: Optional[str] = None
 
 
 class ClinicalNote(BaseModel):
@@ -28,6 +49,13 @@ class ClinicalNote(BaseModel):
     specialty: str = "PRIMARY_CARE"
     tags: List[str] = []
     
+    # Clinical entities found in the note, computed when it is generated or saved
+    analysis: Optional[Dict[str, List[str]]] = None
+    
+    # Vitals and dosed medications found in the transcript
+    vitals: Optional[VitalSigns] = None
+    medications: List[MedicationOrder] = []
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -39,4 +67,30 @@ class ClinicalNote(BaseModel):
 
 class NoteResponse(ClinicalNote):
     confidence_score: Optional[float] = None
-    analysis: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+
+
+class NoteSummary(BaseModel):
+    """Slim listing view of a note, without the SOAP sections or analysis."""
+    id: PyObjectId = Field(alias="_id")
+    patient_id: Optional[str] = None
+    transcription_id: PyObjectId
+    status: str = "draft"
+    specialty: str = "PRIMARY_CARE"
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
+class DraftUpdate(BaseModel):
+    """Result of adding live transcript segments to a draft note."""
+    note_id: PyObjectId
+    segments: int  # Segments in the draft so far
+    sections: Dict[str, str]  # Sections whose text changed, with their new text
+    
+    class Config:
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
@@ -8,4 +8,8 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
-    username: Optional[str] = None 
\ No newline at end of file
+    username: Optional[str] = None
+    user_id: Optional[str] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+    version: Optional[int] = None 
\ No newline at end of file
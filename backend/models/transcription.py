@@ -28,6 +28,8 @@ class TranscriptionResponse(BaseModel):
     transcript: Optional[str] = None
     segments: Optional[List[TranscriptionSegment]] = []
     error: Optional[str] = None
+    audio_key: Optional[str] = None  # S3 object key of uploaded audio
+    draft_note_id: Optional[PyObjectId] = None  # Draft note kept up to date while live
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
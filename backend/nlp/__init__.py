@@ -1,3 +1,3 @@
-from nlp.soap import extract_soap_sections
+from nlp.soap import extract_soap_sections, extract_soap_sections_batch
 
-__all__ = ["extract_soap_sections"] 
\ No newline at end of file
+__all__ = ["extract_soap_sections", "extract_soap_sections_batch"]
@@ -0,0 +1,235 @@
+import argparse
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Type
+
+logger = logging.getLogger(__name__)
+
+# Where the exported (and optionally quantized) ONNX graphs live inside a model directory
+ONNX_SUBDIR = "onnx"
+ONNX_INT8_SUBDIR = "onnx-int8"
+
+# Graphs produced by the seq2seq export
+ONNX_GRAPHS = ["encoder_model.onnx", "decoder_model.onnx", "decoder_with_past_model.onnx"]
+
+# Lock file, inside a model directory, held while exporting it
+EXPORT_LOCK_FILE = ".onnx-export.lock"
+
+
+class InferenceBackend:
+    """Loads a local seq2seq model directory as a text2text-generation pipeline."""
+
+    name = ""
+
+    def __init__(self, intra_op_threads: int = 0):
+        self.intra_op_threads = intra_op_threads
+
+    def load(self, path: str, max_length: int) -> Any:
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """PyTorch eager inference on CPU."""
+
+    name = "eager"
+
+    def load(self, path: str, max_length: int) -> Any:
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+
+        if self.intra_op_threads:
+            torch.set_num_threads(self.intra_op_threads)
+
+        tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+        model = AutoModelForSeq2SeqLM.from_pretrained(path, local_files_only=True)
+        model.eval()
+        return pipeline(
+            "text2text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            device=-1,
+            max_length=max_length,
+            truncation=True,
+        )
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime inference on CPU.
+
+    The model is exported to ONNX the first time it is loaded and, with
+    quantize enabled, its graphs are int8 dynamically quantized. Both are
+    saved next to the original weights so later loads skip the export.
+    """
+
+    name = "onnx"
+
+    def __init__(self, intra_op_threads: int = 0, quantize: bool = True):
+        super().__init__(intra_op_threads)
+        self.quantize = quantize
+
+    def load(self, path: str, max_length: int) -> Any:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        from transformers import AutoTokenizer, pipeline
+
+        onnx_dir = ensure_onnx_export(path, quantize=self.quantize)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.intra_op_threads or os.cpu_count() or 1
+        # Generation is a sequence of small dependent ops; parallelism within ops pays, across does not
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+
+        tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            onnx_dir,
+            session_options=options,
+            provider="CPUExecutionProvider",
+            local_files_only=True,
+        )
+        return pipeline(
+            "text2text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            device=-1,
+            max_length=max_length,
+            truncation=True,
+        )
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    EagerBackend.name: EagerBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def get_backend(name: str, **options: Any) -> InferenceBackend:
+    """
+    Build the inference backend selected by name.
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown NLP backend {name!r}, expected one of {sorted(BACKENDS)}")
+    backend_class = BACKENDS[name]
+    if backend_class is not OnnxBackend:
+        options.pop("quantize", None)
+    return backend_class(**options)
+
+
+@contextmanager
+def _export_lock(path: str) -> Iterator[None]:
+    # Serializes exports of one model across processes
+    with open(os.path.join(path, EXPORT_LOCK_FILE), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _publish_dir(target: str, build: Callable[[str], None]) -> None:
+    """
+    Create directory target with build(tmp_dir) unless it already exists.
+
+    The files are written to a temporary directory next to target, which
+    is renamed into place once complete, so target is either missing or
+    whole: a process that sees it never reads a graph still being written.
+    """
+    if os.path.isdir(target):
+        return
+    tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(target)}-", dir=os.path.dirname(target))
+    try:
+        build(tmp_dir)
+        os.replace(tmp_dir, target)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def ensure_onnx_export(path: str, quantize: bool = True) -> str:
+    """
+    Export a seq2seq model directory to ONNX, quantizing it if requested.
+
+    Safe to call from several processes at once: one exports while the
+    others wait for it, and the results are published atomically.
+
+    Args:
+        path: Local Hugging Face model directory
+        quantize: Apply int8 dynamic quantization to every graph
+
+    Returns:
+        Directory holding the ONNX model to load
+    """
+    onnx_dir = os.path.join(path, ONNX_SUBDIR)
+    int8_dir = os.path.join(path, ONNX_INT8_SUBDIR)
+    if os.path.isdir(onnx_dir) and (not quantize or os.path.isdir(int8_dir)):
+        return int8_dir if quantize else onnx_dir
+
+    def export(save_dir: str) -> None:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        logger.info(f"Exporting {path} to ONNX")
+        model = ORTModelForSeq2SeqLM.from_pretrained(path, export=True, local_files_only=True)
+        model.save_pretrained(save_dir)
+
+    def quantize_graphs(save_dir: str) -> None:
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        logger.info(f"Quantizing {onnx_dir} to int8")
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for graph in ONNX_GRAPHS:
+            if not os.path.exists(os.path.join(onnx_dir, graph)):
+                continue
+            quantizer = ORTQuantizer.from_pretrained(onnx_dir, file_name=graph)
+            quantizer.quantize(save_dir=save_dir, quantization_config=config)
+        # Quantized graphs are saved with a "_quantized" suffix; give them the standard names
+        for graph in ONNX_GRAPHS:
+            quantized = os.path.join(save_dir, graph.replace(".onnx", "_quantized.onnx"))
+            if os.path.exists(quantized):
+                os.replace(quantized, os.path.join(save_dir, graph))
+
+    with _export_lock(path):
+        _publish_dir(onnx_dir, export)
+        if not quantize:
+            return onnx_dir
+        _publish_dir(int8_dir, quantize_graphs)
+    return int8_dir
+
+
+def prepare_model_dir(model_dir: str, backend: str = "eager", quantize: bool = True) -> None:
+    """
+    Do the one-off work for every model under model_dir before workers load them.
+
+    For the onnx backend this is the export (and quantization), which is
+    then done once by the caller instead of raced by every worker process.
+    """
+    if backend != OnnxBackend.name or not model_dir or not os.path.isdir(model_dir):
+        return
+    for name in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, name)
+        if os.path.isdir(path):
+            try:
+                ensure_onnx_export(path, quantize=quantize)
+            except Exception as e:
+                # Loading reports the failure per specialty
+                logger.error(f"Error exporting {path} to ONNX: {str(e)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a SOAP model directory to ONNX")
+    parser.add_argument("model_path", help="Local Hugging Face model directory")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip int8 quantization")
+    args = parser.parse_args()
+    print(ensure_onnx_export(args.model_path, quantize=not args.no_quantize))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from nlp.executor import NlpExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BatchQueueFull(Exception):
+    """Raised when the batching queue has reached its depth limit."""
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching queue in front of the SOAP extraction stage.
+
+    Requests are collected until max_batch_size items are waiting or the
+    oldest has waited max_wait_ms, then run together through run_batch off
+    the event loop (in a worker process when an executor is given, otherwise
+    in a thread), and each caller gets its own result back. Submissions
+    beyond max_queue_depth are rejected instead of queued.
+
+    Up to max_in_flight batches run at once, by default one per executor
+    worker process, so every worker serves requests. The next batch is only
+    collected once a slot is free, so requests arriving while all workers
+    are busy accumulate into fuller batches.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Tuple[str, str]]], List[Dict[str, str]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20,
+        max_queue_depth: int = 256,
+        executor: Optional[NlpExecutor] = None,
+        max_in_flight: int = 0,
+    ):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_in_flight = max_in_flight or (executor.workers if executor is not None else 1)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = max_queue_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+    async def submit(self, transcript: str, specialty: str) -> Dict[str, str]:
+        """
+        Queue one transcript and wait for its SOAP sections.
+
+        Raises:
+            BatchQueueFull: If max_queue_depth requests are already waiting
+        """
+        if self._queue is None:
+            self.start()
+        if self._queue.qsize() >= self.max_queue_depth:
+            self.rejected += 1
+            raise BatchQueueFull("SOAP generation queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((transcript, specialty), future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Tuple[str, str], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            pending = [(item, future) for item, future in batch if not future.cancelled()]
+            if not pending:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._dispatch(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, pending: List[Tuple[Tuple[str, str], asyncio.Future]]) -> None:
+        try:
+            results = await self._execute([item for item, _ in pending])
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"Error running SOAP batch of {len(pending)}: {str(e)}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+        self.batches += 1
+        self.items += len(pending)
+
+    async def _execute(self, items: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        if self.executor is not None:
+            return await self.executor.run(self.run_batch, items)
+        return await asyncio.to_thread(self.run_batch, items)
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the batching loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            for task in self._running:
+                task.cancel()
+            await asyncio.gather(*self._running, return_exceptions=True)
+            self._task = None
+            self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batching counters."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": len(self._running),
+            "max_in_flight": self.max_in_flight,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+        }
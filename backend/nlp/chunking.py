@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from nlp.executor import NlpExecutor
+from nlp.registry import model_registry
+from nlp.soap import extract_soap_sections, placeholder_lines
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ["subjective", "objective", "assessment", "plan"]
+
+# Sentence boundary used when a transcript has no stored segments
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# "1. Hypertension" -> "Hypertension"
+NUMBERED_LINE = re.compile(r"^\s*\d+\.\s*")
+
+
+def split_segments(transcript: str, segments: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    """Segment texts, or the transcript's sentences when no segments are stored."""
+    if segments:
+        return [segment["text"] for segment in segments if segment.get("text")]
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(transcript) if sentence]
+
+
+def chunk_segments(
+    texts: List[str],
+    max_size: int,
+    overlap: int = 1,
+    size: Callable[[str], int] = len
+) -> List[str]:
+    """
+    Pack consecutive segments into chunks of at most max_size.
+
+    Sizes are measured with size (characters by default, or a tokenizer's
+    token count), plus one for the space joining each segment to the next.
+    Chunks only break on segment boundaries, and each chunk after the first
+    repeats the last `overlap` segments of the previous one so that findings
+    spanning a boundary are seen whole by at least one chunk. A single
+    segment longer than max_size becomes a chunk of its own.
+    """
+    sizes = [size(text) for text in texts]
+    chunks = []
+    start = 0
+    while start < len(texts):
+        end = start
+        length = 0
+        while end < len(texts) and (end == start or length + sizes[end] + 1 <= max_size):
+            length += sizes[end] + 1
+            end += 1
+        chunks.append(" ".join(texts[start:end]))
+        if end >= len(texts):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def split_long_segments(texts: List[str], max_size: int, size: Callable[[str], int] = len) -> List[str]:
+    """Split segments longer than max_size at word boundaries into pieces that fit."""
+    pieces = []
+    for text in texts:
+        if size(text) + 1 <= max_size:
+            pieces.append(text)
+        else:
+            pieces.extend(chunk_segments(text.split(), max_size, overlap=0, size=size))
+    return pieces
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".")
+
+
+def merge_sections(results: List[Dict[str, str]], placeholders: Set[str]) -> Dict[str, str]:
+    """
+    Merge per-chunk SOAP sections into one note.
+
+    Subjective is merged sentence by sentence and the other sections line by
+    line, keeping the first occurrence of each and dropping placeholders
+    (the filler emitted by chunks that found nothing) when a chunk found
+    real content. Numbered lists are renumbered.
+    """
+    merged = {}
+    for section in SECTIONS:
+        numbered = False
+        units = []
+        seen = set()
+        for result in results:
+            text = result.get(section, "")
+            parts = SENTENCE_BOUNDARY.split(text) if section == "subjective" else text.split("\n")
+            for part in parts:
+                if NUMBERED_LINE.match(part):
+                    numbered = True
+                    part = NUMBERED_LINE.sub("", part)
+                part = part.strip()
+                key = _normalize(part)
+                if key and key not in seen:
+                    seen.add(key)
+                    units.append(part)
+
+        content = [unit for unit in units if unit not in placeholders]
+        if not content:
+            content = units[:1]
+
+        if numbered:
+            merged[section] = "\n".join(f"{i+1}. {unit}" for i, unit in enumerate(content))
+        elif section == "subjective":
+            merged[section] = " ".join(content)
+        else:
+            merged[section] = "\n".join(content)
+    return merged
+
+
+class ChunkedExtractor:
+    """
+    Runs SOAP extraction over long transcripts in parallel chunks.
+
+    Chunks are sized in the tokens of the specialty's model and hold at
+    most its input limit (see ModelRegistry.input_limit), or max_tokens if
+    that is smaller, so the pipeline never truncates one. Transcripts that
+    fit are handed back to the caller's normal path; longer ones are split
+    on segment boundaries with overlap, each chunk is run through the
+    transformer pipeline on the NLP process pool, and the per-chunk
+    sections are merged. Specialties without a model are never chunked:
+    the rule-based extractor has no context limit, and every chunk would
+    render its own canned exam and vitals block.
+    """
+
+    def __init__(self, executor: NlpExecutor, max_tokens: int = 0, overlap: int = 1):
+        self.executor = executor
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+
+    def max_chunk_tokens(self, specialty: str) -> Optional[int]:
+        """Tokens per chunk for the specialty's model, or None if it has no model."""
+        limit = model_registry.input_limit(specialty)
+        if limit is None:
+            return None
+        return min(self.max_tokens, limit) if self.max_tokens else limit
+
+    def needs_chunking(self, transcript: str, specialty: str) -> bool:
+        """Whether the transcript is too long for the specialty's model."""
+        max_tokens = self.max_chunk_tokens(specialty)
+        if max_tokens is None:
+            return False
+        # A token is at least one character, so short transcripts need no tokenizing
+        if len(transcript) <= max_tokens:
+            return False
+        return model_registry.count_tokens(transcript, specialty) > max_tokens
+
+    async def extract(
+        self,
+        transcript: str,
+        specialty: str,
+        segments: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, str]:
+        """Extract and merge SOAP sections chunk by chunk in parallel."""
+        max_tokens = self.max_chunk_tokens(specialty) or len(transcript)
+
+        def size(text: str) -> int:
+            return model_registry.count_tokens(text, specialty)
+
+        texts = split_long_segments(split_segments(transcript, segments), max_tokens, size)
+        chunks = chunk_segments(texts, max_tokens, self.overlap, size)
+        logger.info(
+            f"Extracting SOAP sections from {len(chunks)} chunks of up to {max_tokens} tokens "
+            f"({len(transcript)} chars)"
+        )
+
+        results = await asyncio.gather(*(
+            self.executor.run(extract_soap_sections, chunk, specialty)
+            for chunk in chunks
+        ))
+        return merge_sections(results, placeholder_lines(specialty))
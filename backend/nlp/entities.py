@@ -0,0 +1,33 @@
+from typing import Dict, List
+
+from nlp.lexicon import get_lexicon
+
+# Lexicon category -> key in a note's analysis
+ANALYSIS_KEYS = {
+    "concept": "medical_concepts",
+    "medication": "medications",
+    "diagnosis": "diagnoses",
+    "procedure": "procedures",
+}
+
+
+def extract_entities(text: str, lexicon_path: str = "") -> Dict[str, List[str]]:
+    """
+    Extract clinical entities from note text with the clinical lexicon.
+
+    Negated mentions ("denies chest pain") are left out, and each entity is
+    reported once under its canonical name, in order of first mention.
+
+    Args:
+        text: Note or transcript text
+        lexicon_path: Compiled lexicon to use; empty for the bundled one
+
+    Returns:
+        Dictionary with medical_concepts, medications, diagnoses and procedures
+    """
+    analysis: Dict[str, List[str]] = {key: [] for key in ANALYSIS_KEYS.values()}
+    for match in get_lexicon(lexicon_path).scan(text):
+        found = analysis[ANALYSIS_KEYS[match.category]]
+        if not match.negated and match.canonical not in found:
+            found.append(match.canonical)
+    return analysis
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import queue
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from core.workers import MP_CONTEXT, WorkerPool, WorkerTaskTimeout
+from nlp.backends import prepare_model_dir
+from nlp.registry import model_registry
+from nlp.rule_packs import rule_packs
+
+# How often a stream reader checks whether its task died without finishing the stream
+STREAM_POLL_SECONDS = 0.25
+
+
+class NlpTaskTimeout(WorkerTaskTimeout):
+    """Raised when an NLP task runs longer than the executor's task timeout."""
+
+
+def _init_worker(model_options: Dict[str, Any], rule_pack_options: Dict[str, Any]) -> None:
+    # Each pool process loads its own copy of the models and rule packs once
+    rule_packs.configure(**rule_pack_options)
+    model_registry.load(**model_options)
+
+
+def _worker_status() -> Dict[str, Any]:
+    status = model_registry.status()
+    status["pid"] = os.getpid()
+    return status
+
+
+def _run_streaming(func: Callable[..., Any], channel: Any, args: Tuple[Any, ...]) -> Any:
+    try:
+        return func(*args, channel)
+    finally:
+        # Tells the reader nothing more is coming, however func ended
+        channel.put(None)
+
+
+class NlpExecutor(WorkerPool):
+    """
+    Process pool that runs CPU-bound NLP work off the API event loop.
+
+    The pool is sized to its cores and every worker process loads the
+    SOAP models once in its initializer. Tasks are bounded and restarted
+    as described in WorkerPool.
+    """
+
+    name = "NLP"
+    timeout_error = NlpTaskTimeout
+
+    def __init__(
+        self,
+        workers: int = 0,
+        model_options: Optional[Dict[str, Any]] = None,
+        task_timeout: float = 120,
+        rule_pack_options: Optional[Dict[str, Any]] = None,
+        cores: int = 0,
+    ):
+        super().__init__(workers, cores, task_timeout, initializer=_init_worker)
+        self.model_options = dict(model_options or {"model_dir": ""})
+        self.rule_pack_options = dict(rule_pack_options or {})
+        if not self.model_options.get("intra_op_threads"):
+            # Split the cores between worker processes instead of oversubscribing
+            self.model_options["intra_op_threads"] = self.threads_per_worker
+        self.initargs = (self.model_options, self.rule_pack_options)
+        self._manager: Optional[Any] = None
+        self.worker_status: Optional[Dict[str, Any]] = None
+
+    async def stream(
+        self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run func(*args, channel) in a worker process and yield what it
+        publishes while it runs.
+
+        func puts (event, data) pairs on channel; they are yielded as they
+        arrive, followed by ("result", <func's return value>). The task is
+        bounded and restarted like any other run().
+
+        Args:
+            func: Module-level (picklable) function taking the channel as its last argument
+            args: Picklable arguments
+            timeout: Seconds before giving up; defaults to the executor's task_timeout
+
+        Raises:
+            NlpTaskTimeout: If the task did not finish in time
+        """
+        if self._manager is None:
+            # Queues shared with worker processes are served by a manager process
+            self._manager = MP_CONTEXT.Manager()
+        channel = self._manager.Queue()
+        task = asyncio.ensure_future(self.run(_run_streaming, func, channel, args, timeout=timeout))
+        try:
+            while True:
+                try:
+                    item = await asyncio.to_thread(channel.get, True, STREAM_POLL_SECONDS)
+                except queue.Empty:
+                    if task.done():
+                        break
+                    continue
+                if item is None:
+                    break
+                yield item
+            yield "result", await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def start(self) -> Dict[str, Any]:
+        """
+        Start every worker process and wait for its models to load.
+
+        One-off model preparation (the ONNX export) runs here first, so the
+        workers only ever load finished models.
+
+        Returns:
+            Model registry status reported by a worker
+        """
+        await asyncio.to_thread(
+            prepare_model_dir,
+            self.model_options.get("model_dir", ""),
+            backend=self.model_options.get("backend", "eager"),
+            quantize=self.model_options.get("quantize", True),
+        )
+        # Concurrent submissions make the pool spawn all of its workers now
+        statuses = await asyncio.gather(*(self.run(_worker_status) for _ in range(self.workers)))
+        self.worker_status = statuses[0]
+        return self.worker_status
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        super().shutdown()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional
+
+from nlp.rule_packs import DEFAULT_SPECIALTY
+from nlp.soap import (
+    HISTORY_MARKER,
+    MEDICATION_MARKER,
+    first_sentence,
+    render_rule_based_sections,
+    scan_terms,
+)
+from nlp.structured import MedicationDose, StructuredFindings, Vitals, extract_structured
+
+# Vitals fields that make up one reading; a reading is taken whole from one segment
+VITAL_GROUPS = [
+    ("bp_systolic", "bp_diastolic"),
+    ("heart_rate",),
+    ("respiratory_rate",),
+    ("temperature", "temperature_unit"),
+    ("spo2",),
+    ("weight", "weight_unit"),
+]
+
+
+class IncrementalSoapDraft:
+    """
+    Rule-based SOAP draft kept up to date one transcript segment at a time.
+
+    Each new segment is scanned by the term matcher and the structured
+    extractor on its own, and what they find is merged into the running
+    state (terms seen, first history and medication sentences, first reading
+    of each vital, medication doses). The sections are then re-rendered
+    from that state, which is cheap, and only those whose text changed are
+    reported. For sentence-aligned segments the result matches running the
+    rule-based extractor over the whole transcript.
+
+    The state is plain data (see to_state/from_state) so it can be stored
+    with the transcription between segments.
+    """
+
+    def __init__(self, specialty: str = DEFAULT_SPECIALTY, lexicon_path: str = ""):
+        self.specialty = specialty
+        self.lexicon_path = lexicon_path
+        self.terms = set()
+        self.history_sentence: Optional[str] = None
+        self.medication_sentence: Optional[str] = None
+        self.vitals: Dict[str, Any] = {}
+        self.medications: List[MedicationDose] = []
+        self.segments = 0
+        self.sections = self._render()
+
+    def _findings(self) -> StructuredFindings:
+        return StructuredFindings(Vitals(**self.vitals), self.medications)
+
+    def _render(self) -> Dict[str, str]:
+        return render_rule_based_sections(
+            self.terms, self.history_sentence, self.medication_sentence, self._findings(), self.specialty
+        )
+
+    def add_segment(self, text: str) -> Dict[str, str]:
+        """
+        Merge one segment into the draft.
+
+        Args:
+            text: The segment's transcript text
+
+        Returns:
+            The sections whose text changed, with their new text
+        """
+        hits = scan_terms(text, self.specialty)
+        self.terms.update(match.term for match in hits.matches)
+        if self.history_sentence is None:
+            self.history_sentence = first_sentence(text, hits, HISTORY_MARKER)
+        if self.medication_sentence is None:
+            self.medication_sentence = first_sentence(text, hits, MEDICATION_MARKER)
+
+        findings = extract_structured(text, self.lexicon_path)
+        for group in VITAL_GROUPS:
+            reading = {field: getattr(findings.vitals, field) for field in group}
+            if reading[group[0]] is not None and self.vitals.get(group[0]) is None:
+                self.vitals.update(reading)
+        known = {(m.drug, m.dose, m.unit, m.route) for m in self.medications}
+        for medication in findings.medications:
+            if (medication.drug, medication.dose, medication.unit, medication.route) not in known:
+                self.medications.append(medication)
+        self.segments += 1
+
+        sections = self._render()
+        changed = {
+            section: content
+            for section, content in sections.items()
+            if self.sections.get(section) != content
+        }
+        self.sections = sections
+        return changed
+
+    def findings(self) -> StructuredFindings:
+        """Vitals and medication doses found so far."""
+        return self._findings()
+
+    def to_state(self) -> Dict[str, Any]:
+        """The draft's state as plain, storable data."""
+        return {
+            "terms": sorted(self.terms),
+            "history_sentence": self.history_sentence,
+            "medication_sentence": self.medication_sentence,
+            "vitals": dict(self.vitals),
+            "medications": [medication._asdict() for medication in self.medications],
+            "segments": self.segments,
+        }
+
+    @classmethod
+    def from_state(
+        cls, state: Optional[Dict[str, Any]], specialty: str = DEFAULT_SPECIALTY, lexicon_path: str = ""
+    ) -> "IncrementalSoapDraft":
+        """Rebuild a draft from to_state() output; None gives an empty draft."""
+        draft = cls(specialty, lexicon_path)
+        if state:
+            draft.terms = set(state["terms"])
+            draft.history_sentence = state["history_sentence"]
+            draft.medication_sentence = state["medication_sentence"]
+            draft.vitals = dict(state["vitals"])
+            draft.medications = [MedicationDose(**medication) for medication in state["medications"]]
+            draft.segments = state["segments"]
+            draft.sections = draft._render()
+        return draft
@@ -0,0 +1,337 @@
+import argparse
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Categories a lexicon term can belong to, in storage order
+CATEGORIES = ["medication", "diagnosis", "procedure", "concept"]
+
+# Lexicon shipped with the backend; the compiled file is built next to it
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_LEXICON_SOURCE = os.path.join(DATA_DIR, "clinical_lexicon.tsv")
+DEFAULT_LEXICON_PATH = os.path.join(DATA_DIR, "clinical_lexicon.bin")
+
+# Words, with inner hyphens, slashes and dots ("covid-19", "98.6"), and sentence breaks
+TOKEN = re.compile(r"[a-z0-9]+(?:[-/.'][a-z0-9]+)*|[.;:!?\n]")
+BREAKS = set(".;:!?\n")
+
+# Words that negate a mention when they precede it in the same sentence
+NEGATIONS = {"no", "not", "denies", "denied", "without", "negative"}
+NEGATION_WINDOW = 5
+
+# Words that end the reach of a preceding negation ("denies fever but reports cough")
+NEGATION_TERMINATORS = {"but", "however", "although", "except"}
+
+# magic, byte order check, max words per term, terms, canonical names, term blob size, canonical blob size
+MAGIC = b"SLX1"
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=4sIIIIII")
+
+# Entries pack the canonical name index and the category into one uint32
+CATEGORY_BITS = 3
+
+# Terms are bucketed by their first two bytes so lookups start from a small range
+BUCKETS = 1 << 16
+
+
+def _bucket(key: bytes) -> int:
+    return key[0] << 8 | (key[1] if len(key) > 1 else 0)
+
+
+class EntityMatch(NamedTuple):
+    term: str
+    canonical: str
+    category: str
+    start: int
+    end: int
+    negated: bool
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercased tokens of text with their character offsets."""
+    return [(match.group(), match.start(), match.end()) for match in TOKEN.finditer(text.lower())]
+
+
+def normalize_term(term: str) -> str:
+    """Lexicon key for a term: its tokens joined by single spaces."""
+    return " ".join(token for token, _, _ in tokenize(term) if token not in BREAKS)
+
+
+def read_source(path: str) -> Iterable[Tuple[str, str, str]]:
+    """
+    Read a tab-separated lexicon source of term, category and optional canonical name.
+
+    Blank lines and lines starting with # are skipped.
+
+    Raises:
+        ValueError: If a line has an unknown category
+    """
+    with open(path, encoding="utf-8") as source:
+        for number, line in enumerate(source, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            term, category = fields[0].strip(), fields[1].strip().lower()
+            canonical = fields[2].strip() if len(fields) > 2 and fields[2].strip() else term
+            if category not in CATEGORIES:
+                raise ValueError(f"{path}:{number}: unknown category {category!r}")
+            yield term, category, canonical
+
+
+def compile_lexicon(entries: Iterable[Tuple[str, str, str]], path: str) -> int:
+    """
+    Compile (term, category, canonical) entries into a memory-mappable file.
+
+    Terms are normalized and stored sorted by their UTF-8 bytes in one blob
+    with a parallel offset table, so the file is a sorted index that can be
+    walked like a trie with range narrowing and never has to be parsed. A
+    table of where each two-byte prefix starts replaces the first levels of
+    every search. Later duplicates of a term override earlier ones.
+
+    Args:
+        entries: (term, category, canonical name) triples
+        path: File to write
+
+    Returns:
+        Number of distinct terms written
+    """
+    terms: Dict[bytes, Tuple[str, str]] = {}
+    for term, category, canonical in entries:
+        key = normalize_term(term).encode()
+        if key:
+            terms[key] = (category, canonical.lower())
+
+    keys = sorted(terms)
+    canonical_names: Dict[str, int] = {}
+    term_offsets = array("I", [0])
+    term_entries = array("I")
+    term_blob = bytearray()
+    max_words = 0
+    for key in keys:
+        category, canonical = terms[key]
+        index = canonical_names.setdefault(canonical, len(canonical_names))
+        term_blob += key
+        term_offsets.append(len(term_blob))
+        term_entries.append(index << CATEGORY_BITS | CATEGORIES.index(category))
+        max_words = max(max_words, key.count(b" ") + 1)
+
+    bucket_starts = array("I")
+    index = 0
+    for bucket in range(BUCKETS + 1):
+        while index < len(keys) and _bucket(keys[index]) < bucket:
+            index += 1
+        bucket_starts.append(index)
+
+    canonical_offsets = array("I", [0])
+    canonical_blob = bytearray()
+    for name in canonical_names:
+        canonical_blob += name.encode()
+        canonical_offsets.append(len(canonical_blob))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as output:
+        output.write(HEADER.pack(
+            MAGIC, BYTE_ORDER_MARK, max_words, len(terms), len(canonical_names),
+            len(term_blob), len(canonical_blob),
+        ))
+        for table in (bucket_starts, term_offsets, term_entries, canonical_offsets):
+            output.write(table.tobytes())
+        output.write(term_blob)
+        output.write(canonical_blob)
+    # Readers that already mapped the old file keep their copy
+    os.replace(temporary, path)
+    return len(terms)
+
+
+class Lexicon:
+    """
+    Read-only clinical lexicon memory-mapped from a compiled file.
+
+    Opening only maps the file and reads its header, so start-up time and
+    private memory do not grow with the number of terms; pages are shared
+    between every process that maps the same file. Scanning finds the
+    longest lexicon term starting at each token, narrowing a range of the
+    sorted term index one word at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as source:
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, order, self.max_words, self.size, canonical_count,
+         term_blob_size, canonical_blob_size) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or order != BYTE_ORDER_MARK:
+            raise ValueError(f"{path} is not a compiled lexicon for this platform")
+
+        view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def table(count: int) -> memoryview:
+            nonlocal position
+            start, position = position, position + 4 * count
+            return view[start:position].cast("I")
+
+        self._bucket_starts = table(BUCKETS + 1)
+        self._term_offsets = table(self.size + 1)
+        self._entries = table(self.size)
+        self._canonical_offsets = table(canonical_count + 1)
+        self._term_blob = position
+        self._canonical_blob = position + term_blob_size
+        self._canonical_cache: Dict[int, str] = {}
+
+    def _term(self, index: int) -> bytes:
+        offset = self._term_blob
+        return self._mmap[offset + self._term_offsets[index]:offset + self._term_offsets[index + 1]]
+
+    def _canonical(self, index: int) -> str:
+        name = self._canonical_cache.get(index)
+        if name is None:
+            offset = self._canonical_blob
+            name = self._mmap[
+                offset + self._canonical_offsets[index]:offset + self._canonical_offsets[index + 1]
+            ].decode()
+            self._canonical_cache[index] = name
+        return name
+
+    def _lower_bound(self, key: bytes, low: int, high: int) -> int:
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, term: str) -> Optional[Tuple[str, str]]:
+        """(category, canonical name) of a term, or None if it is not in the lexicon."""
+        key = normalize_term(term).encode()
+        if not key:
+            return None
+        bucket = _bucket(key)
+        index = self._lower_bound(key, self._bucket_starts[bucket], self._bucket_starts[bucket + 1])
+        if index < self.size and self._term(index) == key:
+            entry = self._entries[index]
+            return CATEGORIES[entry & ((1 << CATEGORY_BITS) - 1)], self._canonical(entry >> CATEGORY_BITS)
+        return None
+
+    def _longest_match(self, words: List[str], start: int) -> Tuple[int, int]:
+        # Range of terms that start with the phrase so far; 0xff never occurs in UTF-8
+        first = words[start].encode()
+        if len(first) > 1:
+            low, high = self._bucket_starts[_bucket(first)], self._bucket_starts[_bucket(first) + 1]
+        else:
+            low, high = self._bucket_starts[first[0] << 8], self._bucket_starts[(first[0] + 1) << 8]
+        phrase = b""
+        best = (start, -1)
+        for end in range(start, min(len(words), start + self.max_words)):
+            phrase = phrase + b" " + words[end].encode() if phrase else words[end].encode()
+            low = self._lower_bound(phrase, low, high)
+            high = self._lower_bound(phrase + b"\xff", low, high)
+            if low >= high:
+                break
+            if self._term(low) == phrase:
+                best = (end + 1, low)
+            # Only terms continuing with another word can extend the match
+            low = self._lower_bound(phrase + b" ", low, high)
+            high = self._lower_bound(phrase + b"!", low, high)
+            if low >= high:
+                break
+        return best
+
+    def scan(self, text: str) -> List[EntityMatch]:
+        """
+        Find lexicon terms in text, leftmost-longest and non-overlapping.
+
+        Terms never span sentence breaks, and a term preceded in its
+        sentence by a negation word ("no", "denies", ...) within a few
+        words, with no "but" or similar in between, is reported with
+        negated set.
+        """
+        matches = []
+        tokens = tokenize(text)
+        sentence: List[Tuple[str, int, int]] = []
+        for token in tokens + [(".", len(text), len(text))]:
+            if token[0] not in BREAKS:
+                sentence.append(token)
+                continue
+            words = [word for word, _, _ in sentence]
+            index = 0
+            while index < len(words):
+                end, entry_index = self._longest_match(words, index)
+                if entry_index < 0:
+                    index += 1
+                    continue
+                entry = self._entries[entry_index]
+                window = []
+                for word in words[max(0, index - NEGATION_WINDOW):index]:
+                    window = [] if word in NEGATION_TERMINATORS else window + [word]
+                matches.append(EntityMatch(
+                    term=" ".join(words[index:end]),
+                    canonical=self._canonical(entry >> CATEGORY_BITS),
+                    category=CATEGORIES[entry & ((1 << CATEGORY_BITS) - 1)],
+                    start=sentence[index][1],
+                    end=sentence[end - 1][2],
+                    negated=any(word in NEGATIONS for word in window),
+                ))
+                index = end
+            sentence = []
+        return matches
+
+    def close(self) -> None:
+        self._bucket_starts.release()
+        self._term_offsets.release()
+        self._entries.release()
+        self._canonical_offsets.release()
+        self._mmap.close()
+
+
+_lexicons: Dict[str, Lexicon] = {}
+_lexicons_lock = threading.Lock()
+
+
+def ensure_compiled(source: str = DEFAULT_LEXICON_SOURCE, path: str = DEFAULT_LEXICON_PATH) -> str:
+    """Compile the lexicon source unless the compiled file is newer. Returns path."""
+    if os.path.exists(source) and (
+        not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source)
+    ):
+        count = compile_lexicon(read_source(source), path)
+        logger.info(f"Compiled {count} lexicon terms from {source} to {path}")
+    return path
+
+
+def get_lexicon(path: str = "") -> Lexicon:
+    """
+    The process-wide lexicon mapped from path.
+
+    With no path the bundled lexicon is used, compiled first if needed.
+    """
+    path = path or DEFAULT_LEXICON_PATH
+    lexicon = _lexicons.get(path)
+    if lexicon is None:
+        with _lexicons_lock:
+            lexicon = _lexicons.get(path)
+            if lexicon is None:
+                if path == DEFAULT_LEXICON_PATH:
+                    ensure_compiled()
+                lexicon = _lexicons[path] = Lexicon(path)
+    return lexicon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a clinical lexicon for memory mapping")
+    parser.add_argument("source", nargs="?", default=DEFAULT_LEXICON_SOURCE, help="Tab-separated term, category, canonical")
+    parser.add_argument("output", nargs="?", default=DEFAULT_LEXICON_PATH)
+    args = parser.parse_args()
+    print(f"{compile_lexicon(read_source(args.source), args.output)} terms -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+class TermMatch(NamedTuple):
+    term: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick multi-pattern matcher.
+
+    The automaton is compiled once into a deterministic transition table
+    (failure links folded in), so scanning is a single pass over the text
+    with one dict lookup per character, however many terms there are.
+    Matching is case-insensitive and reports overlapping hits.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({term.lower() for term in terms if term})
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[str]] = [[]]
+        self._build()
+
+    def _build(self) -> None:
+        # Trie of all terms
+        goto: List[Dict[str, int]] = [{}]
+        for term in self.terms:
+            state = 0
+            for char in term:
+                if char not in goto[state]:
+                    goto.append({})
+                    self._outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            self._outputs[state].append(term)
+
+        # Breadth-first: failure links, inherited outputs and the full
+        # transition function delta(state, char)
+        fail = [0] * len(goto)
+        self._transitions = [dict() for _ in goto]
+        self._transitions[0] = dict(goto[0])
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            self._outputs[state] = self._outputs[state] + self._outputs[fail[state]]
+            # Start from the failure state's transitions and override with our own
+            transitions = dict(self._transitions[fail[state]])
+            for char, child in goto[state].items():
+                transitions[char] = child
+                fail[child] = self._transitions[fail[state]].get(char, 0)
+                queue.append(child)
+            self._transitions[state] = transitions
+
+    def find_all(self, text: str) -> List[TermMatch]:
+        """Return every (possibly overlapping) term occurrence, in text order."""
+        transitions = self._transitions
+        outputs = self._outputs
+        matches = []
+        state = 0
+        for index, char in enumerate(text.lower()):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                end = index + 1
+                for term in outputs[state]:
+                    matches.append(TermMatch(term, end - len(term), end))
+        return matches
+
+    def scan(self, text: str) -> "TermHits":
+        """Scan text once and index the hits by term."""
+        return TermHits(self.find_all(text))
+
+
+class TermHits:
+    """Term occurrences from a single scan, indexed by term."""
+
+    def __init__(self, matches: Iterable[TermMatch] = ()):
+        self.matches = list(matches)
+        self._positions: Dict[str, List[int]] = defaultdict(list)
+        for match in self.matches:
+            self._positions[match.term].append(match.start)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        """Each distinct term found."""
+        return iter(self._positions)
+
+    def first(self, term: str) -> Optional[int]:
+        """Offset of the first occurrence of term, or None."""
+        positions = self._positions.get(term)
+        return positions[0] if positions else None
+
+    def positions(self, term: str) -> List[int]:
+        """Offsets of every occurrence of term."""
+        return list(self._positions.get(term, ()))
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from nlp.backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Subdirectory used for specialties without a dedicated model
+DEFAULT_MODEL_KEY = "default"
+
+# Short clinical exchange run once per model so the first request is warm
+WARMUP_TRANSCRIPT = (
+    "The patient reports a mild headache since yesterday. "
+    "No fever. Currently taking ibuprofen as needed."
+)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded SOAP generation pipelines.
+
+    Models live in a local directory with one subdirectory per specialty
+    (``cardiology/``, ``primary_care/``, ...) plus an optional ``default/``
+    used for every other specialty. Each is loaded once on CPU, warmed up
+    with a short inference, and shared by all requests.
+    """
+
+    def __init__(self):
+        self._pipelines: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._fingerprints: Dict[str, str] = {}
+        # Subdirectory, tokenizer and input length limit (in tokens) of each model
+        self._directories: Dict[str, str] = {}
+        self._tokenizers: Dict[str, Any] = {}
+        self._input_limits: Dict[str, int] = {}
+        self.backend = None
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(
+        self,
+        model_dir: str,
+        max_length: int = 512,
+        backend: str = "eager",
+        intra_op_threads: int = 0,
+        quantize: bool = True,
+    ) -> None:
+        """
+        Load and warm up every model found under model_dir.
+
+        An empty model_dir leaves the registry empty, which keeps the
+        rule-based extractor in use. Failures are recorded per specialty and
+        reported by status() instead of aborting startup.
+        """
+        with self._lock:
+            self.backend = get_backend(
+                backend, intra_op_threads=intra_op_threads, quantize=quantize
+            )
+            if model_dir and os.path.isdir(model_dir):
+                for name in sorted(os.listdir(model_dir)):
+                    path = os.path.join(model_dir, name)
+                    if not os.path.isdir(path):
+                        continue
+                    key = name.upper() if name != DEFAULT_MODEL_KEY else DEFAULT_MODEL_KEY
+                    try:
+                        start = time.perf_counter()
+                        generator = self.backend.load(path, max_length)
+                        generator(WARMUP_TRANSCRIPT)
+                        self._pipelines[key] = generator
+                        self._directories[key] = name
+                        self._tokenizers[key] = generator.tokenizer
+                        self._input_limits[key] = self._input_limit(generator.tokenizer, max_length)
+                        self._fingerprints[key] = self._fingerprint(path)
+                        self._load_seconds[key] = time.perf_counter() - start
+                        logger.info(f"Loaded SOAP model {key} in {self._load_seconds[key]:.1f}s")
+                    except Exception as e:
+                        self._errors[key] = str(e)
+                        logger.error(f"Failed to load SOAP model {key} from {path}: {e}")
+            elif model_dir:
+                self._errors[DEFAULT_MODEL_KEY] = f"Model directory {model_dir} not found"
+                logger.error(self._errors[DEFAULT_MODEL_KEY])
+            self.loaded = True
+
+    def mirror(self, status: Dict[str, Any], model_dir: str = "") -> None:
+        """
+        Adopt the status reported by a registry in another process.
+
+        Used by processes that hand inference to NLP worker processes but
+        still need model_version() for cache keys, status() for readiness
+        and count_tokens() to size chunks, without loading the models
+        themselves. Only the models' tokenizers are loaded, from model_dir.
+        """
+        with self._lock:
+            self.backend = get_backend(status["backend"]) if status["backend"] else None
+            self._fingerprints = dict(status["fingerprints"])
+            self._load_seconds = dict(status["load_seconds"])
+            self._errors = dict(status["errors"])
+            self._directories = dict(status["directories"])
+            self._input_limits = dict(status["input_limits"])
+            self._tokenizers = {}
+            for key, name in self._directories.items():
+                try:
+                    from transformers import AutoTokenizer
+
+                    self._tokenizers[key] = AutoTokenizer.from_pretrained(
+                        os.path.join(model_dir, name), local_files_only=True
+                    )
+                except Exception as e:
+                    # count_tokens() falls back to a character count, which never undercounts
+                    logger.error(f"Failed to load the tokenizer of SOAP model {key}: {e}")
+            self.loaded = status["loaded"]
+
+    @staticmethod
+    def _input_limit(tokenizer: Any, max_length: int) -> int:
+        # Longer inputs are truncated by the pipeline; special tokens take part of the limit
+        return min(tokenizer.model_max_length, max_length) - tokenizer.num_special_tokens_to_add()
+
+    @staticmethod
+    def _fingerprint(path: str) -> str:
+        """Identify a model directory by its file names, sizes and mtimes."""
+        digest = hashlib.sha256()
+        for root, _, files in sorted(os.walk(path)):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                relative = os.path.relpath(os.path.join(root, name), path)
+                digest.update(f"{relative}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
+
+    def _key(self, specialty: str) -> Optional[str]:
+        # Model serving a specialty, or None if it is rule-based
+        key = specialty.upper() if specialty.upper() in self._fingerprints else DEFAULT_MODEL_KEY
+        return key if key in self._fingerprints else None
+
+    def model_version(self, specialty: str) -> Optional[str]:
+        """Fingerprint of the model serving a specialty, or None if rule-based."""
+        key = self._key(specialty)
+        if key is None:
+            return None
+        return f"{key}:{self.backend.name}:{self._fingerprints[key]}"
+
+    def input_limit(self, specialty: str) -> Optional[int]:
+        """Most tokens the specialty's model reads from a transcript, or None if rule-based."""
+        key = self._key(specialty)
+        return self._input_limits.get(key) if key is not None else None
+
+    def count_tokens(self, text: str, specialty: str) -> int:
+        """Length of text in the specialty's model's tokens (in characters without a tokenizer)."""
+        tokenizer = self._tokenizers.get(self._key(specialty) or "")
+        if tokenizer is None:
+            return len(text)
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def get(self, specialty: str) -> Optional[Any]:
+        """The pipeline for a specialty, the default pipeline, or None."""
+        return self._pipelines.get(specialty.upper()) or self._pipelines.get(DEFAULT_MODEL_KEY)
+
+    @property
+    def ready(self) -> bool:
+        """Loading has finished without errors."""
+        return self.loaded and not self._errors
+
+    def status(self) -> Dict[str, Any]:
+        """Loaded models, load times and errors."""
+        models: List[str] = sorted(self._fingerprints)
+        return {
+            "loaded": self.loaded,
+            "backend": self.backend.name if self.backend else None,
+            "ready": self.ready,
+            "models": models,
+            "fingerprints": dict(self._fingerprints),
+            "directories": dict(self._directories),
+            "input_limits": dict(self._input_limits),
+            "load_seconds": {key: round(value, 2) for key, value in self._load_seconds.items()},
+            "errors": dict(self._errors),
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from nlp.matcher import KeywordMatcher, TermHits
+
+logger = logging.getLogger(__name__)
+
+# Rule packs shipped with the backend, one JSON file per specialty
+DEFAULT_RULE_PACK_DIR = os.path.join(os.path.dirname(__file__), "data", "rule_packs")
+
+# Pack used for specialties without one of their own
+DEFAULT_SPECIALTY = "PRIMARY_CARE"
+
+# Markers that introduce history and medication passages, scanned for in every pack
+HISTORY_MARKER = "history"
+MEDICATION_MARKER = "taking"
+
+# Text every pack must define for when nothing relevant is found
+DEFAULT_KEYS = ["complaint", "history", "assessment", "plan", "physical_exam"]
+
+SECTIONS = ["subjective", "objective", "assessment", "plan"]
+
+
+def _keyed_lines(entries: List[Dict[str, str]], field: str) -> Dict[str, List[Tuple[int, str]]]:
+    # term -> (position in the pack, line); lines come out in pack order
+    lines: Dict[str, List[Tuple[int, str]]] = {}
+    for rank, entry in enumerate(entries):
+        lines.setdefault(entry["term"].lower(), []).append((rank, entry[field]))
+    return lines
+
+
+class RulePack:
+    """
+    A specialty's keyword rules compiled for extraction.
+
+    Every term is compiled into one keyword matcher, and the complaint,
+    assessment, plan and sample-case rules are indexed by term. Rendering
+    only looks at the terms a transcript actually contains, so the cost per
+    note does not grow with the size of the pack.
+    """
+
+    def __init__(self, definition: Dict[str, Any], version: str):
+        self.specialty = definition["specialty"].upper()
+        self.version = version
+        self.defaults: Dict[str, str] = dict(definition["defaults"])
+        complaints = [term.lower() for term in definition.get("complaints", [])]
+        assessments = definition.get("assessments", [])
+        plans = definition.get("plans", [])
+        samples = definition.get("sample_cases", [])
+
+        self._complaint_rank = {term: rank for rank, term in reversed(list(enumerate(complaints)))}
+        self._assessments = _keyed_lines(assessments, "text")
+        self._plans = _keyed_lines(plans, "text")
+        self._samples = _keyed_lines(samples, "sections")
+        self.size = len(complaints) + len(assessments) + len(plans) + len(samples)
+        self.matcher = KeywordMatcher(
+            complaints
+            + list(self._assessments)
+            + list(self._plans)
+            + list(self._samples)
+            + [HISTORY_MARKER, MEDICATION_MARKER]
+        )
+
+    def scan(self, text: str) -> TermHits:
+        """Scan a transcript once for every term in the pack."""
+        return self.matcher.scan(text)
+
+    def chief_complaint(self, terms: Iterable[str]) -> str:
+        """The highest-precedence complaint among terms, or the default."""
+        ranked = [(self._complaint_rank[term], term) for term in terms if term in self._complaint_rank]
+        return min(ranked)[1] if ranked else self.defaults["complaint"]
+
+    @staticmethod
+    def _lines(index: Dict[str, List[Tuple[int, Any]]], terms: Iterable[str]) -> List[Any]:
+        found = sorted(line for term in terms for line in index.get(term, ()))
+        lines = []
+        for _, line in found:
+            if line not in lines:
+                lines.append(line)
+        return lines
+
+    def assessments(self, terms: Iterable[str]) -> List[str]:
+        """Assessment lines for the conditions among terms, in pack order."""
+        return self._lines(self._assessments, terms)
+
+    def plans(self, terms: Iterable[str]) -> List[str]:
+        """Plan lines for the conditions among terms, in pack order."""
+        return self._lines(self._plans, terms)
+
+    def sample_case(self, terms: Iterable[str]) -> Optional[Dict[str, str]]:
+        """Canned sections of the first sample case triggered by terms, if any."""
+        found = [case for term in terms for case in self._samples.get(term, ())]
+        return dict(min(found, key=lambda case: case[0])[1]) if found else None
+
+
+def load_rule_pack(path: str) -> RulePack:
+    """
+    Read and compile a rule pack file.
+
+    Raises:
+        ValueError: If the file is not a valid rule pack
+    """
+    with open(path, "rb") as source:
+        raw = source.read()
+    try:
+        definition = json.loads(raw)
+        missing = [key for key in DEFAULT_KEYS if key not in definition.get("defaults", {})]
+        if "specialty" not in definition or missing:
+            raise ValueError(f"needs a specialty and defaults for {', '.join(DEFAULT_KEYS)}")
+        for case in definition.get("sample_cases", []):
+            if set(case["sections"]) != set(SECTIONS):
+                raise ValueError(f"sample case {case['term']!r} must define {', '.join(SECTIONS)}")
+        return RulePack(definition, hashlib.sha256(raw).hexdigest()[:12])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid rule pack {path}: {e}") from e
+
+
+class RulePackStore:
+    """
+    Process-wide set of compiled rule packs, reloaded when their files change.
+
+    Lookups check the pack directory at most once per check_interval (a
+    listing and a stat per file). When a file changed, the packs are
+    recompiled on a background thread while lookups keep getting the
+    current ones, and the new set is swapped in with a single assignment,
+    so a lookup sees either the old packs or the new ones, never a mix.
+    A file that fails to compile keeps its previous version in service.
+    """
+
+    def __init__(self, directory: str = DEFAULT_RULE_PACK_DIR, check_interval: float = 2.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._packs: Dict[str, RulePack] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._files: Dict[str, Tuple[Tuple[int, int], RulePack]] = {}
+        self._errors: Dict[str, str] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def configure(self, directory: str = "", check_interval: float = 2.0) -> None:
+        """Point the store at a pack directory (empty for the bundled packs) and load it."""
+        with self._lock:
+            self.directory = directory or DEFAULT_RULE_PACK_DIR
+            self.check_interval = check_interval
+            self._signatures = {}
+            self._files = {}
+        self.refresh()
+
+    def get(self, specialty: str) -> RulePack:
+        """The pack for a specialty, or the default specialty's pack."""
+        if not self._packs:
+            self.refresh()
+        elif time.monotonic() - self._checked >= self.check_interval:
+            self._checked = time.monotonic()
+            if self._scan() != self._signatures and not self._lock.locked():
+                threading.Thread(target=self.refresh, name="rule-pack-reload", daemon=True).start()
+        packs = self._packs
+        return packs.get(specialty.upper()) or packs[DEFAULT_SPECIALTY]
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                signatures[os.path.join(self.directory, name)] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def refresh(self) -> bool:
+        """
+        Recompile the packs whose files changed since the last refresh.
+
+        Returns:
+            True if a new set of packs was swapped in
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            signatures = self._scan()
+            if signatures == self._signatures:
+                return False
+
+            files = {}
+            errors = {}
+            for path, signature in signatures.items():
+                previous = self._files.get(path)
+                if previous is not None and previous[0] == signature:
+                    files[path] = previous
+                    continue
+                try:
+                    files[path] = (signature, load_rule_pack(path))
+                except (OSError, ValueError) as e:
+                    errors[path] = str(e)
+                    logger.error(f"Keeping previous rule pack for {path}: {e}")
+                    # Retried once the file changes again
+                    if previous is not None:
+                        files[path] = previous
+
+            packs = {pack.specialty: pack for _, pack in files.values()}
+            if DEFAULT_SPECIALTY not in packs:
+                if DEFAULT_SPECIALTY in self._packs:
+                    packs[DEFAULT_SPECIALTY] = self._packs[DEFAULT_SPECIALTY]
+                else:
+                    raise ValueError(f"No {DEFAULT_SPECIALTY} rule pack in {self.directory}")
+
+            self._signatures = signatures
+            self._files = files
+            self._errors = errors
+            self._packs = packs
+            self.reloads += 1
+            logger.info(f"Loaded rule packs: {', '.join(f'{key}@{pack.version}' for key, pack in sorted(packs.items()))}")
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        """Pack versions by specialty and files that failed to compile."""
+        return {
+            "directory": self.directory,
+            "packs": {key: pack.version for key, pack in sorted(self._packs.items())},
+            "reloads": self.reloads,
+            "errors": dict(self._errors),
+        }
+
+
+rule_packs = RulePackStore()
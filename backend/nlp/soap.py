@@ -1,19 +1,63 @@
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 import re
 
-# In a production system, we would import and use transformers
-# from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+from nlp.matcher import TermHits
+from nlp.registry import model_registry
+from nlp.rule_packs import DEFAULT_SPECIALTY, HISTORY_MARKER, MEDICATION_MARKER, rule_packs
+from nlp.structured import StructuredFindings, extract_structured, format_medication, format_vitals
 
 logger = logging.getLogger(__name__)
 
+# Section headers in seq2seq model output ("Subjective: ... Objective: ...")
+SECTION_HEADER = re.compile(r"\b(subjective|objective|assessment|plan)\s*:", re.IGNORECASE)
 
-def extract_soap_sections(transcript: str, specialty: str = "PRIMARY_CARE") -> Dict[str, str]:
+# Bump whenever the rule-based extractor's output changes
+RULES_VERSION = "rules-2"
+
+# Sections returned when extraction fails
+ERROR_SECTIONS = {
+    "subjective": "Error extracting subjective section.",
+    "objective": "Error extracting objective section.",
+    "assessment": "Error extracting assessment section.",
+    "plan": "Error extracting plan section."
+}
+
+# Objective text when no vitals are found
+NO_VITALS = "Not documented"
+
+# Sentence ends used to cut history and medication passages
+SENTENCE_END = re.compile(r"[.!?](?:\s|$)")
+
+def scan_terms(text: str, specialty: str = DEFAULT_SPECIALTY) -> TermHits:
+    """Scan a transcript once for every term in the specialty's rule pack."""
+    return rule_packs.get(specialty).scan(text)
+
+
+def extractor_version(specialty: str) -> str:
+    """Version of whatever would produce the SOAP sections for a specialty."""
+    pack = rule_packs.get(specialty)
+    return model_registry.model_version(specialty) or f"{RULES_VERSION}:{pack.specialty}@{pack.version}"
+
+
+def placeholder_lines(specialty: str = DEFAULT_SPECIALTY) -> Set[str]:
+    """Lines the rule-based extractor emits for a specialty when it finds nothing."""
+    defaults = rule_packs.get(specialty).defaults
+    return {
+        f"Patient presents with {defaults['complaint']}.",
+        defaults["history"],
+        f"Vital Signs: {NO_VITALS}",
+        defaults["assessment"],
+        defaults["plan"],
+    }
+
+
+def extract_soap_sections(transcript: str, specialty: str = DEFAULT_SPECIALTY) -> Dict[str, str]:
     """
     Extract SOAP sections from a transcript using NLP.
     
-    In a production version, this would use a fine-tuned transformer model
-    to extract the appropriate sections.
+    Uses the warm transformer pipeline loaded for the specialty when one is
+    registered, and the specialty's rule pack otherwise.
     
     Args:
         transcript: The transcript text
@@ -25,173 +69,336 @@ def extract_soap_sections(transcript: str, specialty: str = "PRIMARY_CARE") -> D
     try:
         logger.info(f"Extracting SOAP sections for specialty: {specialty}")
         
-        # In a production system, we would use a transformer model like this:
-        # tokenizer = AutoTokenizer.from_pretrained("clinical-t5-base")
-        # model = AutoModelForSeq2SeqLM.from_pretrained("clinical-t5-soap-extraction")
-        # nlp = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
-        # result = nlp(transcript, max_length=512)
+        # Reuse the pipeline loaded at startup for this specialty, if any
+        generator = model_registry.get(specialty)
+        if generator is not None:
+            sections = parse_model_output(generator(transcript)[0]["generated_text"])
+            if sections:
+                return sections
+            logger.warning("Model output had no SOAP sections, using rule-based extraction")
         
-        # For the demo, we'll use a simple rule-based approach
-        if "chest pain" in transcript.lower():
-            # Sample case: chest pain
-            subjective = (
-                "45-year-old male with a history of hypertension and type 2 diabetes presenting with "
-                "chest pain that started yesterday. Patient describes the pain as pressure-like, radiating "
-                "to the left arm, and associated with shortness of breath. Pain rated as 7/10. "
-                "No prior history of cardiac issues. Currently taking lisinopril and metformin."
-            )
-            
-            objective = (
-                "Vital Signs: BP 150/90, HR 92, RR 18, Temp 98.6F, SpO2 97% on room air\n"
-                "General: Alert, anxious-appearing male in mild distress\n"
-                "HEENT: Normocephalic, atraumatic. Mucous membranes moist.\n"
-                "Cardiovascular: Regular rate and rhythm. No murmurs, gallops, or rubs. PMI normal.\n"
-                "Respiratory: Clear to auscultation bilaterally. No wheezes or crackles.\n"
-                "Abdomen: Soft, non-tender, non-distended.\n"
-                "Extremities: No edema. Normal peripheral pulses."
-            )
-            
-            assessment = (
-                "1. Acute chest pain, concerning for possible acute coronary syndrome\n"
-                "2. Hypertension, poorly controlled\n"
-                "3. Type 2 diabetes mellitus"
-            )
-            
-            plan = (
-                "1. Obtain ECG and cardiac enzymes immediately\n"
-                "2. Chest X-ray to rule out other causes\n"
-                "3. Administer aspirin 325mg PO now\n"
-                "4. Start nitroglycerin 0.4mg SL PRN chest pain\n"
-                "5. Cardiology consultation\n"
-                "6. Adjust hypertension medication: increase lisinopril to 20mg daily\n"
-                "7. Continue current diabetes management\n"
-                "8. Admit for observation and further cardiac workup"
-            )
-            
+        return extract_rule_based_sections(transcript, specialty)
+        
+    except Exception as e:
+        logger.error(f"Error extracting SOAP sections: {str(e)}")
+        # Return default sections in case of error
+        return dict(ERROR_SECTIONS)
+
+
+def extract_soap_sections_batch(
+    items: List[Tuple[str, str]], bucket_size: int = 8
+) -> List[Dict[str, str]]:
+    """
+    Extract SOAP sections for several (transcript, specialty) pairs at once.
+    
+    Transcripts that share a model pipeline are run through it together,
+    sorted by length so each padded sub-batch of bucket_size holds
+    transcripts of similar length. The rest use the rule-based extractors.
+    
+    Args:
+        items: (transcript, specialty) pairs
+        bucket_size: Maximum number of transcripts per padded model batch
+        
+    Returns:
+        SOAP section dictionaries, in the order of items
+    """
+    results: List[Optional[Dict[str, str]]] = [None] * len(items)
+    groups: Dict[int, Tuple[Any, List[int]]] = {}
+    
+    for index, (transcript, specialty) in enumerate(items):
+        generator = model_registry.get(specialty)
+        if generator is None:
+            results[index] = extract_soap_sections(transcript, specialty)
         else:
-            # Generic case
-            subjective = (
-                "Patient presents with " + extract_chief_complaint(transcript) + ". " +
-                extract_history(transcript)
-            )
-            
-            objective = (
-                "Vital Signs: " + extract_vitals(transcript) + "\n" +
-                extract_physical_exam(transcript)
+            groups.setdefault(id(generator), (generator, []))[1].append(index)
+    
+    for generator, indices in groups.values():
+        indices.sort(key=lambda index: len(items[index][0]))
+        try:
+            outputs = generator(
+                [items[index][0] for index in indices], batch_size=bucket_size
             )
+        except Exception as e:
+            logger.error(f"Error running batched SOAP extraction: {str(e)}")
+            outputs = [None] * len(indices)
+        
+        for index, output in zip(indices, outputs):
+            # Pipelines return one list of candidates per input
+            if isinstance(output, list):
+                output = output[0]
+            sections = parse_model_output(output["generated_text"]) if output else None
+            results[index] = sections or extract_rule_based_sections(*items[index])
+    
+    return results
+
+
+def stream_soap_sections(transcript: str, specialty: str, channel: Any) -> Dict[str, str]:
+    """
+    Extract SOAP sections, publishing model output on channel as it is generated.
+    
+    With a model pipeline loaded for the specialty, each piece of decoded
+    text is put on channel as ("token", text), and each section as
+    ("section", (name, content)) as soon as the header of the next one is
+    generated. The rule-based extractors publish nothing; they are fast
+    enough that the returned sections are the first content.
+    
+    Args:
+        transcript: The transcript text
+        specialty: The medical specialty
+        channel: Queue-like object with put()
+        
+    Returns:
+        Dictionary with SOAP sections, the same as extract_soap_sections
+    """
+    try:
+        generator = model_registry.get(specialty)
+        if generator is not None:
+            splitter = SectionSplitter()
             
-            assessment = extract_assessment(transcript)
+            def publish(text: str) -> None:
+                channel.put(("token", text))
+                for section in splitter.feed(text):
+                    channel.put(("section", section))
             
-            plan = extract_plan(transcript)
+            output = generator(transcript, streamer=_text_streamer(generator.tokenizer, publish))
+            sections = parse_model_output(output[0]["generated_text"])
+            if sections:
+                return sections
+            logger.warning("Model output had no SOAP sections, using rule-based extraction")
         
-        return {
-            "subjective": subjective,
-            "objective": objective,
-            "assessment": assessment,
-            "plan": plan
-        }
+        return extract_rule_based_sections(transcript, specialty)
         
     except Exception as e:
-        logger.error(f"Error extracting SOAP sections: {str(e)}")
-        # Return default sections in case of error
-        return {
-            "subjective": "Error extracting subjective section.",
-            "objective": "Error extracting objective section.",
-            "assessment": "Error extracting assessment section.",
-            "plan": "Error extracting plan section."
-        }
+        logger.error(f"Error streaming SOAP sections: {str(e)}")
+        return dict(ERROR_SECTIONS)
 
 
-def extract_chief_complaint(text: str) -> str:
-    """Extract chief complaint from text."""
-    complaints = ["chest pain", "shortness of breath", "headache", "fever", "cough"]
-    for complaint in complaints:
-        if complaint in text.lower():
-            return complaint
-    return "general health concerns"
+def _text_streamer(tokenizer: Any, publish: Callable[[str], None]) -> Any:
+    from transformers import TextStreamer
 
+    class PublishingStreamer(TextStreamer):
+        def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+            if text:
+                publish(text)
 
-def extract_history(text: str) -> str:
-    """Extract patient history from text."""
-    history_parts = []
+    # skip_prompt drops the decoder start token generate() feeds it first
+    return PublishingStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+
+class SectionSplitter:
+    """
+    Splits seq2seq output into SOAP sections while it is being generated.
     
-    # Look for medical history
-    if "history" in text.lower():
-        history_index = text.lower().find("history")
-        history_text = text[history_index:history_index + 100]
-        history_parts.append(history_text.strip())
+    A section is complete once the next section header appears; the last
+    one is only known when generation ends (see parse_model_output).
+    """
     
-    # Look for medications
-    if "taking" in text.lower():
-        med_index = text.lower().find("taking")
-        med_text = text[med_index:med_index + 50]
-        history_parts.append(med_text.strip())
+    def __init__(self):
+        self.text = ""
+        self.completed = 0
     
-    if history_parts:
-        return " ".join(history_parts)
-    else:
-        return "No significant past medical history reported."
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Add generated text and return the (name, content) sections it completed."""
+        self.text += text
+        headers = list(SECTION_HEADER.finditer(self.text))
+        sections = []
+        while self.completed + 1 < len(headers):
+            header, following = headers[self.completed], headers[self.completed + 1]
+            sections.append((header.group(1).lower(), self.text[header.end():following.start()].strip()))
+            self.completed += 1
+        return sections
 
 
-def extract_vitals(text: str) -> str:
-    """Extract vital signs from text."""
-    # In a real system, we would use regex to extract BP, HR, etc.
-    return "BP 120/80, HR 75, RR 16, Temp 98.6F, SpO2 98% on room air"
-
-
-def extract_physical_exam(text: str) -> str:
-    """Extract physical examination findings from text."""
-    return (
-        "General: Alert and oriented, no acute distress\n"
-        "HEENT: Normocephalic, atraumatic. Pupils equal and reactive to light.\n"
-        "Cardiovascular: Regular rate and rhythm. No murmurs, gallops, or rubs.\n"
-        "Respiratory: Clear to auscultation bilaterally.\n"
-        "Abdomen: Soft, non-tender, non-distended.\n"
-        "Extremities: No edema. Normal range of motion."
+def extract_rule_based_sections(transcript: str, specialty: str = DEFAULT_SPECIALTY) -> Dict[str, str]:
+    """
+    Extract SOAP sections with the specialty's rule pack.
+    
+    Args:
+        transcript: The transcript text
+        specialty: The medical specialty
+        
+    Returns:
+        Dictionary with SOAP sections
+    """
+    # Single pass over the transcript shared by every extractor
+    hits = scan_terms(transcript, specialty)
+    
+    return render_rule_based_sections(
+        hits,
+        first_sentence(transcript, hits, HISTORY_MARKER),
+        first_sentence(transcript, hits, MEDICATION_MARKER),
+        extract_structured(transcript),
+        specialty,
     )
 
 
-def extract_assessment(text: str) -> str:
-    """Extract assessment from text."""
-    # Look for conditions mentioned in the text
-    conditions = []
+def render_rule_based_sections(
+    terms: Iterable[str],
+    history_sentence: Optional[str],
+    medication_sentence: Optional[str],
+    findings: StructuredFindings,
+    specialty: str = DEFAULT_SPECIALTY
+) -> Dict[str, str]:
+    """
+    Build the rule-based SOAP sections from what the extractors found.
     
-    if "hypertension" in text.lower():
-        conditions.append("Hypertension")
+    Args:
+        terms: Rule pack terms present in the transcript
+        history_sentence: First sentence mentioning history, if any
+        medication_sentence: First sentence mentioning what the patient takes, if any
+        findings: Structured vitals and medication doses
+        specialty: The medical specialty whose rule pack renders the sections
+        
+    Returns:
+        Dictionary with SOAP sections
+    """
+    # Sample cases return a canned note
+    sections = rule_packs.get(specialty).sample_case(terms)
+    if sections is not None:
+        return sections
     
-    if "diabetes" in text.lower():
-        conditions.append("Type 2 diabetes mellitus")
+    # Generic case
+    subjective = (
+        "Patient presents with " + extract_chief_complaint("", terms, specialty) + ". " +
+        format_history(history_sentence, medication_sentence, findings, specialty)
+    )
     
-    if "chest pain" in text.lower():
-        conditions.append("Acute chest pain, etiology to be determined")
+    objective = (
+        "Vital Signs: " + extract_vitals("", findings) + "\n" +
+        extract_physical_exam("", specialty)
+    )
     
-    if "headache" in text.lower():
-        conditions.append("Headache, likely tension-type")
+    assessment = extract_assessment("", terms, specialty)
     
-    if not conditions:
-        conditions.append("General health examination")
+    plan = extract_plan("", terms, specialty)
     
-    return "\n".join(f"{i+1}. {condition}" for i, condition in enumerate(conditions))
+    return {
+        "subjective": subjective,
+        "objective": objective,
+        "assessment": assessment,
+        "plan": plan
+    }
 
 
-def extract_plan(text: str) -> str:
-    """Extract treatment plan from text."""
-    # Based on conditions in the assessment
-    plans = []
-    
-    if "hypertension" in text.lower():
-        plans.append("Continue antihypertensive medication. Monitor blood pressure at home.")
+def _numbered(lines: List[str]) -> str:
+    return "\n".join(f"{i+1}. {line}" for i, line in enumerate(lines))
+
+
+def parse_model_output(generated: str) -> Optional[Dict[str, str]]:
+    """
+    Split seq2seq output of the form "Subjective: ... Objective: ..." into
+    SOAP sections. Returns None if no section header is present.
+    """
+    headers = list(SECTION_HEADER.finditer(generated))
+    if not headers:
+        return None
     
-    if "diabetes" in text.lower():
-        plans.append("Continue current diabetes management. Check HbA1c in 3 months.")
+    sections = {"subjective": "", "objective": "", "assessment": "", "plan": ""}
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(generated)
+        sections[header.group(1).lower()] = generated[header.end():end].strip()
+    return sections
+
+
+def extract_chief_complaint(
+    text: str, hits: Optional[Iterable[str]] = None, specialty: str = DEFAULT_SPECIALTY
+) -> str:
+    """Extract chief complaint from text."""
+    if hits is None:
+        hits = scan_terms(text, specialty)
+    return rule_packs.get(specialty).chief_complaint(hits)
+
+
+def _sentence_at(text: str, index: int) -> str:
+    """The sentence of text containing offset index."""
+    start = 0
+    for match in SENTENCE_END.finditer(text, 0, index):
+        start = match.end()
+    end_match = SENTENCE_END.search(text, index)
+    end = end_match.start() + 1 if end_match else len(text)
+    return text[start:end].strip()
+
+
+def first_sentence(text: str, hits: TermHits, term: str) -> Optional[str]:
+    """The sentence holding the first occurrence of term, or None."""
+    index = hits.first(term)
+    return _sentence_at(text, index) if index is not None else None
+
+
+def format_history(
+    history_sentence: Optional[str],
+    medication_sentence: Optional[str],
+    findings: StructuredFindings,
+    specialty: str = DEFAULT_SPECIALTY
+) -> str:
+    """Render the history part of the subjective section."""
+    history_parts = []
+    if history_sentence:
+        history_parts.append(history_sentence)
     
-    if "chest pain" in text.lower():
-        plans.append("ECG and cardiac enzymes. Consider stress test if initial tests negative.")
+    # Medications with doses, or the sentence that mentions what they take
+    if findings.medications:
+        medications = ", ".join(format_medication(medication) for medication in findings.medications)
+        history_parts.append(f"Current medications: {medications}.")
+    elif medication_sentence:
+        history_parts.append(medication_sentence)
     
-    if "headache" in text.lower():
-        plans.append("OTC analgesics as needed. Stress management techniques discussed.")
+    if history_parts:
+        return " ".join(history_parts)
+    else:
+        return rule_packs.get(specialty).defaults["history"]
+
+
+def extract_history(
+    text: str,
+    hits: Optional[TermHits] = None,
+    findings: Optional[StructuredFindings] = None,
+    specialty: str = DEFAULT_SPECIALTY
+) -> str:
+    """Extract patient history from text."""
+    if hits is None:
+        hits = scan_terms(text, specialty)
+    if findings is None:
+        findings = extract_structured(text)
+    return format_history(
+        first_sentence(text, hits, HISTORY_MARKER),
+        first_sentence(text, hits, MEDICATION_MARKER),
+        findings,
+        specialty,
+    )
+
+
+def extract_vitals(text: str, findings: Optional[StructuredFindings] = None) -> str:
+    """Extract vital signs from text."""
+    if findings is None:
+        findings = extract_structured(text)
+    return format_vitals(findings.vitals) or NO_VITALS
+
+
+def extract_physical_exam(text: str, specialty: str = DEFAULT_SPECIALTY) -> str:
+    """Extract physical examination findings from text."""
+    return rule_packs.get(specialty).defaults["physical_exam"]
+
+
+def extract_assessment(
+    text: str, hits: Optional[Iterable[str]] = None, specialty: str = DEFAULT_SPECIALTY
+) -> str:
+    """Extract assessment from text."""
+    if hits is None:
+        hits = scan_terms(text, specialty)
     
-    if not plans:
-        plans.append("Routine health maintenance. Follow up in 1 year.")
+    # Look for conditions mentioned in the text
+    pack = rule_packs.get(specialty)
+    return _numbered(pack.assessments(hits) or [pack.defaults["assessment"]])
+
+
+def extract_plan(
+    text: str, hits: Optional[Iterable[str]] = None, specialty: str = DEFAULT_SPECIALTY
+) -> str:
+    """Extract treatment plan from text."""
+    if hits is None:
+        hits = scan_terms(text, specialty)
     
-    return "\n".join(f"{i+1}. {plan}" for i, plan in enumerate(plans)) 
\ No newline at end of file
+    # Based on conditions in the assessment
+    pack = rule_packs.get(specialty)
+    return _numbered(pack.plans(hits) or [pack.defaults["plan"]])
@@ -0,0 +1,240 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from nlp.lexicon import get_lexicon
+
+# Filler allowed between a vital's name and its value ("heart rate is 92", "BP today was 138/84")
+LINK = r"(?:\s*(?:is|was|of|at|=|:|,|-)\s*|\s+(?:today|now|reading|measured|recorded|about|around)\b|\s+)+"
+
+ROUTES = {
+    "po": "PO", "by mouth": "PO", "orally": "PO", "oral": "PO",
+    "iv": "IV", "intravenously": "IV", "intravenous": "IV",
+    "im": "IM", "intramuscularly": "IM", "intramuscular": "IM",
+    "sl": "SL", "sublingual": "SL", "sublingually": "SL",
+    "subq": "SC", "sc": "SC", "subcutaneously": "SC", "subcutaneous": "SC",
+    "inhaled": "INH", "topical": "TOP", "topically": "TOP",
+}
+
+FREQUENCIES = {
+    "once daily": "daily", "once a day": "daily", "daily": "daily", "every day": "daily", "qd": "daily",
+    "twice daily": "BID", "twice a day": "BID", "bid": "BID",
+    "three times daily": "TID", "three times a day": "TID", "tid": "TID",
+    "four times daily": "QID", "four times a day": "QID", "qid": "QID",
+    "at bedtime": "QHS", "nightly": "QHS", "qhs": "QHS",
+    "as needed": "PRN", "prn": "PRN", "weekly": "weekly", "once a week": "weekly",
+}
+
+UNITS = {
+    "mg": "mg", "milligram": "mg", "milligrams": "mg",
+    "mcg": "mcg", "microgram": "mcg", "micrograms": "mcg",
+    "g": "g", "gram": "g", "grams": "g",
+    "ml": "mL", "milliliter": "mL", "milliliters": "mL",
+    "unit": "units", "units": "units", "iu": "units",
+}
+
+# Units that can follow a vital sign's value
+TEMPERATURE_UNITS = ["f", "c", "fahrenheit", "celsius"]
+WEIGHT_UNITS = ["kg", "kilogram", "kilograms", "lb", "lbs", "pound", "pounds"]
+PERCENT = ["%", "percent"]
+
+
+def _alternation(words) -> str:
+    # Longest first so "once a day" wins over "once"
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# Every reading is a number, so the scan is anchored on numbers: one pass
+# over the transcript finds each number with whatever follows it (a second
+# blood pressure figure, a unit, a route and frequency), and what precedes
+# it decides what it measures.
+READING_PATTERN = re.compile(
+    rf"""
+    (?<![\w.])(?P<value>\d+(?:\.\d+)?)
+    (?:\s*(?:/|over)\s*(?P<diastolic>\d{{2,3}})\b)?
+    (?:\s*(?:°\s*|degrees\s*)?(?P<unit>{_alternation(list(UNITS) + TEMPERATURE_UNITS + WEIGHT_UNITS + PERCENT)})(?!\w))?
+    (?:\s+(?P<route>{_alternation(ROUTES)})\b)?
+    (?:\s+(?P<frequency>{_alternation(FREQUENCIES)})\b)?
+    """,
+    re.VERBOSE,
+)
+
+# The vital named right before a number
+VITAL_BEFORE = re.compile(
+    rf"""
+    \b(?:(?P<bp>bp|blood\s+pressure)
+    | (?P<heart_rate>hr|heart\s+rate|pulse(?:\s+rate)?)
+    | (?P<respiratory_rate>rr|resp(?:iratory)?\s+rate|respirations)
+    | (?P<temperature>temp(?:erature)?)
+    | (?P<spo2>spo2|sp02|o2\s+sats?|o2\s+saturation|oxygen\s+saturation|saturation|sats)
+    | (?P<weight>weight|weighs|wt)
+    ){LINK}$
+    """,
+    re.VERBOSE,
+)
+
+# The one or two words right before a dose ("insulin glargine 20 units")
+DRUG_BEFORE = re.compile(r"(?:([a-z][a-z-]{2,})\s+)?([a-z][a-z-]{2,})\s+$")
+
+# How far back from a number to look for what it belongs to
+LOOKBEHIND = 48
+
+# Plausible ranges; anything outside is another number next to the vital's name
+VITAL_RANGES = {
+    "heart_rate": (20, 250),
+    "respiratory_rate": (4, 60),
+    "spo2": (50, 100),
+    "weight": (1, 700),
+}
+
+# Plausible body temperatures by unit
+TEMPERATURE_RANGES = {
+    "F": (90, 110),
+    "C": (30, 45),
+}
+
+# Key each vital is stored under, to tell whether it was already found
+VITAL_KEYS = {"bp": "bp_systolic"}
+
+
+class Vitals(NamedTuple):
+    bp_systolic: Optional[int] = None
+    bp_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    respiratory_rate: Optional[int] = None
+    temperature: Optional[float] = None
+    temperature_unit: Optional[str] = None  # "F" or "C"
+    spo2: Optional[int] = None
+    weight: Optional[float] = None
+    weight_unit: Optional[str] = None  # "kg" or "lb"
+
+
+class MedicationDose(NamedTuple):
+    drug: str
+    dose: float
+    unit: str
+    route: Optional[str]
+    frequency: Optional[str]
+    start: int
+    end: int
+
+
+class StructuredFindings(NamedTuple):
+    vitals: Vitals
+    medications: List[MedicationDose]
+
+
+def _temperature_unit(value: float, unit: Optional[str]) -> str:
+    if unit in TEMPERATURE_UNITS:
+        return unit[0].upper()
+    # Unlabelled readings are Celsius only in the plausible Celsius range
+    return "C" if value < 45 else "F"
+
+
+def _weight_unit(unit: Optional[str]) -> Optional[str]:
+    if unit not in WEIGHT_UNITS:
+        return None
+    return "kg" if unit.startswith("k") else "lb"
+
+
+def extract_structured(text: str, lexicon_path: str = "") -> StructuredFindings:
+    """
+    Pull vitals and medication doses out of a transcript in one pass.
+
+    The first plausible value found for each vital wins. Dose mentions count only
+    when the one or two words before the dose name a medication in the
+    clinical lexicon, and repeated mentions of the same drug, dose and
+    route are reported once.
+
+    Args:
+        text: The transcript text
+        lexicon_path: Compiled lexicon to name medications with; empty for the bundled one
+
+    Returns:
+        StructuredFindings with typed vitals and medication doses
+    """
+    vitals = {}
+    medications = []
+    seen = set()
+    lexicon = get_lexicon(lexicon_path)
+    # Lowercasing once is cheaper than a case-insensitive pattern
+    lowered = text.lower()
+    for match in READING_PATTERN.finditer(lowered):
+        value, diastolic, unit = match.group("value"), match.group("diastolic"), match.group("unit")
+        context_start = max(0, match.start() - LOOKBEHIND)
+        label = VITAL_BEFORE.search(lowered, context_start, match.start())
+        if label is not None:
+            vital = label.lastgroup
+            if VITAL_KEYS.get(vital, vital) in vitals:
+                continue
+            if vital == "bp":
+                if diastolic:
+                    vitals["bp_systolic"], vitals["bp_diastolic"] = int(float(value)), int(diastolic)
+            elif vital == "temperature":
+                temperature_unit = _temperature_unit(float(value), unit)
+                low, high = TEMPERATURE_RANGES[temperature_unit]
+                if low <= float(value) <= high:
+                    vitals["temperature"] = float(value)
+                    vitals["temperature_unit"] = temperature_unit
+            elif VITAL_RANGES[vital][0] <= float(value) <= VITAL_RANGES[vital][1]:
+                if vital == "weight":
+                    vitals["weight"] = float(value)
+                    vitals["weight_unit"] = _weight_unit(unit)
+                else:
+                    vitals[vital] = int(float(value))
+            continue
+
+        if unit not in UNITS:
+            continue
+        words = DRUG_BEFORE.search(lowered, context_start, match.start())
+        if words is None:
+            continue
+        # Two-word names ("insulin glargine") first, then just the word before the dose
+        entry = lexicon.lookup(words.group(0)) if words.group(1) else None
+        drug_start = words.start()
+        if entry is None or entry[0] != "medication":
+            entry = lexicon.lookup(words.group(2))
+            drug_start = words.start(2)
+        if entry is None or entry[0] != "medication":
+            continue
+        drug, dose, route = entry[1], float(value), ROUTES.get(match.group("route"))
+        if (drug, dose, UNITS[unit], route) in seen:
+            continue
+        seen.add((drug, dose, UNITS[unit], route))
+        medications.append(MedicationDose(
+            drug=drug,
+            dose=dose,
+            unit=UNITS[unit],
+            route=route,
+            frequency=FREQUENCIES.get(match.group("frequency")),
+            start=drug_start,
+            end=match.end(),
+        ))
+    return StructuredFindings(Vitals(**vitals), medications)
+
+
+def format_vitals(vitals: Vitals) -> str:
+    """Render vitals the way the objective section lists them ("BP 150/90, HR 92, ...")."""
+    parts = []
+    if vitals.bp_systolic is not None:
+        parts.append(f"BP {vitals.bp_systolic}/{vitals.bp_diastolic}")
+    if vitals.heart_rate is not None:
+        parts.append(f"HR {vitals.heart_rate}")
+    if vitals.respiratory_rate is not None:
+        parts.append(f"RR {vitals.respiratory_rate}")
+    if vitals.temperature is not None:
+        parts.append(f"Temp {vitals.temperature:g}{vitals.temperature_unit}")
+    if vitals.spo2 is not None:
+        parts.append(f"SpO2 {vitals.spo2}%")
+    if vitals.weight is not None:
+        parts.append(f"Weight {vitals.weight:g}{' ' + vitals.weight_unit if vitals.weight_unit else ''}")
+    return ", ".join(parts)
+
+
+def format_medication(medication: MedicationDose) -> str:
+    """Render a dose mention as "lisinopril 10mg PO daily"."""
+    parts = [f"{medication.drug} {medication.dose:g}{medication.unit}"]
+    if medication.route:
+        parts.append(medication.route)
+    if medication.frequency:
+        parts.append(medication.frequency)
+    return " ".join(parts)
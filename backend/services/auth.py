@@ -10,6 +10,9 @@ from core.config import settings
 from models.token import TokenData
 from models.user import User, UserDB
 from services.database import get_user_collection
+from services.cache import TTLLRUCache
+from services.hashing import hash_pool
+from services.revocation import token_versions
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,30 +20,48 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+# Authenticated user records keyed by token subject (email). Writes in this
+# process invalidate entries; the TTL bounds staleness across processes.
+user_cache = TTLLRUCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash on the hashing pool."""
+    return await hash_pool.run(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    """Generate a password hash."""
-    return pwd_context.hash(password)
 
+async def get_password_hash(password: str) -> str:
+    """Generate a password hash on the hashing pool."""
+    return await hash_pool.run(pwd_context.hash, password)
 
-def get_user(email: str) -> Optional[Dict[str, Any]]:
+
+async def get_user(email: str) -> Optional[Dict[str, Any]]:
     """Get a user by email."""
     user_collection = get_user_collection()
-    user = user_collection.find_one({"email": email})
+    user = await user_collection.find_one({"email": email})
     return user
 
 
-def authenticate_user(email: str, password: str) -> Optional[Dict[str, Any]]:
+def invalidate_cached_user(*emails: Optional[str]) -> None:
+    """Drop cached user records for the given emails."""
+    for email in emails:
+        if email:
+            user_cache.invalidate(email)
+
+
+def get_user_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters of the authenticated-user cache."""
+    return user_cache.stats()
+
+
+async def authenticate_user(email: str, password: str) -> Optional[Dict[str, Any]]:
     """Authenticate a user with email and password."""
-    user = get_user(email)
+    user = await get_user(email)
     if not user:
         return None
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password(password, user["hashed_password"]):
         return None
     return user
 
@@ -64,8 +85,35 @@ def create_access_token(
     return encoded_jwt
 
 
+def build_token_claims(user: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the JWT claims for a user.
+    
+    In claims mode the token also carries the user's ID, role, active flag
+    and current token version, so requests can be authenticated without
+    reading the user document.
+    """
+    claims = {"sub": user["email"]}
+    if settings.AUTH_TOKEN_MODE == "claims":
+        user_id = str(user["_id"])
+        claims.update({
+            "uid": user_id,
+            "role": user.get("role"),
+            "active": user.get("is_active", False),
+            "ver": token_versions.current_version(user_id),
+        })
+    return claims
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
-    """Get the current user from JWT token."""
+    """
+    Get the current user from JWT token.
+    
+    Claims-carrying tokens are checked against the in-memory token version
+    table and need no database access; the returned user then only holds the
+    identity fields from the token. Other tokens are resolved through the
+    user cache and, on a miss, the users collection.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,13 +127,34 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(
+            username=username,
+            user_id=payload.get("uid"),
+            role=payload.get("role"),
+            is_active=payload.get("active"),
+            version=payload.get("ver"),
+        )
     except JWTError:
         raise credentials_exception
     
-    user = get_user(email=token_data.username)
+    if settings.AUTH_TOKEN_MODE == "claims" and token_data.version is not None:
+        if token_data.user_id is None or not ObjectId.is_valid(token_data.user_id):
+            raise credentials_exception
+        if not token_versions.is_current(token_data.user_id, token_data.version):
+            raise credentials_exception
+        return {
+            "_id": ObjectId(token_data.user_id),
+            "email": token_data.username,
+            "role": token_data.role,
+            "is_active": token_data.is_active,
+        }
+    
+    user = user_cache.get(token_data.username)
     if user is None:
-        raise credentials_exception
+        user = await get_user(email=token_data.username)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(token_data.username, user)
     
     return user
 
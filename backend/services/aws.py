@@ -0,0 +1,140 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+from core.config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# AWS services the backend talks to, created together at startup
+SERVICES = ["s3", "transcribe"]
+
+
+class AsyncAwsClient:
+    """
+    Awaitable view of a boto3 client.
+
+    Every method call runs on the shared AWS thread pool instead of the
+    event loop: `await aws_clients.s3.upload_part(...)` takes the same
+    arguments and returns the same response as the boto3 method. The
+    underlying client is available as .client, e.g. for its exceptions.
+    """
+
+    def __init__(self, client: Any, executor: ThreadPoolExecutor):
+        self.client = client
+        self._executor = executor
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+        return call
+
+
+class AwsClients:
+    """
+    Process-wide boto3 clients with tuned connection pools and retries.
+
+    Building a boto3 client resolves credentials, loads the service model
+    and opens a new connection pool, which costs tens of milliseconds, so
+    the clients are created once at startup and shared; boto3 clients are
+    thread-safe. Calls run on a thread pool sized to max_pool_connections,
+    so every thread can get a pooled connection and no call waits on the
+    pool while holding a thread.
+    """
+
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        endpoint_url: str = "",
+        access_key_id: str = "",
+        secret_access_key: str = "",
+        max_pool_connections: int = 50,
+        max_attempts: int = 3,
+        connect_timeout: float = 5,
+        read_timeout: float = 60
+    ):
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={"max_attempts": max_attempts, "mode": "standard"},
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.region = region
+        self.endpoint_url = endpoint_url or None
+        self.access_key_id = access_key_id or None
+        self.secret_access_key = secret_access_key or None
+        self.max_pool_connections = max_pool_connections
+        self._clients: Dict[str, AsyncAwsClient] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the clients; called from the lifespan, or on first use."""
+        with self._lock:
+            if self._clients:
+                return
+            # Sessions are not thread-safe; clients made from one are
+            session = boto3.session.Session(
+                aws_access_key_id=self.access_key_id,
+                aws_secret_access_key=self.secret_access_key,
+                region_name=self.region,
+            )
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_pool_connections, thread_name_prefix="aws"
+            )
+            self._clients = {
+                service: AsyncAwsClient(
+                    session.client(service, config=self.config, endpoint_url=self.endpoint_url),
+                    self._executor,
+                )
+                for service in SERVICES
+            }
+            logger.info(f"Created AWS clients for {', '.join(SERVICES)}")
+
+    def get(self, service: str) -> AsyncAwsClient:
+        """The shared client for an AWS service."""
+        if not self._clients:
+            self.start()
+        return self._clients[service]
+
+    @property
+    def s3(self) -> AsyncAwsClient:
+        return self.get("s3")
+
+    @property
+    def transcribe(self) -> AsyncAwsClient:
+        return self.get("transcribe")
+
+    def close(self) -> None:
+        """Close the clients' connection pools and stop the worker threads."""
+        with self._lock:
+            for client in self._clients.values():
+                client.client.close()
+            self._clients = {}
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+                logger.info("AWS clients closed")
+
+
+aws_clients = AwsClients(
+    region=settings.AWS_REGION,
+    endpoint_url=settings.AWS_ENDPOINT_URL,
+    access_key_id=settings.AWS_ACCESS_KEY_ID,
+    secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+    max_attempts=settings.AWS_MAX_ATTEMPTS,
+    connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.AWS_READ_TIMEOUT_SECONDS,
+)
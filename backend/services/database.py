@@ -1,6 +1,9 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from bson import ObjectId
 from core.config import settings
 import logging
+from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -8,24 +11,135 @@ logger = logging.getLogger(__name__)
 # MongoDB client
 client = None
 
+# Indexes ensured at startup, keyed by collection name
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "notes": [
+        IndexModel(
+            [
+                ("user_id", ASCENDING),
+                ("patient_id", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="user_patient_created_id",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_id",
+        ),
+    ],
+    "transcriptions": [
+        IndexModel([("job_id", ASCENDING), ("user_id", ASCENDING)], name="job_user"),
+    ],
+    "token_versions": [
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "jobs": [
+        IndexModel([("kind", ASCENDING), ("key", ASCENDING)], unique=True, name="kind_key_unique"),
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_expires_at"),
+        IndexModel(
+            [("finished_at", ASCENDING)],
+            name="finished_at_ttl",
+            expireAfterSeconds=settings.JOB_RETENTION_DAYS * 24 * 60 * 60,
+        ),
+    ],
+    "soap_cache": [
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=settings.SOAP_CACHE_TTL_DAYS * 24 * 60 * 60,
+        ),
+    ],
+}
+
+# Representative shapes of the hot queries, used to verify their query plans
+HOT_QUERIES = [
+    ("users", {"email": "plan-check@example.com"}, None),
+    ("notes", {"user_id": ObjectId()}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    (
+        "notes",
+        {"user_id": ObjectId(), "patient_id": "plan-check"},
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    ("transcriptions", {"job_id": "plan-check", "user_id": ObjectId()}, None),
+    (
+        "jobs",
+        {"status": "queued", "kind": {"$in": ["plan-check"]}, "run_at": {"$lte": datetime.utcnow()}},
+        [("run_at", ASCENDING)],
+    ),
+]
+
 
 def get_database():
     """Get the MongoDB database instance."""
     global client
     if client is None:
-        try:
-            logger.info(f"Connecting to MongoDB at {settings.MONGODB_URL}")
-            client = MongoClient(settings.MONGODB_URL)
-            # Test connection
-            client.admin.command('ping')
-            logger.info("Connected to MongoDB")
-        except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
-            raise
-    
+        logger.info(f"Connecting to MongoDB at {settings.MONGODB_URL}")
+        client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        )
+
     return client[settings.DATABASE_NAME]
 
 
+async def connect_to_mongo():
+    """Open the MongoDB connection and verify it is reachable."""
+    try:
+        await get_database().client.admin.command('ping')
+        logger.info("Connected to MongoDB")
+    except Exception as e:
+        logger.error(f"Failed to connect to MongoDB: {e}")
+        raise
+
+
+async def ensure_indexes():
+    """Create the declared indexes. Existing indexes are left untouched."""
+    db = get_database()
+    for collection_name, indexes in INDEXES.items():
+        names = await db[collection_name].create_indexes(indexes)
+        logger.info(f"Ensured indexes on {collection_name}: {', '.join(names)}")
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+async def verify_query_plans():
+    """
+    Run explain() on each hot query and fail if any of them scans a collection.
+
+    Raises:
+        RuntimeError: If a winning plan contains a COLLSCAN stage
+    """
+    db = get_database()
+    offenders = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            offenders.append(f"{collection_name} {query} sort={sort}")
+
+    if offenders:
+        raise RuntimeError(f"Queries without index support: {'; '.join(offenders)}")
+    logger.info(f"Verified query plans for {len(HOT_QUERIES)} hot queries")
+
+
 def get_user_collection():
     """Get the users collection."""
     db = get_database()
@@ -44,10 +158,28 @@ def get_notes_collection():
     return db["notes"]
 
 
+def get_token_versions_collection():
+    """Get the per-user token versions collection."""
+    db = get_database()
+    return db["token_versions"]
+
+
+def get_soap_cache_collection():
+    """Get the generated SOAP sections cache collection."""
+    db = get_database()
+    return db["soap_cache"]
+
+
+def get_jobs_collection():
+    """Get the background jobs collection."""
+    db = get_database()
+    return db["jobs"]
+
+
 def close_mongo_connection():
     """Close the MongoDB connection."""
     global client
     if client is not None:
         client.close()
         client = None
-        logger.info("MongoDB connection closed") 
\ No newline at end of file
+        logger.info("MongoDB connection closed")
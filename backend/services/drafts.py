@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Dict, Any, List
+from weakref import WeakValueDictionary
+
+from core.config import settings
+from models.note import ClinicalNote, DraftUpdate, MedicationOrder, VitalSigns
+from models.transcription import TranscriptionResponse, TranscriptionSegment
+from services.database import get_notes_collection, get_transcriptions_collection
+from nlp.incremental import IncrementalSoapDraft
+from nlp.structured import StructuredFindings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# One lock per live session so its segments are applied in order
+_job_locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+
+# Transcription fields needed to update a draft
+DRAFT_PROJECTION = {"status": 1, "specialty": 1, "draft_note_id": 1, "draft_state": 1, "draft_version": 1}
+
+
+def _structured_fields(findings: StructuredFindings) -> Dict[str, Any]:
+    return {
+        "vitals": VitalSigns(**findings.vitals._asdict()).dict(),
+        "medications": [
+            MedicationOrder(**medication._asdict()).dict() for medication in findings.medications
+        ],
+    }
+
+
+async def append_segments(
+    job_id: str,
+    user_id: str,
+    segments: List[TranscriptionSegment]
+) -> DraftUpdate:
+    """
+    Add segments to a live transcription and update its draft note.
+
+    Only the new segments are run through the extractors; the draft state
+    saved with the transcription carries everything found before. The
+    draft note is created by the first call; every call writes all of its
+    sections, and the ones that changed are returned.
+
+    Segments for one job may reach several API processes, so the draft is
+    saved only if its draft_version is still the one it was built from;
+    otherwise the draft is reloaded and the segments applied again. The
+    note is written after that with the same version and never replaces a
+    newer one. The per-job lock only saves those retries within a process.
+
+    Args:
+        job_id: The ID of the transcription job
+        user_id: The ID of the user who started the job
+        segments: New segments, in order
+
+    Returns:
+        DraftUpdate with the draft note's ID and the sections that changed
+
+    Raises:
+        ValueError: If the job does not exist or is no longer in progress
+    """
+    lock = _job_locks.setdefault(job_id, asyncio.Lock())
+    async with lock:
+        try:
+            while True:
+                transcription = await get_transcriptions_collection().find_one(
+                    {"job_id": job_id, "user_id": ObjectId(user_id)}, DRAFT_PROJECTION
+                )
+
+                if not transcription:
+                    raise ValueError(f"Transcription job {job_id} not found")
+
+                if transcription["status"] != "in_progress":
+                    raise ValueError(f"Transcription job {job_id} is not in progress")
+
+                draft = IncrementalSoapDraft.from_state(
+                    transcription.get("draft_state"), transcription["specialty"], settings.NLP_LEXICON_PATH
+                )
+                changed: Dict[str, str] = {}
+                for segment in segments:
+                    changed.update(draft.add_segment(segment.text))
+                now = datetime.utcnow()
+
+                note_id = transcription.get("draft_note_id")
+                if note_id is None:
+                    # First segments: the draft note is created with every section
+                    note_id = ObjectId()
+                    changed = dict(draft.sections)
+
+                # None also matches a transcription saved before drafts were versioned
+                version = transcription.get("draft_version")
+                result = await get_transcriptions_collection().update_one(
+                    {"_id": transcription["_id"], "status": "in_progress", "draft_version": version},
+                    {
+                        "$push": {"segments": {"$each": [segment.dict() for segment in segments]}},
+                        "$set": {
+                            "draft_note_id": note_id,
+                            "draft_state": draft.to_state(),
+                            "updated_at": now
+                        },
+                        "$inc": {"draft_version": 1}
+                    }
+                )
+                if result.matched_count:
+                    break
+                logger.info(f"Draft of {job_id} changed concurrently, applying segments again")
+
+            await _save_draft_note(note_id, (version or 0) + 1, transcription, user_id, draft, now)
+            return DraftUpdate(note_id=note_id, segments=draft.segments, sections=changed)
+
+        except Exception as e:
+            logger.error(f"Error updating draft note: {str(e)}")
+            raise
+
+
+async def _save_draft_note(
+    note_id: ObjectId,
+    version: int,
+    transcription: Dict[str, Any],
+    user_id: str,
+    draft: IncrementalSoapDraft,
+    now: datetime
+) -> None:
+    # Writes version of the draft note, creating it if needed, unless a newer one is saved
+    fields = {**draft.sections, **_structured_fields(draft.findings()), "updated_at": now}
+    note = ClinicalNote(
+        user_id=ObjectId(user_id),
+        transcription_id=transcription["_id"],
+        specialty=transcription["specialty"],
+        status="draft",
+        created_at=now,
+        **fields
+    ).dict(by_alias=True, exclude={"id"})
+    fields["draft_version"] = version
+    try:
+        await get_notes_collection().update_one(
+            {"_id": note_id, "draft_version": {"$not": {"$gte": version}}},
+            {
+                "$set": fields,
+                "$setOnInsert": {key: value for key, value in note.items() if key not in fields}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The note exists with a newer version
+        pass
+
+
+async def complete_live_transcription(job_id: str, user_id: str) -> TranscriptionResponse:
+    """
+    Mark a live transcription as completed.
+
+    The transcript is assembled from the segments received. The draft note
+    is already up to date at this point.
+
+    Args:
+        job_id: The ID of the transcription job
+        user_id: The ID of the user who started the job
+
+    Returns:
+        TranscriptionResponse object with the completed transcription
+
+    Raises:
+        ValueError: If the job does not exist or is no longer in progress
+    """
+    lock = _job_locks.setdefault(job_id, asyncio.Lock())
+    async with lock:
+        try:
+            while True:
+                transcription = await get_transcriptions_collection().find_one(
+                    {"job_id": job_id, "user_id": ObjectId(user_id)},
+                    {"status": 1, "segments": 1, "draft_version": 1}
+                )
+
+                if not transcription:
+                    raise ValueError(f"Transcription job {job_id} not found")
+
+                if transcription["status"] != "in_progress":
+                    raise ValueError(f"Transcription job {job_id} is not in progress")
+
+                # Segments added elsewhere in the meantime bump draft_version
+                transcript = " ".join(segment["text"] for segment in transcription.get("segments", []))
+                transcription = await get_transcriptions_collection().find_one_and_update(
+                    {
+                        "_id": transcription["_id"],
+                        "status": "in_progress",
+                        "draft_version": transcription.get("draft_version")
+                    },
+                    {
+                        "$set": {
+                            "status": "completed",
+                            "transcript": transcript,
+                            "updated_at": datetime.utcnow()
+                        },
+                        "$inc": {"draft_version": 1}
+                    },
+                    return_document=ReturnDocument.AFTER
+                )
+                if transcription:
+                    break
+
+            return TranscriptionResponse(**transcription)
+
+        except Exception as e:
+            logger.error(f"Error completing transcription: {str(e)}")
+            raise
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from core.config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing capacity exceeded")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt work on a dedicated thread pool with admission control.
+
+    bcrypt releases the GIL while hashing, so a small thread pool keeps the
+    event loop free. At most max_workers operations run at once and at most
+    max_queue more wait; anything beyond that is rejected immediately so a
+    login storm degrades to fast 503s instead of an unbounded backlog.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = None
+        self._in_flight = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the pool.
+
+        Raises:
+            HashingPoolBusy: If the pool and its queue are both full
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingPoolBusy(self.retry_after)
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Current load and rejection counters."""
+        return {
+            "in_flight": self._in_flight,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            logger.info("Password hashing pool shut down")
+
+
+hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
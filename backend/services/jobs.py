@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from services.database import get_jobs_collection
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+FailureHandler = Callable[[Dict[str, Any], str], Awaitable[None]]
+
+# Longest wait between retries of a failing job
+MAX_RETRY_DELAY = timedelta(minutes=5)
+
+
+class JobRunner:
+    """
+    Background jobs queued in MongoDB and run by every process that starts a runner.
+
+    A job is claimed with a single find_one_and_update that moves it from
+    queued to running and stamps it with this runner's owner ID, a fresh
+    lease token and a lease expiry, so however many processes and nodes
+    poll the jobs collection, each claim goes to exactly one of them. While
+    a job runs its lease is renewed every third of the lease; every later
+    write is conditional on the lease token, so a runner that lost its
+    lease (paused, partitioned) can neither complete nor retry a job that
+    another runner has since reclaimed. A running job whose lease expired,
+    because its process died, is claimed again like a queued one.
+
+    A job that raises is queued again with exponential backoff until it
+    has made max_attempts attempts, then marked failed and handed to its
+    kind's failure handler. Since an expired lease means a job may have
+    been partly run, handlers must be idempotent.
+
+    Each runner runs at most concurrency jobs at once; a process started
+    with a concurrency of 0 enqueues jobs but never runs them.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        lease_seconds: float = 30,
+        poll_seconds: float = 1,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5
+    ):
+        self.concurrency = concurrency
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = timedelta(seconds=retry_base_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Tuple[JobHandler, Optional[FailureHandler]]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.claimed = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.lost_leases = 0
+
+    def register(self, kind: str, handler: JobHandler, on_failure: Optional[FailureHandler] = None) -> None:
+        """
+        Register the handler for a kind of job.
+
+        Args:
+            kind: Job kind, as passed to enqueue()
+            handler: Coroutine function run with the job's payload
+            on_failure: Coroutine function run with the payload and last
+                error once the job has failed for good
+        """
+        self._handlers[kind] = (handler, on_failure)
+
+    async def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: Dict[str, Any],
+        delay: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a job, once per kind and key.
+
+        Args:
+            kind: Job kind; a handler must be registered for it
+            key: Identifies the job within its kind; enqueueing the same
+                key again returns the existing job
+            payload: Passed to the handler
+            delay: Seconds before the job may run
+            max_attempts: Attempts before the job fails; defaults to the runner's
+
+        Returns:
+            The job document
+
+        Raises:
+            ValueError: If no handler is registered for kind
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for {kind} jobs")
+
+        now = datetime.utcnow()
+        job = {
+            "kind": kind,
+            "key": key,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "run_at": now + timedelta(seconds=delay),
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            result = await get_jobs_collection().insert_one(job)
+            job["_id"] = result.inserted_id
+        except DuplicateKeyError:
+            return await get_jobs_collection().find_one({"kind": kind, "key": key})
+
+        if self._wake is not None and not delay:
+            self._wake.set()
+        return job
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        claim = {
+            "$set": {
+                "status": "running",
+                "owner": self.owner,
+                "lease_token": uuid.uuid4().hex,
+                "lease_expires_at": now + self.lease,
+                "started_at": now,
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        }
+        kinds = {"$in": list(self._handlers)}
+        # Jobs abandoned by a dead runner first, then the oldest due job
+        for query, sort in (
+            ({"status": "running", "kind": kinds, "lease_expires_at": {"$lt": now}}, "lease_expires_at"),
+            ({"status": "queued", "kind": kinds, "run_at": {"$lte": now}}, "run_at"),
+        ):
+            job = await get_jobs_collection().find_one_and_update(
+                query, claim, sort=[(sort, 1)], return_document=ReturnDocument.AFTER
+            )
+            if job is not None:
+                return job
+        return None
+
+    async def _settle(self, job: Dict[str, Any], update: Dict[str, Any]) -> bool:
+        # Only the runner holding the lease may change a running job
+        update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+        update.setdefault("$unset", {}).update({"owner": "", "lease_token": "", "lease_expires_at": ""})
+        result = await get_jobs_collection().update_one(
+            {"_id": job["_id"], "lease_token": job["lease_token"]}, update
+        )
+        return result.matched_count == 1
+
+    async def _heartbeat(self, job: Dict[str, Any], work: asyncio.Task) -> None:
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            now = datetime.utcnow()
+            try:
+                result = await get_jobs_collection().update_one(
+                    {"_id": job["_id"], "lease_token": job["lease_token"]},
+                    {"$set": {"lease_expires_at": now + self.lease, "heartbeat_at": now}},
+                )
+            except Exception as e:
+                # The lease may still be renewed in time; the handler keeps running
+                logger.warning(f"Error renewing lease on job {job['_id']}: {str(e)}")
+                continue
+            if result.matched_count == 0:
+                self.lost_leases += 1
+                logger.warning(f"Lost lease on {job['kind']} job {job['key']}; stopping it")
+                work.cancel()
+                return
+
+    async def _fail(self, job: Dict[str, Any], error: str) -> None:
+        now = datetime.utcnow()
+        if not await self._settle(job, {"$set": {"status": "failed", "last_error": error, "finished_at": now}}):
+            return
+        self.failed += 1
+        logger.error(f"{job['kind']} job {job['key']} failed after {job['attempts']} attempts: {error}")
+        on_failure = self._handlers[job["kind"]][1]
+        if on_failure is not None:
+            try:
+                await on_failure(job["payload"], error)
+            except Exception as e:
+                logger.error(f"Error in failure handler of {job['kind']} job {job['key']}: {str(e)}")
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        try:
+            if job["attempts"] > job["max_attempts"]:
+                # Its lease kept expiring: the job takes its runner down with it
+                await self._fail(job, "Lease expired on every attempt")
+                return
+
+            handler = self._handlers[job["kind"]][0]
+            work = asyncio.ensure_future(handler(job["payload"]))
+            heartbeat = asyncio.ensure_future(self._heartbeat(job, work))
+            try:
+                await work
+            except asyncio.CancelledError:
+                if heartbeat.done() and not heartbeat.cancelled():
+                    # Lease lost: the job belongs to whichever runner reclaimed it
+                    return
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                if job["attempts"] >= job["max_attempts"]:
+                    await self._fail(job, error)
+                else:
+                    delay = min(self.retry_base * 2 ** (job["attempts"] - 1), MAX_RETRY_DELAY)
+                    if await self._settle(job, {"$set": {
+                        "status": "queued", "run_at": datetime.utcnow() + delay, "last_error": error
+                    }}):
+                        self.retried += 1
+                        logger.warning(f"Retrying {job['kind']} job {job['key']} in {delay}: {error}")
+                return
+            finally:
+                heartbeat.cancel()
+
+            if await self._settle(job, {"$set": {"status": "done", "finished_at": datetime.utcnow()}}):
+                self.completed += 1
+
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without counting the attempt
+            await asyncio.shield(self._settle(job, {
+                "$set": {"status": "queued", "run_at": datetime.utcnow()}, "$inc": {"attempts": -1}
+            }))
+            raise
+        except Exception as e:
+            logger.error(f"Error running {job['kind']} job {job['key']}: {str(e)}")
+        finally:
+            self._slots.release()
+
+    async def _run_forever(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                self._slots.release()
+                logger.error(f"Error claiming jobs: {str(e)}")
+                await asyncio.sleep(self.poll_seconds)
+                continue
+
+            if job is None:
+                self._slots.release()
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.claimed += 1
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def start(self) -> None:
+        """Start claiming and running jobs in the background."""
+        if self.concurrency <= 0:
+            logger.info("Job runner disabled in this process")
+            return
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"Job runner {self.owner} started for {', '.join(sorted(self._handlers))} jobs")
+
+    async def stop(self, grace_seconds: float = 10) -> None:
+        """
+        Stop claiming jobs and wait up to grace_seconds for running ones.
+
+        Jobs still running after that are cancelled and queued again.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._running:
+            done, pending = await asyncio.wait(set(self._running), timeout=grace_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs running in this process and counts since startup."""
+        return {
+            "owner": self.owner,
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "lost_leases": self.lost_leases,
+        }
+
+
+job_runner = JobRunner(
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_seconds=settings.JOB_POLL_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+)
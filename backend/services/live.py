@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from asr.streaming import StreamingEngine, StreamingSession, StreamResult, get_streaming_engine
+from core.config import settings
+from models.transcription import TranscriptionSegment
+from services.drafts import append_segments, complete_live_transcription
+from services.transcription import fail_transcription_job, start_transcription
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# WebSocket close codes
+CLOSE_NORMAL = status.WS_1000_NORMAL_CLOSURE
+CLOSE_TRY_AGAIN_LATER = status.WS_1013_TRY_AGAIN_LATER
+CLOSE_TOO_BIG = status.WS_1009_MESSAGE_TOO_BIG
+CLOSE_ERROR = status.WS_1011_INTERNAL_ERROR
+
+
+class SlowClient(Exception):
+    """Raised when a client stops reading the results sent to it."""
+
+
+class FrameTooLarge(Exception):
+    """Raised when a client sends an audio frame over the size limit."""
+
+
+class LiveSession:
+    """
+    Relays one WebSocket's audio to a streaming engine and its results back.
+
+    Four tasks run per connection, joined by bounded queues:
+
+    - receive: socket -> audio queue. When the audio queue is full the
+      client is sent {"type": "backpressure", "paused": true} and the
+      socket is not read until there is room, so TCP pushes back too.
+    - feed: audio queue -> engine. Sends {"paused": false} once the queue
+      has drained to half.
+    - relay: engine results -> draft note -> outbound queue.
+    - send: outbound queue -> socket. Partial results are dropped when the
+      outbound queue is full, as a later one replaces them anyway; a final
+      result that cannot be queued within send_timeout closes the
+      connection with 1013.
+
+    However the connection ends, the transcription does not stay in
+    progress: if the stream did not finish it is completed with the
+    segments received so far, or marked failed if there were none.
+    """
+
+    def __init__(
+        self,
+        manager: "LiveSessionManager",
+        websocket: WebSocket,
+        engine_session: StreamingSession,
+        job_id: str,
+        user_id: str
+    ):
+        self.manager = manager
+        self.websocket = websocket
+        self.engine_session = engine_session
+        self.job_id = job_id
+        self.user_id = user_id
+        self.audio: asyncio.Queue = asyncio.Queue(maxsize=manager.audio_queue_frames)
+        self.outbound: asyncio.Queue = asyncio.Queue(maxsize=manager.result_queue_size)
+        self.paused = False
+        self.segments_saved = 0
+        self.completed = False
+
+    async def _publish(self, message: Dict[str, Any], droppable: bool = False) -> None:
+        if droppable:
+            if self.outbound.full():
+                self.manager.dropped_partials += 1
+                return
+            self.outbound.put_nowait(message)
+            return
+        try:
+            await asyncio.wait_for(self.outbound.put(message), self.manager.send_timeout)
+        except asyncio.TimeoutError:
+            raise SlowClient(f"Client has not read results for {self.manager.send_timeout}s")
+
+    async def _receive(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", CLOSE_NORMAL))
+            frame = message.get("bytes")
+            if frame is None:
+                # Text frames carry control messages; {"type": "end"} finishes the stream
+                if _control_type(message.get("text")) == "end":
+                    await self.audio.put(None)
+                    return
+                continue
+            if len(frame) > self.manager.max_frame_bytes:
+                raise FrameTooLarge(f"Audio frames must be at most {self.manager.max_frame_bytes} bytes")
+            if self.audio.full() and not self.paused:
+                self.paused = True
+                self.manager.backpressure_pauses += 1
+                await self._publish({"type": "backpressure", "paused": True})
+            await self.audio.put(frame)
+
+    async def _feed(self) -> None:
+        while True:
+            frame = await self.audio.get()
+            if frame is None:
+                await self.engine_session.end_audio()
+                return
+            await self.engine_session.send_audio(frame)
+            if self.paused and self.audio.qsize() <= self.audio.maxsize // 2:
+                self.paused = False
+                await self._publish({"type": "backpressure", "paused": False})
+
+    async def _relay(self) -> None:
+        async for result in self.engine_session.results():
+            segment = _segment(result)
+            if not result.is_final:
+                await self._publish({"type": "partial", "segment": segment.dict()}, droppable=True)
+                continue
+            await self._publish({"type": "final", "segment": segment.dict()})
+            update = await append_segments(self.job_id, self.user_id, [segment])
+            self.segments_saved += 1
+            await self._publish({"type": "draft", **update.dict()})
+
+        transcription = await complete_live_transcription(self.job_id, self.user_id)
+        self.completed = True
+        await self._publish({"type": "completed", "job_id": self.job_id, "transcript": transcription.transcript})
+        await self.outbound.put(None)
+
+    async def _send(self) -> None:
+        while True:
+            message = await self.outbound.get()
+            if message is None:
+                return
+            await self.websocket.send_text(json.dumps(message, default=str))
+
+    async def run(self) -> None:
+        """Relay until the stream is finished, or fails; then close the socket."""
+        tasks = [
+            asyncio.ensure_future(self._receive()),
+            asyncio.ensure_future(self._feed()),
+            asyncio.ensure_future(self._relay()),
+            asyncio.ensure_future(self._send()),
+        ]
+        code, reason = CLOSE_NORMAL, ""
+        try:
+            # receive and feed finish first on a clean end; relay and send finish last
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        except WebSocketDisconnect:
+            code, reason = None, "Client disconnected before the end of the stream"
+        except SlowClient as e:
+            self.manager.slow_clients += 1
+            code, reason = CLOSE_TRY_AGAIN_LATER, str(e)
+        except FrameTooLarge as e:
+            code, reason = CLOSE_TOO_BIG, str(e)
+        except Exception as e:
+            logger.error(f"Error in live transcription {self.job_id}: {str(e)}")
+            code, reason = CLOSE_ERROR, "Transcription failed"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.engine_session.close()
+            if not self.completed:
+                await self._close_transcription(reason or "Live stream ended early")
+        if code is not None:
+            await self.websocket.close(code=code, reason=reason)
+
+    async def _close_transcription(self, reason: str) -> None:
+        # Keeps what was transcribed before the stream broke off
+        try:
+            if self.segments_saved:
+                await complete_live_transcription(self.job_id, self.user_id)
+            else:
+                await fail_transcription_job({"job_id": self.job_id}, reason)
+        except Exception as e:
+            logger.error(f"Error closing live transcription {self.job_id}: {str(e)}")
+
+
+def _control_type(text: str) -> str:
+    try:
+        message = json.loads(text or "{}")
+    except ValueError:
+        return ""
+    return message.get("type", "") if isinstance(message, dict) else ""
+
+
+def _segment(result: StreamResult) -> TranscriptionSegment:
+    return TranscriptionSegment(
+        start_time=result.start_time,
+        end_time=result.end_time,
+        text=result.text,
+        speaker=result.speaker,
+        confidence=result.confidence
+    )
+
+
+class LiveSessionManager:
+    """
+    Admits live transcription connections, up to max_sessions per process.
+
+    Each admitted connection gets a transcription job, a session on the
+    streaming engine and a LiveSession relaying between them; final results
+    update the job's draft note as they arrive (see services.drafts).
+    """
+
+    def __init__(
+        self,
+        engine: StreamingEngine,
+        max_sessions: int = 500,
+        audio_queue_frames: int = 50,
+        result_queue_size: int = 100,
+        send_timeout: float = 10,
+        max_frame_bytes: int = 65536
+    ):
+        self.engine = engine
+        self.max_sessions = max_sessions
+        self.audio_queue_frames = audio_queue_frames
+        self.result_queue_size = result_queue_size
+        self.send_timeout = send_timeout
+        self.max_frame_bytes = max_frame_bytes
+        self.active = 0
+        self.sessions = 0
+        self.rejected = 0
+        self.backpressure_pauses = 0
+        self.dropped_partials = 0
+        self.slow_clients = 0
+
+    async def serve(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        specialty: str = "PRIMARY_CARE",
+        language_code: str = "en-US",
+        sample_rate: int = 16000
+    ) -> None:
+        """
+        Run a live transcription over an accepted WebSocket.
+
+        Args:
+            websocket: Accepted connection; binary frames are 16-bit mono PCM
+            user_id: The ID of the user streaming audio
+            specialty: Medical specialty
+            language_code: Language of the audio
+            sample_rate: Sample rate of the audio in Hz
+        """
+        if self.active >= self.max_sessions:
+            self.rejected += 1
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Too many live sessions")
+            return
+
+        self.active += 1
+        self.sessions += 1
+        job = None
+        try:
+            job = await start_transcription(user_id=user_id, specialty=specialty, language_code=language_code)
+            engine_session = await self.engine.open(sample_rate, language_code, specialty)
+            await websocket.send_text(json.dumps({"type": "started", "job_id": job.job_id}))
+            await LiveSession(self, websocket, engine_session, job.job_id, user_id).run()
+        except Exception as e:
+            logger.error(f"Error starting live transcription: {str(e)}")
+            if job is not None:
+                # No-op once the session has completed or failed the transcription itself
+                await fail_transcription_job({"job_id": job.job_id}, "Could not start transcription")
+            await websocket.close(code=CLOSE_ERROR, reason="Could not start transcription")
+        finally:
+            self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Active sessions and backpressure counters."""
+        return {
+            "engine": self.engine.name,
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "sessions": self.sessions,
+            "rejected": self.rejected,
+            "backpressure_pauses": self.backpressure_pauses,
+            "dropped_partials": self.dropped_partials,
+            "slow_clients": self.slow_clients,
+        }
+
+
+def _engine_options(name: str) -> Dict[str, Any]:
+    return {"region": settings.AWS_REGION} if name == "aws" else {}
+
+
+live_sessions = LiveSessionManager(
+    get_streaming_engine(settings.STREAM_ENGINE, **_engine_options(settings.STREAM_ENGINE)),
+    max_sessions=settings.STREAM_MAX_SESSIONS,
+    audio_queue_frames=settings.STREAM_AUDIO_QUEUE_FRAMES,
+    result_queue_size=settings.STREAM_RESULT_QUEUE_SIZE,
+    send_timeout=settings.STREAM_SEND_TIMEOUT_SECONDS,
+    max_frame_bytes=settings.STREAM_MAX_FRAME_BYTES,
+)
@@ -1,130 +1,401 @@
 import logging
 from datetime import datetime
 from bson import ObjectId
-from typing import Dict, Any, List, Optional
+from pymongo import ReturnDocument
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
-from models.note import ClinicalNote, NoteResponse
+from models.note import ClinicalNote, MedicationOrder, NoteResponse, NoteSummary, VitalSigns
 from services.database import get_notes_collection, get_transcriptions_collection
-from nlp.soap import extract_soap_sections
+from services.pagination import encode_cursor, decode_cursor, keyset_filter
+from services.soap_cache import soap_cache
+from core.config import settings
+from core.workers import core_share
+from nlp.batching import MicroBatcher
+from nlp.chunking import ChunkedExtractor
+from nlp.entities import extract_entities
+from nlp.structured import extract_structured
+from nlp.executor import NlpExecutor
+from nlp.soap import extract_soap_sections_batch, stream_soap_sections
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# How the NLP models are loaded in NLP worker processes
+MODEL_LOAD_OPTIONS = {
+    "model_dir": settings.NLP_MODEL_DIR,
+    "max_length": settings.NLP_MAX_LENGTH,
+    "backend": settings.NLP_BACKEND,
+    "intra_op_threads": settings.NLP_INTRA_OP_THREADS,
+    "quantize": settings.NLP_ONNX_QUANTIZE,
+}
 
-def generate_soap_note(
+# Where every process reads its rule packs from
+RULE_PACK_OPTIONS = {
+    "directory": settings.NLP_RULE_PACK_DIR,
+    "check_interval": settings.NLP_RULE_PACK_CHECK_SECONDS,
+}
+
+# Worker processes that run all SOAP extraction off the event loop; they
+# share the cores with the local speech-to-text engine when it is used
+nlp_executor = NlpExecutor(
+    workers=settings.NLP_WORKERS,
+    model_options=MODEL_LOAD_OPTIONS,
+    task_timeout=settings.NLP_TASK_TIMEOUT_SECONDS,
+    rule_pack_options=RULE_PACK_OPTIONS,
+    cores=settings.NLP_CORES or core_share(2 if settings.ASR_ENGINE == "local" else 1),
+)
+
+# Batches concurrent generation requests in front of the NLP stage
+soap_batcher = MicroBatcher(
+    extract_soap_sections_batch,
+    max_batch_size=settings.NLP_BATCH_MAX_SIZE,
+    max_wait_ms=settings.NLP_BATCH_MAX_WAIT_MS,
+    max_queue_depth=settings.NLP_BATCH_QUEUE_DEPTH,
+    executor=nlp_executor,
+)
+
+# Splits transcripts too long for one pass into chunks processed in parallel
+chunked_extractor = ChunkedExtractor(
+    nlp_executor,
+    max_tokens=settings.NLP_CHUNK_MAX_TOKENS,
+    overlap=settings.NLP_CHUNK_OVERLAP_SEGMENTS,
+)
+
+# Note sections scanned for clinical entities
+NOTE_SECTIONS = ["subjective", "objective", "assessment", "plan"]
+
+# Sort key for note listings, newest first; _id breaks created_at ties
+NOTE_SORT_FIELDS = ["created_at", "_id"]
+
+# Fields read for summary listings
+NOTE_SUMMARY_PROJECTION = {
+    field: 1
+    for field in ["patient_id", "transcription_id", "status", "specialty", "created_at", "updated_at"]
+}
+
+
+async def analyze_note(sections: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Extract the clinical entities of a note on the NLP worker pool.
+    
+    Args:
+        sections: The note's SOAP sections
+        
+    Returns:
+        Dictionary with medical_concepts, medications, diagnoses and procedures
+    """
+    text = "\n".join(sections[section] for section in NOTE_SECTIONS)
+    return await nlp_executor.run(extract_entities, text, settings.NLP_LEXICON_PATH)
+
+
+async def _get_completed_transcription(transcription_id: str, user_id: str) -> Dict[str, Any]:
+    transcription = await get_transcriptions_collection().find_one({
+        "_id": ObjectId(transcription_id),
+        "user_id": ObjectId(user_id)
+    })
+    
+    if not transcription:
+        raise ValueError(f"Transcription {transcription_id} not found")
+    
+    if transcription["status"] != "completed":
+        raise ValueError(f"Transcription {transcription_id} is not complete")
+    
+    return transcription
+
+
+async def _create_note(
+    transcription_id: str,
+    user_id: str,
+    patient_id: Optional[str],
+    specialty: str,
+    transcript_text: str,
+    soap_sections: Dict[str, str]
+) -> NoteResponse:
+    # Typed vitals and doses, from the transcript rather than the generated text
+    findings = await nlp_executor.run(extract_structured, transcript_text, settings.NLP_LEXICON_PATH)
+    
+    # Create note
+    note = ClinicalNote(
+        user_id=ObjectId(user_id),
+        patient_id=patient_id,
+        transcription_id=ObjectId(transcription_id),
+        subjective=soap_sections["subjective"],
+        objective=soap_sections["objective"],
+        assessment=soap_sections["assessment"],
+        plan=soap_sections["plan"],
+        specialty=specialty,
+        status="draft",
+        analysis=await analyze_note(soap_sections),
+        vitals=VitalSigns(**findings.vitals._asdict()),
+        medications=[MedicationOrder(**medication._asdict()) for medication in findings.medications],
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    
+    # Save to database
+    note_dict = note.dict(by_alias=True, exclude={"id"})
+    result = await get_notes_collection().insert_one(note_dict)
+    note_dict["_id"] = result.inserted_id
+    
+    # Create response with confidence score
+    return NoteResponse(
+        **note_dict,
+        confidence_score=0.85  # Demo confidence score
+    )
+
+
+async def generate_soap_note(
     transcription_id: str,
     user_id: str,
     patient_id: Optional[str] = None,
-    specialty: str = "PRIMARY_CARE"
+    specialty: str = "PRIMARY_CARE",
+    force_regenerate: bool = False
 ) -> NoteResponse:
     """
     Generate a SOAP note from a transcription using NLP.
     
+    Sections previously generated for the same transcript, specialty and
+    extractor version are served from the SOAP cache.
+    
     Args:
         transcription_id: The ID of the transcription
         user_id: The ID of the user
         patient_id: Optional patient ID
         specialty: Medical specialty
+        force_regenerate: Rerun the NLP pipeline even if a cached result exists
         
     Returns:
         NoteResponse object with the generated SOAP note
     """
     try:
         # Get transcription from database
-        transcription = get_transcriptions_collection().find_one({
-            "_id": ObjectId(transcription_id),
-            "user_id": ObjectId(user_id)
-        })
-        
-        if not transcription:
-            raise ValueError(f"Transcription {transcription_id} not found")
-        
-        if transcription["status"] != "completed":
-            raise ValueError(f"Transcription {transcription_id} is not complete")
+        transcription = await _get_completed_transcription(transcription_id, user_id)
         
         # Extract SOAP sections using NLP
         transcript_text = transcription["transcript"]
-        soap_sections = extract_soap_sections(transcript_text, specialty)
-        
-        # Create note
-        note = ClinicalNote(
-            user_id=ObjectId(user_id),
-            patient_id=patient_id,
-            transcription_id=ObjectId(transcription_id),
-            subjective=soap_sections["subjective"],
-            objective=soap_sections["objective"],
-            assessment=soap_sections["assessment"],
-            plan=soap_sections["plan"],
-            specialty=specialty,
-            status="draft",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
+        cache_key = soap_cache.key(transcript_text, specialty)
+        soap_sections = None if force_regenerate else await soap_cache.get(cache_key)
         
-        # Save to database
-        note_dict = note.dict(by_alias=True)
-        result = get_notes_collection().insert_one(note_dict)
-        
-        # Get the saved note with _id
-        saved_note = get_notes_collection().find_one({"_id": result.inserted_id})
-        
-        # Create response with confidence score and analysis
-        response = NoteResponse(
-            **saved_note,
-            confidence_score=0.85,  # Demo confidence score
-            analysis={
-                "medical_concepts": ["hypertension", "diabetes", "chest pain"],
-                "medications": ["lisinopril", "metformin"],
-                "diagnoses": ["chest pain", "hypertension", "diabetes mellitus type 2"],
-                "procedures": []
-            }
-        )
+        if soap_sections is None:
+            if chunked_extractor.needs_chunking(transcript_text, specialty):
+                soap_sections = await chunked_extractor.extract(
+                    transcript_text, specialty, transcription.get("segments")
+                )
+            else:
+                soap_sections = await soap_batcher.submit(transcript_text, specialty)
+            await soap_cache.set(cache_key, soap_sections, specialty)
         
-        return response
+        return await _create_note(
+            transcription_id, user_id, patient_id, specialty, transcript_text, soap_sections
+        )
         
     except Exception as e:
         logger.error(f"Error generating SOAP note: {str(e)}")
         raise
 
 
-def get_notes(
+async def stream_soap_note(
+    transcription_id: str,
+    user_id: str,
+    patient_id: Optional[str] = None,
+    specialty: str = "PRIMARY_CARE",
+    force_regenerate: bool = False
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Generate a SOAP note from a transcription, reporting progress as it goes.
+    
+    The transcription is checked before this returns, so a bad request
+    fails before any event is sent. The returned iterator yields
+    (event, data) pairs:
+    
+    - ("status", {"stage": ...}) as generation moves from one stage to the next
+    - ("token", {"text": ...}) for each piece of text a seq2seq model generates
+    - ("section", {"name": ..., "content": ...}) as soon as a section is final
+    - ("note", NoteResponse) once the note is saved, always the last event
+    
+    Cached sections are sent straight away. Streamed generation bypasses
+    the micro-batcher so tokens are not held back by other requests.
+    
+    Args:
+        transcription_id: The ID of the transcription
+        user_id: The ID of the user
+        patient_id: Optional patient ID
+        specialty: Medical specialty
+        force_regenerate: Rerun the NLP pipeline even if a cached result exists
+        
+    Returns:
+        Async iterator of (event, data) pairs
+        
+    Raises:
+        ValueError: If the transcription does not exist or is not complete
+    """
+    transcription = await _get_completed_transcription(transcription_id, user_id)
+    return _soap_note_events(
+        transcription, transcription_id, user_id, patient_id, specialty, force_regenerate
+    )
+
+
+async def _soap_note_events(
+    transcription: Dict[str, Any],
+    transcription_id: str,
+    user_id: str,
+    patient_id: Optional[str],
+    specialty: str,
+    force_regenerate: bool
+) -> AsyncIterator[Tuple[str, Any]]:
+    try:
+        transcript_text = transcription["transcript"]
+        cache_key = soap_cache.key(transcript_text, specialty)
+        soap_sections = None if force_regenerate else await soap_cache.get(cache_key)
+        sent: Dict[str, str] = {}
+        
+        if soap_sections is None:
+            yield "status", {"stage": "generating"}
+            if chunked_extractor.needs_chunking(transcript_text, specialty):
+                soap_sections = await chunked_extractor.extract(
+                    transcript_text, specialty, transcription.get("segments")
+                )
+            else:
+                async for event, data in nlp_executor.stream(stream_soap_sections, transcript_text, specialty):
+                    if event == "token":
+                        yield "token", {"text": data}
+                    elif event == "section":
+                        name, content = data
+                        sent[name] = content
+                        yield "section", {"name": name, "content": content}
+                    elif event == "result":
+                        soap_sections = data
+            await soap_cache.set(cache_key, soap_sections, specialty)
+        
+        # Whatever was not streamed, or came out differently in the final parse
+        for section in NOTE_SECTIONS:
+            if sent.get(section) != soap_sections[section]:
+                yield "section", {"name": section, "content": soap_sections[section]}
+        
+        yield "status", {"stage": "saving"}
+        yield "note", await _create_note(
+            transcription_id, user_id, patient_id, specialty, transcript_text, soap_sections
+        )
+        
+    except Exception as e:
+        logger.error(f"Error streaming SOAP note: {str(e)}")
+        raise
+
+
+async def _find_notes_page(
+    user_id: str,
+    patient_id: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page of raw note documents and the cursor for the next page."""
+    # Build query
+    query = {"user_id": ObjectId(user_id)}
+    if patient_id:
+        query["patient_id"] = patient_id
+    if cursor:
+        after = decode_cursor(cursor, NOTE_SORT_FIELDS)
+        query.update(keyset_filter(after, NOTE_SORT_FIELDS, descending=True))
+        offset = 0
+    
+    # Get notes from database, one extra to detect the last page
+    notes_cursor = (
+        get_notes_collection()
+        .find(query, projection)
+        .sort([(field, -1) for field in NOTE_SORT_FIELDS])
+        .skip(offset)
+        .limit(limit + 1)
+    )
+    documents = await notes_cursor.to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], NOTE_SORT_FIELDS)
+    
+    return documents, next_cursor
+
+
+async def get_notes(
     user_id: str,
     patient_id: Optional[str] = None,
     limit: int = 10,
-    offset: int = 0
-) -> List[NoteResponse]:
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[List[NoteResponse], Optional[str]]:
     """
     Get clinical notes for a user, optionally filtered by patient.
     
+    Notes are ordered newest first by (created_at, _id). Passing the cursor
+    returned with the previous page resumes right after it using the index;
+    offset is kept as a fallback and costs O(offset) on the server.
+    
     Args:
         user_id: The ID of the user
         patient_id: Optional patient ID to filter by
         limit: Maximum number of notes to return
-        offset: Number of notes to skip
+        offset: Number of notes to skip (ignored when a cursor is given)
+        cursor: Opaque cursor token from a previous page
         
     Returns:
-        List of NoteResponse objects
+        Tuple of the NoteResponse objects and the cursor for the next page,
+        or None if this is the last page
     """
     try:
-        # Build query
-        query = {"user_id": ObjectId(user_id)}
-        if patient_id:
-            query["patient_id"] = patient_id
-        
-        # Get notes from database
-        notes_cursor = get_notes_collection().find(query).skip(offset).limit(limit).sort("created_at", -1)
+        documents, next_cursor = await _find_notes_page(
+            user_id, patient_id, limit, offset, cursor
+        )
         
         # Convert to NoteResponse objects
-        notes = [NoteResponse(**note) for note in notes_cursor]
+        notes = [NoteResponse(**note) for note in documents]
         
-        return notes
+        return notes, next_cursor
         
     except Exception as e:
         logger.error(f"Error getting notes: {str(e)}")
         raise
 
 
-def get_note_by_id(note_id: str, user_id: str) -> Optional[NoteResponse]:
+async def get_note_summaries(
+    user_id: str,
+    patient_id: Optional[str] = None,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[List[NoteSummary], Optional[str]]:
+    """
+    Get note summaries for list views.
+    
+    Same ordering and pagination as get_notes, but only the listing fields
+    are read from MongoDB, so the SOAP sections never leave the server.
+    
+    Args:
+        user_id: The ID of the user
+        patient_id: Optional patient ID to filter by
+        limit: Maximum number of notes to return
+        offset: Number of notes to skip (ignored when a cursor is given)
+        cursor: Opaque cursor token from a previous page
+        
+    Returns:
+        Tuple of the NoteSummary objects and the cursor for the next page,
+        or None if this is the last page
+    """
+    try:
+        documents, next_cursor = await _find_notes_page(
+            user_id, patient_id, limit, offset, cursor,
+            projection=NOTE_SUMMARY_PROJECTION
+        )
+        
+        return [NoteSummary(**note) for note in documents], next_cursor
+        
+    except Exception as e:
+        logger.error(f"Error getting note summaries: {str(e)}")
+        raise
+
+
+async def get_note_by_id(note_id: str, user_id: str) -> Optional[NoteResponse]:
     """
     Get a specific clinical note by ID.
     
@@ -137,7 +408,7 @@ def get_note_by_id(note_id: str, user_id: str) -> Optional[NoteResponse]:
     """
     try:
         # Get note from database
-        note = get_notes_collection().find_one({
+        note = await get_notes_collection().find_one({
             "_id": ObjectId(note_id),
             "user_id": ObjectId(user_id)
         })
@@ -145,22 +416,14 @@ def get_note_by_id(note_id: str, user_id: str) -> Optional[NoteResponse]:
         if not note:
             return None
         
-        # Additional analysis for the response
-        analysis = {
-            "medical_concepts": ["hypertension", "diabetes", "chest pain"],
-            "medications": ["lisinopril", "metformin"],
-            "diagnoses": ["chest pain", "hypertension", "diabetes mellitus type 2"],
-            "procedures": []
-        }
-        
-        return NoteResponse(**note, confidence_score=0.85, analysis=analysis)
+        return NoteResponse(**note, confidence_score=0.85)
         
     except Exception as e:
         logger.error(f"Error getting note: {str(e)}")
         raise
 
 
-def save_note(note: ClinicalNote, user_id: str) -> NoteResponse:
+async def save_note(note: ClinicalNote, user_id: str) -> NoteResponse:
     """
     Save or update a clinical note.
     
@@ -176,34 +439,26 @@ def save_note(note: ClinicalNote, user_id: str) -> NoteResponse:
         if str(note.user_id) != user_id:
             raise ValueError("Cannot save note for another user")
         
-        # Update timestamps
+        # Update timestamps and re-analyze the (possibly edited) sections
         note.updated_at = datetime.utcnow()
+        note.analysis = await analyze_note(note.dict())
         
         # Convert to dict
         note_dict = note.dict(by_alias=True, exclude={"id"})
         
         if not note.id:  # New note
-            result = get_notes_collection().insert_one(note_dict)
-            saved_id = result.inserted_id
+            result = await get_notes_collection().insert_one(note_dict)
+            saved_note = {**note_dict, "_id": result.inserted_id}
         else:  # Update existing note
-            result = get_notes_collection().update_one(
+            saved_note = await get_notes_collection().find_one_and_update(
                 {"_id": ObjectId(note.id)},
-                {"$set": note_dict}
+                {"$set": note_dict},
+                return_document=ReturnDocument.AFTER
             )
-            saved_id = ObjectId(note.id)
-        
-        # Get the saved note
-        saved_note = get_notes_collection().find_one({"_id": saved_id})
-        
-        # Additional analysis for response
-        analysis = {
-            "medical_concepts": ["hypertension", "diabetes", "chest pain"],
-            "medications": ["lisinopril", "metformin"],
-            "diagnoses": ["chest pain", "hypertension", "diabetes mellitus type 2"],
-            "procedures": []
-        }
+            if not saved_note:
+                raise ValueError(f"Note {note.id} not found")
         
-        return NoteResponse(**saved_note, confidence_score=0.85, analysis=analysis)
+        return NoteResponse(**saved_note, confidence_score=0.85)
         
     except Exception as e:
         logger.error(f"Error saving note: {str(e)}")
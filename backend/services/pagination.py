@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from typing import Dict, Any, List
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(document: Dict[str, Any], fields: List[str]) -> str:
+    """
+    Build an opaque cursor token from the sort key of a document.
+
+    Args:
+        document: The last document of a page
+        fields: The sort key fields, in sort order
+
+    Returns:
+        URL-safe cursor token
+    """
+    values = {}
+    for field in fields:
+        value = document[field]
+        if isinstance(value, ObjectId):
+            values[field] = {"$oid": str(value)}
+        elif isinstance(value, datetime):
+            values[field] = {"$date": value.isoformat()}
+        else:
+            values[field] = value
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, fields: List[str]) -> Dict[str, Any]:
+    """
+    Decode a cursor token produced by encode_cursor.
+
+    Args:
+        token: The cursor token
+        fields: The sort key fields the token must contain
+
+    Returns:
+        Dictionary of sort key values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        decoded = {}
+        for field in fields:
+            value = values[field]
+            if isinstance(value, dict) and "$oid" in value:
+                value = ObjectId(value["$oid"])
+            elif isinstance(value, dict) and "$date" in value:
+                value = datetime.fromisoformat(value["$date"])
+            decoded[field] = value
+        return decoded
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(
+    after: Dict[str, Any], fields: List[str], descending: bool = False
+) -> Dict[str, Any]:
+    """
+    Build a query filter selecting documents strictly after a cursor position.
+
+    For sort key (a, b) this yields {$or: [{a: {$lt: x}}, {a: x, b: {$lt: y}}]}
+    (or $gt for ascending sorts), which the matching compound index can serve
+    without skipping over earlier documents.
+
+    Args:
+        after: Decoded cursor values
+        fields: The sort key fields, in sort order
+        descending: Whether the sort is descending on every field
+
+    Returns:
+        MongoDB query filter
+    """
+    operator = "$lt" if descending else "$gt"
+    clauses = []
+    for i, field in enumerate(fields):
+        clause = {prior: after[prior] for prior in fields[:i]}
+        clause[field] = {operator: after[field]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
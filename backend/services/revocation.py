@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+
+from services.database import get_token_versions_collection
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Allowance for clock skew between nodes when refreshing incrementally
+REFRESH_OVERLAP = timedelta(seconds=2)
+
+
+class TokenVersionTable:
+    """
+    In-memory table of per-user token versions.
+
+    Claims-carrying tokens embed the user's token version at issue time. A
+    token is accepted only while its version is at least the current one,
+    so bumping a version (on role, status, email or password changes) or
+    marking a user deleted revokes every token issued before it.
+
+    The table is backed by the token_versions collection: bumps are written
+    there and applied locally at once, and other processes pick them up by
+    polling for entries updated since their last refresh.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._deleted = set()
+        self._last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def current_version(self, user_id: str) -> int:
+        """The version new tokens for this user should carry."""
+        return self._versions.get(user_id, 0)
+
+    def is_current(self, user_id: str, version: int) -> bool:
+        """Whether a token with this version is still valid for the user."""
+        if user_id in self._deleted:
+            return False
+        return version >= self._versions.get(user_id, 0)
+
+    def _apply(self, entry: Dict) -> None:
+        user_id = entry["_id"]
+        self._versions[user_id] = max(self._versions.get(user_id, 0), entry["version"])
+        if entry.get("deleted"):
+            self._deleted.add(user_id)
+
+    async def bump(self, user_id: str, deleted: bool = False) -> int:
+        """
+        Revoke every token issued to the user so far.
+
+        Args:
+            user_id: The ID of the user
+            deleted: Whether the user was deleted, which revokes all future
+                tokens as well
+
+        Returns:
+            The new token version
+        """
+        update = {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}}
+        if deleted:
+            update["$set"]["deleted"] = True
+        entry = await get_token_versions_collection().find_one_and_update(
+            {"_id": user_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._apply(entry)
+        return entry["version"]
+
+    async def refresh(self) -> int:
+        """
+        Pull version changes made since the last refresh.
+
+        The first refresh loads the whole table (one small entry per user
+        ever bumped): new tokens are issued with the current version, so a
+        node must know every user's version, not just recent changes.
+
+        Returns:
+            Number of entries applied
+        """
+        now = datetime.utcnow()
+        if self._last_sync is None:
+            query = {}
+        else:
+            query = {"updated_at": {"$gte": self._last_sync - REFRESH_OVERLAP}}
+
+        applied = 0
+        async for entry in get_token_versions_collection().find(query):
+            self._apply(entry)
+            applied += 1
+        self._last_sync = now
+        return applied
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing token versions: {str(e)}")
+
+    async def start(self, interval: float) -> None:
+        """Load the table and keep it refreshed in the background."""
+        applied = await self.refresh()
+        logger.info(f"Loaded {applied} token version entries")
+        self._task = asyncio.create_task(self._refresh_forever(interval))
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+token_versions = TokenVersionTable()
@@ -0,0 +1,90 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from nlp.soap import ERROR_SECTIONS, extractor_version
+from services.cache import TTLLRUCache
+from services.database import get_soap_cache_collection
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SoapSectionCache:
+    """
+    Content-addressed cache of generated SOAP sections.
+
+    Entries are keyed by a hash of the transcript text, the specialty and
+    the version of the extractor or model that produced them, so a model
+    or rule change simply stops matching old entries. Lookups go to an
+    in-process LRU first and then to the soap_cache collection, which is
+    shared by every worker and expires entries through a TTL index.
+    """
+
+    def __init__(self, maxsize: int):
+        self.memory = TTLLRUCache(maxsize=maxsize)
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(transcript: str, specialty: str) -> str:
+        """Content address for a transcript under the current extractor."""
+        digest = hashlib.sha256()
+        for part in (extractor_version(specialty), specialty.upper(), transcript):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Cached sections for key, from memory or MongoDB."""
+        sections = self.memory.get(key)
+        if sections is not None:
+            return sections
+
+        entry = await get_soap_cache_collection().find_one({"_id": key}, {"sections": 1})
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.persistent_hits += 1
+        self.memory.set(key, entry["sections"])
+        return entry["sections"]
+
+    async def set(self, key: str, sections: Dict[str, str], specialty: str) -> None:
+        """Store sections in both tiers. Failed extractions are not cached."""
+        if sections == ERROR_SECTIONS:
+            return
+        self.memory.set(key, sections)
+        try:
+            await get_soap_cache_collection().replace_one(
+                {"_id": key},
+                {
+                    "sections": sections,
+                    "specialty": specialty,
+                    "version": extractor_version(specialty),
+                    "created_at": datetime.utcnow(),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            # The note is still generated; only the persistent tier misses out
+            logger.error(f"Error writing SOAP cache entry: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates per tier."""
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.persistent_hits + self.misses
+        hits = memory["hits"] + self.persistent_hits
+        return {
+            "memory_hits": memory["hits"],
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": memory["size"],
+            "memory_maxsize": memory["maxsize"],
+        }
+
+
+soap_cache = SoapSectionCache(maxsize=settings.SOAP_CACHE_SIZE)
@@ -1,44 +1,163 @@
-import boto3
+import asyncio
+import os
 import uuid
 import json
 import logging
+import tempfile
 from datetime import datetime
 from bson import ObjectId
-from typing import Dict, Any, Optional, List
+from fastapi import UploadFile
+from typing import Dict, Any, Optional, List, Tuple
 
+from asr.offline import LocalAsrEngine, load_audio
 from core.config import settings
+from core.workers import core_share
+from services.aws import aws_clients
 from services.database import get_transcriptions_collection
+from services.jobs import job_runner
 from models.transcription import TranscriptionResponse, TranscriptionSegment
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Uploaded audio is streamed to S3 in parts of this size
+UPLOAD_PART_SIZE = settings.AUDIO_UPLOAD_PART_SIZE_MB * 1024 * 1024
 
-def get_transcribe_client():
-    """Get AWS Transcribe client."""
-    return boto3.client(
-        'transcribe',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_REGION
-    )
+# Object keys of uploaded audio start with this prefix
+AUDIO_KEY_PREFIX = "audio"
+
+# Background job kind that transcribes an uploaded recording
+TRANSCRIPTION_JOB = "transcription"
+
+AUDIO_CONTENT_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".flac": "audio/flac"}
+
+# Offline speech-to-text, used instead of AWS Transcribe when ASR_ENGINE is
+# "local"; in the API it shares the cores with the NLP workers (see worker.py)
+local_asr = LocalAsrEngine(
+    model_path=settings.ASR_MODEL_PATH,
+    workers=settings.ASR_WORKERS,
+    compute_type=settings.ASR_COMPUTE_TYPE,
+    beam_size=settings.ASR_BEAM_SIZE,
+    max_chunk_seconds=settings.ASR_MAX_CHUNK_SECONDS,
+    min_silence_ms=settings.ASR_MIN_SILENCE_MS,
+    chunk_timeout=settings.ASR_CHUNK_TIMEOUT_SECONDS,
+    cores=settings.ASR_CORES or core_share(2),
+)
+
+
+async def upload_audio_stream(
+    audio_file: UploadFile,
+    key: str,
+    content_type: str = "application/octet-stream",
+    part_size: int = UPLOAD_PART_SIZE
+) -> int:
+    """
+    Stream an uploaded audio file into S3 with a multipart upload.
+    
+    The file is read part_size bytes at a time and each part is sent while
+    the next one is read, so at most two parts are held in memory however
+    long the recording is. The multipart upload is aborted if anything
+    fails, leaving no partial object behind.
+    
+    Args:
+        audio_file: The uploaded file
+        key: S3 object key to write
+        content_type: MIME type stored with the object
+        part_size: Bytes per part; S3 requires at least 5 MB for all but the last
+        
+    Returns:
+        Number of bytes uploaded
+        
+    Raises:
+        ValueError: If the file is empty
+    """
+    s3 = aws_clients.s3
+    bucket = settings.AWS_S3_BUCKET
+    upload = await s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+    upload_id = upload["UploadId"]
+    
+    async def upload_part(number: int, body: bytes) -> Dict[str, Any]:
+        response = await s3.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+    
+    parts = []
+    size = 0
+    pending = None
+    try:
+        while True:
+            chunk = await audio_file.read(part_size)
+            if pending is not None:
+                parts.append(await pending)
+                pending = None
+            if not chunk:
+                break
+            size += len(chunk)
+            pending = asyncio.ensure_future(upload_part(len(parts) + 1, chunk))
+        
+        if not parts:
+            raise ValueError("Audio file is empty")
+        
+        await s3.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+        logger.info(f"Uploaded {size} bytes of audio to s3://{bucket}/{key} in {len(parts)} parts")
+        return size
+        
+    except Exception as e:
+        logger.error(f"Error uploading audio to s3://{bucket}/{key}: {str(e)}")
+        if pending is not None:
+            pending.cancel()
+        await s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
 
 
-def get_s3_client():
-    """Get AWS S3 client."""
-    return boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_REGION
+async def upload_and_start_transcription(
+    user_id: str,
+    audio_file: UploadFile,
+    specialty: str = "PRIMARY_CARE",
+    language_code: str = "en-US"
+) -> TranscriptionResponse:
+    """
+    Store an uploaded recording in S3 and start a transcription job for it.
+    
+    Args:
+        user_id: The ID of the user uploading the audio
+        audio_file: The uploaded audio file
+        specialty: Medical specialty (PRIMARY_CARE, CARDIOLOGY, etc.)
+        language_code: Language code (en-US, etc.)
+        
+    Returns:
+        TranscriptionResponse object with job details
+        
+    Raises:
+        ValueError: If the file is empty
+    """
+    job_id = f"scribely-{uuid.uuid4()}"
+    extension = os.path.splitext(audio_file.filename or "")[1].lower()
+    key = f"{AUDIO_KEY_PREFIX}/{user_id}/{job_id}{extension}"
+    await upload_audio_stream(
+        audio_file, key, AUDIO_CONTENT_TYPES.get(extension, "application/octet-stream")
+    )
+    return await start_transcription(
+        user_id=user_id,
+        specialty=specialty,
+        language_code=language_code,
+        job_id=job_id,
+        audio_key=key
     )
 
 
-def start_transcription(
+async def start_transcription(
     user_id: str, 
     specialty: str = "PRIMARY_CARE",
     language_code: str = "en-US",
-    audio_data: Optional[bytes] = None
+    job_id: Optional[str] = None,
+    audio_key: Optional[str] = None
 ) -> TranscriptionResponse:
     """
     Start a transcription job with AWS Transcribe Medical.
@@ -47,17 +166,14 @@ def start_transcription(
         user_id: The ID of the user starting the transcription
         specialty: Medical specialty (PRIMARY_CARE, CARDIOLOGY, etc.)
         language_code: Language code (en-US, etc.)
-        audio_data: Optional audio data to transcribe
+        job_id: Job ID to use; generated if not given
+        audio_key: S3 key of uploaded audio to transcribe, if any
         
     Returns:
         TranscriptionResponse object with job details
     """
     try:
-        transcribe = get_transcribe_client()
-        job_id = f"scribely-{uuid.uuid4()}"
-        
-        # For demo purposes, we're simulating the start of a transcription job
-        # In a real implementation, we would upload audio to S3 and start a job
+        job_id = job_id or f"scribely-{uuid.uuid4()}"
         
         # Create transcription job record
         transcription = TranscriptionResponse(
@@ -66,29 +182,36 @@ def start_transcription(
             status="in_progress",
             specialty=specialty,
             language_code=language_code,
+            audio_key=audio_key,
             segments=[],
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
         
         # Save to database
-        transcription_dict = transcription.dict(by_alias=True)
-        get_transcriptions_collection().insert_one(transcription_dict)
+        transcription_dict = transcription.dict(by_alias=True, exclude={"id"})
+        result = await get_transcriptions_collection().insert_one(transcription_dict)
+        transcription_dict["_id"] = result.inserted_id
         
-        # Get the inserted document with _id
-        saved_transcription = get_transcriptions_collection().find_one({"job_id": job_id})
+        # Uploaded audio is transcribed in the background; live sessions
+        # receive their segments as they go
+        if audio_key is not None:
+            await job_runner.enqueue(TRANSCRIPTION_JOB, job_id, {"job_id": job_id})
         
-        return TranscriptionResponse(**saved_transcription)
+        return TranscriptionResponse(**transcription_dict)
         
     except Exception as e:
         logger.error(f"Error starting transcription: {str(e)}")
         raise
 
 
-def get_transcription_result(job_id: str, user_id: str) -> TranscriptionResponse:
+async def get_transcription_result(job_id: str, user_id: str) -> TranscriptionResponse:
     """
     Get the result of a transcription job.
     
+    Uploaded recordings are transcribed by the background job runner (see
+    process_transcription_job); this only reads the job's current state.
+    
     Args:
         job_id: The ID of the transcription job
         user_id: The ID of the user who started the job
@@ -97,8 +220,7 @@ def get_transcription_result(job_id: str, user_id: str) -> TranscriptionResponse
         TranscriptionResponse object with transcription results
     """
     try:
-        # Get job from database
-        transcription = get_transcriptions_collection().find_one({
+        transcription = await get_transcriptions_collection().find_one({
             "job_id": job_id,
             "user_id": ObjectId(user_id)
         })
@@ -106,81 +228,139 @@ def get_transcription_result(job_id: str, user_id: str) -> TranscriptionResponse
         if not transcription:
             raise ValueError(f"Transcription job {job_id} not found")
         
-        # For demo purposes, if job is in progress, simulate completion
-        if transcription["status"] == "in_progress":
-            # Simulate a completed transcription
-            sample_transcript = (
-                "The patient is a 45-year-old male with a history of hypertension "
-                "and type 2 diabetes. He presents today with complaints of chest pain "
-                "that started yesterday. The pain is described as pressure-like, "
-                "radiating to the left arm, and is associated with shortness of breath. "
-                "He rates the pain as 7 out of 10. No prior history of cardiac issues. "
-                "Currently taking lisinopril and metformin."
-            )
-            
-            segments = [
-                TranscriptionSegment(
-                    start_time=0.0,
-                    end_time=5.2,
-                    text="The patient is a 45-year-old male with a history of hypertension and type 2 diabetes.",
-                    confidence=0.98,
-                    speaker="clinician"
-                ),
-                TranscriptionSegment(
-                    start_time=5.3,
-                    end_time=10.1,
-                    text="He presents today with complaints of chest pain that started yesterday.",
-                    confidence=0.95,
-                    speaker="clinician"
-                ),
-                TranscriptionSegment(
-                    start_time=10.2,
-                    end_time=15.8,
-                    text="The pain is described as pressure-like, radiating to the left arm, and is associated with shortness of breath.",
-                    confidence=0.97,
-                    speaker="clinician"
-                ),
-                TranscriptionSegment(
-                    start_time=16.0,
-                    end_time=18.5,
-                    text="He rates the pain as 7 out of 10.",
-                    confidence=0.99,
-                    speaker="clinician"
-                ),
-                TranscriptionSegment(
-                    start_time=18.7,
-                    end_time=22.3,
-                    text="No prior history of cardiac issues.",
-                    confidence=0.96,
-                    speaker="clinician"
-                ),
-                TranscriptionSegment(
-                    start_time=22.5,
-                    end_time=25.1,
-                    text="Currently taking lisinopril and metformin.",
-                    confidence=0.98,
-                    speaker="clinician"
-                )
-            ]
-            
-            # Update the transcription in the database
-            get_transcriptions_collection().update_one(
-                {"_id": transcription["_id"]},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "transcript": sample_transcript,
-                        "segments": [segment.dict() for segment in segments],
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            # Get the updated transcription
-            transcription = get_transcriptions_collection().find_one({"_id": transcription["_id"]})
-        
         return TranscriptionResponse(**transcription)
         
     except Exception as e:
         logger.error(f"Error getting transcription result: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+
+
+def _simulated_transcription() -> Tuple[str, List[TranscriptionSegment]]:
+    # For demo purposes, we're simulating a completed transcription
+    # In a real implementation, we would run a Transcribe Medical job on
+    # s3://{AWS_S3_BUCKET}/{audio_key} with aws_clients.transcribe and wait
+    # for it to finish
+    sample_transcript = (
+        "The patient is a 45-year-old male with a history of hypertension "
+        "and type 2 diabetes. He presents today with complaints of chest pain "
+        "that started yesterday. The pain is described as pressure-like, "
+        "radiating to the left arm, and is associated with shortness of breath. "
+        "He rates the pain as 7 out of 10. No prior history of cardiac issues. "
+        "Currently taking lisinopril and metformin."
+    )
+    
+    segments = [
+        TranscriptionSegment(
+            start_time=0.0,
+            end_time=5.2,
+            text="The patient is a 45-year-old male with a history of hypertension and type 2 diabetes.",
+            confidence=0.98,
+            speaker="clinician"
+        ),
+        TranscriptionSegment(
+            start_time=5.3,
+            end_time=10.1,
+            text="He presents today with complaints of chest pain that started yesterday.",
+            confidence=0.95,
+            speaker="clinician"
+        ),
+        TranscriptionSegment(
+            start_time=10.2,
+            end_time=15.8,
+            text="The pain is described as pressure-like, radiating to the left arm, and is associated with shortness of breath.",
+            confidence=0.97,
+            speaker="clinician"
+        ),
+        TranscriptionSegment(
+            start_time=16.0,
+            end_time=18.5,
+            text="He rates the pain as 7 out of 10.",
+            confidence=0.99,
+            speaker="clinician"
+        ),
+        TranscriptionSegment(
+            start_time=18.7,
+            end_time=22.3,
+            text="No prior history of cardiac issues.",
+            confidence=0.96,
+            speaker="clinician"
+        ),
+        TranscriptionSegment(
+            start_time=22.5,
+            end_time=25.1,
+            text="Currently taking lisinopril and metformin.",
+            confidence=0.98,
+            speaker="clinician"
+        )
+    ]
+    
+    return sample_transcript, segments
+
+
+async def _transcribe_locally(audio_key: str, language_code: str) -> Tuple[str, List[TranscriptionSegment]]:
+    """Transcribe an uploaded recording with the offline speech-to-text engine."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, os.path.basename(audio_key))
+        await aws_clients.s3.download_file(Bucket=settings.AWS_S3_BUCKET, Key=audio_key, Filename=path)
+        audio = await asyncio.to_thread(load_audio, path)
+    
+    results = await local_asr.transcribe(audio, language_code)
+    segments = [
+        TranscriptionSegment(
+            start_time=result.start_time,
+            end_time=result.end_time,
+            text=result.text,
+            confidence=result.confidence
+        )
+        for result in results
+    ]
+    return " ".join(segment.text for segment in segments), segments
+
+
+async def process_transcription_job(payload: Dict[str, Any]) -> None:
+    """
+    Transcribe an uploaded recording; run by the background job runner.
+    
+    Safe to run more than once for the same job: a transcription that is
+    no longer in progress is left alone.
+    
+    Args:
+        payload: The job's payload, with the transcription's job_id
+    """
+    job_id = payload["job_id"]
+    transcription = await get_transcriptions_collection().find_one(
+        {"job_id": job_id}, {"status": 1, "audio_key": 1, "language_code": 1}
+    )
+    if not transcription or transcription["status"] != "in_progress":
+        return
+    
+    if settings.ASR_ENGINE == "local":
+        transcript, segments = await _transcribe_locally(
+            transcription["audio_key"], transcription["language_code"]
+        )
+    else:
+        transcript, segments = _simulated_transcription()
+    
+    await get_transcriptions_collection().update_one(
+        {"_id": transcription["_id"], "status": "in_progress"},
+        {
+            "$set": {
+                "status": "completed",
+                "transcript": transcript,
+                "segments": [segment.dict() for segment in segments],
+                "updated_at": datetime.utcnow()
+            }
+        }
+    )
+    logger.info(f"Completed transcription {job_id}")
+
+
+async def fail_transcription_job(payload: Dict[str, Any], error: str) -> None:
+    """Mark a transcription failed once its job has run out of attempts."""
+    await get_transcriptions_collection().update_one(
+        {"job_id": payload["job_id"], "status": "in_progress"},
+        {"$set": {"status": "failed", "error": error, "updated_at": datetime.utcnow()}}
+    )
+
+
+job_runner.register(TRANSCRIPTION_JOB, process_transcription_job, on_failure=fail_transcription_job)
@@ -1,36 +1,70 @@
 import logging
 from datetime import datetime
 from bson import ObjectId
-from typing import List, Optional, Dict, Any
+from pymongo import ReturnDocument
+from typing import List, Optional, Dict, Any, Tuple
 
 from models.user import User, UserUpdate
 from services.database import get_user_collection
-from services.auth import get_password_hash
+from services.auth import get_password_hash, invalidate_cached_user
+from services.pagination import encode_cursor, decode_cursor, keyset_filter
+from services.revocation import token_versions
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Sort key for user listings
+USER_SORT_FIELDS = ["_id"]
 
-def get_users(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+# Changes to these fields revoke previously issued claims-carrying tokens
+REVOKING_FIELDS = {"email", "is_active", "role", "hashed_password"}
+
+
+async def get_users(
+    skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
     Get a list of users.
     
+    Users are ordered by _id. Passing the cursor returned with the previous
+    page resumes right after it; skip is kept as a slower fallback.
+    
     Args:
-        skip: Number of users to skip
+        skip: Number of users to skip (ignored when a cursor is given)
         limit: Maximum number of users to return
+        cursor: Opaque cursor token from a previous page
         
     Returns:
-        List of user dictionaries
+        Tuple of user dictionaries and the cursor for the next page,
+        or None if this is the last page
     """
     try:
-        users_cursor = get_user_collection().find().skip(skip).limit(limit)
-        return list(users_cursor)
+        query = {}
+        if cursor:
+            query = keyset_filter(decode_cursor(cursor, USER_SORT_FIELDS), USER_SORT_FIELDS)
+            skip = 0
+        
+        users_cursor = (
+            get_user_collection()
+            .find(query)
+            .sort([(field, 1) for field in USER_SORT_FIELDS])
+            .skip(skip)
+            .limit(limit + 1)
+        )
+        users = await users_cursor.to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1], USER_SORT_FIELDS)
+        
+        return users, next_cursor
     except Exception as e:
         logger.error(f"Error getting users: {str(e)}")
         raise
 
 
-def update_user(user_id: str, user_data: UserUpdate) -> Optional[Dict[str, Any]]:
+async def update_user(user_id: str, user_data: UserUpdate) -> Optional[Dict[str, Any]]:
     """
     Update a user.
     
@@ -47,32 +81,36 @@ def update_user(user_id: str, user_data: UserUpdate) -> Optional[Dict[str, Any]]
         
         # Handle password hashing if provided
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash(update_data.pop("password"))
         
         # Add updated timestamp
         update_data["updated_at"] = datetime.utcnow()
         
         if not update_data:  # No fields to update
-            return get_user_collection().find_one({"_id": ObjectId(user_id)})
+            return await get_user_collection().find_one({"_id": ObjectId(user_id)})
         
-        # Update user in database
-        result = get_user_collection().update_one(
+        # Update user in database. The previous document is returned so the
+        # cache entry under the old email is dropped even if the email changed.
+        previous = await get_user_collection().find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count == 0:
+        if previous is None:
             return None
         
-        # Get updated user
-        return get_user_collection().find_one({"_id": ObjectId(user_id)})
+        invalidate_cached_user(previous.get("email"), update_data.get("email"))
+        if REVOKING_FIELDS.intersection(update_data):
+            await token_versions.bump(user_id)
+        return {**previous, **update_data}
     
     except Exception as e:
         logger.error(f"Error updating user: {str(e)}")
         raise
 
 
-def delete_user(user_id: str) -> bool:
+async def delete_user(user_id: str) -> bool:
     """
     Delete a user.
     
@@ -83,8 +121,16 @@ def delete_user(user_id: str) -> bool:
         True if successful, False if user not found
     """
     try:
-        result = get_user_collection().delete_one({"_id": ObjectId(user_id)})
-        return result.deleted_count > 0
+        deleted = await get_user_collection().find_one_and_delete(
+            {"_id": ObjectId(user_id)},
+            projection={"email": 1}
+        )
+        if deleted is None:
+            return False
+        
+        invalidate_cached_user(deleted.get("email"))
+        await token_versions.bump(user_id, deleted=True)
+        return True
     except Exception as e:
         logger.error(f"Error deleting user: {str(e)}")
         raise 
\ No newline at end of file
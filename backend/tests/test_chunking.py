@@ -0,0 +1,89 @@
+import pytest
+
+from nlp.chunking import ChunkedExtractor, chunk_segments, merge_sections, split_long_segments, split_segments
+from nlp.registry import DEFAULT_MODEL_KEY, model_registry
+
+
+class WordTokenizer:
+    """One token per word, like a tokenizer with a very large vocabulary."""
+
+    def encode(self, text, add_special_tokens=True):
+        return text.split()
+
+
+@pytest.fixture
+def word_model(monkeypatch):
+    # A default model that reads at most 20 tokens
+    monkeypatch.setattr(model_registry, "_fingerprints", {DEFAULT_MODEL_KEY: "test"})
+    monkeypatch.setattr(model_registry, "_tokenizers", {DEFAULT_MODEL_KEY: WordTokenizer()})
+    monkeypatch.setattr(model_registry, "_input_limits", {DEFAULT_MODEL_KEY: 20})
+
+
+def words(count, word="word"):
+    return " ".join([word] * count) + "."
+
+
+def test_split_segments_prefers_stored_segments():
+    assert split_segments("A. B.", [{"text": "one"}, {"text": ""}, {"text": "two"}]) == ["one", "two"]
+    assert split_segments("First one. Second one? Third!") == ["First one.", "Second one?", "Third!"]
+
+
+def test_chunks_fit_and_overlap():
+    texts = [f"segment {i}" for i in range(10)]
+    chunks = chunk_segments(texts, max_size=30, overlap=1)
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    # Every segment is in some chunk, and consecutive chunks share one
+    assert all(any(text in chunk for chunk in chunks) for text in texts)
+    for first, second in zip(chunks, chunks[1:]):
+        assert first.split(" ")[-2:] == second.split(" ")[:2]
+
+
+def test_oversized_segment_is_its_own_chunk():
+    assert chunk_segments(["short", "x" * 50, "short"], max_size=20, overlap=0) == ["short", "x" * 50, "short"]
+
+
+def test_chunks_are_sized_by_the_given_measure():
+    texts = [words(6) for _ in range(6)]
+    chunks = chunk_segments(texts, max_size=20, overlap=1, size=lambda text: len(text.split()))
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+    assert len(chunks) > 1
+
+
+def test_long_segments_are_split_at_words():
+    pieces = split_long_segments([words(50), "short."], max_size=20, size=lambda text: len(text.split()))
+    assert pieces[-1] == "short."
+    assert all(len(piece.split()) < 20 for piece in pieces)
+    assert " ".join(pieces[:-1]) == words(50)
+
+
+def test_needs_chunking_counts_tokens(word_model):
+    extractor = ChunkedExtractor(executor=None)
+    assert extractor.max_chunk_tokens("CARDIOLOGY") == 20
+    # Long in characters, short in tokens
+    assert not extractor.needs_chunking(words(10, "hypercholesterolemia"), "CARDIOLOGY")
+    assert extractor.needs_chunking(words(30, "a"), "CARDIOLOGY")
+    assert ChunkedExtractor(executor=None, max_tokens=5).max_chunk_tokens("CARDIOLOGY") == 5
+
+
+def test_no_chunking_without_a_model(monkeypatch):
+    monkeypatch.setattr(model_registry, "_fingerprints", {})
+    assert not ChunkedExtractor(executor=None).needs_chunking(words(5000), "CARDIOLOGY")
+
+
+def test_merge_drops_duplicates_and_placeholders():
+    results = [
+        {"subjective": "Chest pain. Short of breath.", "objective": "BP 150/90",
+         "assessment": "1. Hypertension", "plan": "No plan documented"},
+        {"subjective": "Short of breath. Worse at night.", "objective": "BP 150/90\nHR 88",
+         "assessment": "1. Hypertension\n2. Angina", "plan": "1. ECG"},
+    ]
+    merged = merge_sections(results, placeholders={"No plan documented"})
+    assert merged["subjective"] == "Chest pain. Short of breath. Worse at night."
+    assert merged["objective"] == "BP 150/90\nHR 88"
+    assert merged["assessment"] == "1. Hypertension\n2. Angina"
+    assert merged["plan"] == "1. ECG"
+
+
+def test_merge_keeps_a_placeholder_when_nothing_was_found():
+    results = [{"plan": "No plan documented"}, {"plan": "No plan documented"}]
+    assert merge_sections(results, placeholders={"No plan documented"})["plan"] == "No plan documented"
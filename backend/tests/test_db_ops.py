@@ -0,0 +1,29 @@
+"""Database round trips per service call, checked against a live MongoDB (see benchmarks/count_db_ops.py)."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("motor")
+pymongo = pytest.importorskip("pymongo")
+
+from core.config import settings  # noqa: E402
+
+
+def mongo_available() -> bool:
+    client = pymongo.MongoClient(settings.MONGODB_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+        return True
+    except pymongo.errors.PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+@pytest.mark.skipif(not mongo_available(), reason="MongoDB is not reachable at MONGODB_URL")
+def test_service_calls_stay_within_their_round_trips():
+    from benchmarks import count_db_ops
+
+    results = asyncio.run(count_db_ops.run())
+    assert set(results) == set(count_db_ops.EXPECTED_OPS)
+    assert count_db_ops.over_budget(results) == [], results
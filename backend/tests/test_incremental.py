@@ -0,0 +1,50 @@
+from nlp.incremental import IncrementalSoapDraft
+from nlp.soap import extract_rule_based_sections
+
+SEGMENTS = [
+    "Patient is a 58 year old with a history of hypertension.",
+    "She reports chest pain on exertion for two weeks.",
+    "Currently taking lisinopril 10 mg daily.",
+    "Blood pressure 150/90, heart rate 88.",
+    "Temperature 98.6 F, weight 82 kg.",
+    "Plan to start aspirin 81 mg daily and order an ECG.",
+]
+
+
+def test_segments_match_the_whole_transcript():
+    draft = IncrementalSoapDraft("CARDIOLOGY")
+    for segment in SEGMENTS:
+        draft.add_segment(segment)
+    assert draft.sections == extract_rule_based_sections(" ".join(SEGMENTS), "CARDIOLOGY")
+
+
+def test_only_changed_sections_are_reported():
+    draft = IncrementalSoapDraft()
+    first = draft.add_segment(SEGMENTS[3])
+    assert "objective" in first
+    assert draft.add_segment(SEGMENTS[3]) == {}
+
+
+def test_state_round_trips():
+    draft = IncrementalSoapDraft("CARDIOLOGY")
+    for segment in SEGMENTS[:3]:
+        draft.add_segment(segment)
+    restored = IncrementalSoapDraft.from_state(draft.to_state(), "CARDIOLOGY")
+    for segment in SEGMENTS[3:]:
+        draft.add_segment(segment)
+        restored.add_segment(segment)
+    assert restored.sections == draft.sections
+    assert restored.to_state() == draft.to_state()
+
+
+def test_a_reading_is_never_pieced_together_from_two_segments():
+    draft = IncrementalSoapDraft()
+    draft.add_segment("Weight 80.")
+    draft.add_segment("Weight 180 lb.")
+    assert (draft.vitals["weight"], draft.vitals["weight_unit"]) == (80.0, None)
+
+    draft = IncrementalSoapDraft()
+    draft.add_segment("Temperature 38.2 C.")
+    draft.add_segment("Blood pressure 150/90. Temperature 101 F.")
+    assert (draft.vitals["temperature"], draft.vitals["temperature_unit"]) == (38.2, "C")
+    assert (draft.vitals["bp_systolic"], draft.vitals["bp_diastolic"]) == (150, 90)
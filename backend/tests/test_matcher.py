@@ -0,0 +1,47 @@
+import random
+
+from nlp.matcher import KeywordMatcher, TermMatch
+
+
+def brute_force(terms, text):
+    lowered = text.lower()
+    matches = []
+    for term in {term.lower() for term in terms if term}:
+        start = lowered.find(term)
+        while start != -1:
+            matches.append(TermMatch(term, start, start + len(term)))
+            start = lowered.find(term, start + 1)
+    return sorted(matches, key=lambda match: (match.end, -len(match.term), match.term))
+
+
+def normalized(matches):
+    return sorted(matches, key=lambda match: (match.end, -len(match.term), match.term))
+
+
+def test_overlapping_and_nested_terms():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+    assert normalized(matcher.find_all("ushers")) == [
+        TermMatch("she", 1, 4), TermMatch("he", 2, 4), TermMatch("hers", 2, 6),
+    ]
+
+
+def test_matching_ignores_case():
+    matcher = KeywordMatcher(["Chest Pain"])
+    assert matcher.find_all("Reports CHEST PAIN today") == [TermMatch("chest pain", 8, 18)]
+
+
+def test_matches_brute_force_on_random_text():
+    rng = random.Random(0)
+    alphabet = "abc "
+    for _ in range(200):
+        terms = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice(alphabet + "AB") for _ in range(rng.randint(0, 60)))
+        assert normalized(KeywordMatcher(terms).find_all(text)) == brute_force(terms, text)
+
+
+def test_hits_index_by_term():
+    hits = KeywordMatcher(["bp", "pain"]).scan("pain, bp, more pain")
+    assert "pain" in hits and "fever" not in hits
+    assert hits.first("pain") == 0
+    assert hits.positions("pain") == [0, 15]
+    assert hits.first("fever") is None
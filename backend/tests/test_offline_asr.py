@@ -0,0 +1,80 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import asr.offline
+from asr.offline import SAMPLE_RATE, AsrSegment, AsrWorkerPool, LocalAsrEngine, split_on_silence, stitch
+
+
+class FakeModel:
+    """Stands in for WhisperModel: one segment per chunk, after a delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def transcribe(self, samples, **kwargs):
+        time.sleep(self.delay)
+        duration = len(samples) / SAMPLE_RATE
+        return [SimpleNamespace(text=" speech ", start=0.0, end=duration, avg_logprob=-0.1)], None
+
+
+def install_fake_model(delay: float) -> None:
+    asr.offline._model = FakeModel(delay)
+
+
+def recording(bursts: int, speech: float = 1.0, pause: float = 0.6) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    parts = []
+    for _ in range(bursts):
+        parts.append(rng.normal(0, 0.1, int(speech * SAMPLE_RATE)))
+        parts.append(np.zeros(int(pause * SAMPLE_RATE)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def test_split_cuts_at_pauses():
+    chunks = split_on_silence(recording(3), max_chunk_seconds=2)
+    assert len(chunks) == 3
+    for start, end in chunks:
+        # Each chunk is one burst plus a little padding
+        assert 0.9 < (end - start) / SAMPLE_RATE < 1.5
+
+
+def test_split_caps_chunk_length_without_pauses():
+    audio = np.random.default_rng(0).normal(0, 0.1, 10 * SAMPLE_RATE).astype(np.float32)
+    chunks = split_on_silence(audio, max_chunk_seconds=3)
+    assert all(end - start <= 3 * SAMPLE_RATE for start, end in chunks)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio)
+
+
+def test_split_drops_silence():
+    assert split_on_silence(np.zeros(5 * SAMPLE_RATE, dtype=np.float32)) == []
+    assert split_on_silence(np.zeros(0, dtype=np.float32)) == []
+
+
+def test_stitch_removes_overlap():
+    first = [AsrSegment("a", 0.0, 2.0, 0.9)]
+    second = [AsrSegment("b", 1.5, 3.0, 0.9)]
+    segments = stitch([first, second])
+    assert [(s.start_time, s.end_time) for s in segments] == [(0.0, 2.0), (2.0, 3.0)]
+
+
+def test_more_chunks_than_workers_all_decode():
+    # Six chunks queue behind one worker; together they take longer than
+    # the chunk timeout, but none of them does on its own
+    engine = LocalAsrEngine("fake-model", workers=1, cores=1, max_chunk_seconds=2, chunk_timeout=1)
+    engine._pool = AsrWorkerPool(1, 1, 1, initializer=install_fake_model, initargs=(0.4,))
+    audio = recording(6)
+    assert len(engine.chunks(audio)) == 6
+
+    async def main():
+        try:
+            return await engine.transcribe(audio)
+        finally:
+            engine.shutdown()
+
+    segments = asyncio.run(main())
+    assert [segment.text for segment in segments] == ["speech"] * 6
+    assert all(a.end_time <= b.start_time for a, b in zip(segments, segments[1:]))
+    assert engine.stats()["transcribed"] == 1
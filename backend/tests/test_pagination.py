@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+bson = pytest.importorskip("bson")
+
+from services.pagination import decode_cursor, encode_cursor, keyset_filter  # noqa: E402
+
+FIELDS = ["updated_at", "_id"]
+
+
+def test_cursor_round_trips():
+    document = {"updated_at": datetime(2024, 3, 1, 12, 30, 5, 250000), "_id": bson.ObjectId(), "title": "x"}
+    token = encode_cursor(document, FIELDS)
+    assert "=" not in token
+    assert decode_cursor(token, FIELDS) == {field: document[field] for field in FIELDS}
+
+
+def test_plain_values_round_trip():
+    token = encode_cursor({"email": "a@example.com", "_id": 7}, ["email", "_id"])
+    assert decode_cursor(token, ["email", "_id"]) == {"email": "a@example.com", "_id": 7}
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", "e30"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, FIELDS)
+
+
+def test_keyset_filter():
+    after = {"updated_at": 2, "_id": 5}
+    assert keyset_filter(after, FIELDS, descending=True) == {
+        "$or": [{"updated_at": {"$lt": 2}}, {"updated_at": 2, "_id": {"$lt": 5}}]
+    }
+    assert keyset_filter({"_id": 5}, ["_id"]) == {"_id": {"$gt": 5}}
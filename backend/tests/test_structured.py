@@ -0,0 +1,25 @@
+from nlp.lexicon import compile_lexicon
+from nlp.structured import extract_structured
+
+
+def test_repeated_blood_pressure_keeps_the_first():
+    vitals = extract_structured("BP 150/90 on arrival. Repeat BP 130/80.").vitals
+    assert (vitals.bp_systolic, vitals.bp_diastolic) == (150, 90)
+
+
+def test_implausible_temperature_is_skipped():
+    vitals = extract_structured("Temp 250 on the chart, rechecked Temp 38.2 C.").vitals
+    assert (vitals.temperature, vitals.temperature_unit) == (38.2, "C")
+
+
+def test_doses_need_a_lexicon_medication():
+    medications = extract_structured("Started lisinopril 10 mg daily. Drink water 500 ml.").medications
+    assert [(m.drug, m.dose, m.unit) for m in medications] == [("lisinopril", 10, "mg")]
+
+
+def test_configured_lexicon_is_used(tmp_path):
+    path = str(tmp_path / "lexicon.bin")
+    compile_lexicon([("zorbacillin", "medication", "zorbacillin")], path)
+    text = "Gave zorbacillin 250 mg by mouth."
+    assert extract_structured(text).medications == []
+    assert [m.drug for m in extract_structured(text, path).medications] == ["zorbacillin"]
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.workers import WorkerPool, WorkerTaskTimeout, core_share
+
+
+def sleep_for(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def crash() -> None:
+    os._exit(1)
+
+
+def run_all(pool: WorkerPool, *calls):
+    async def main():
+        try:
+            return await asyncio.gather(*(pool.run(*call) for call in calls), return_exceptions=True)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_core_share_is_at_least_one():
+    assert core_share(1) == (os.cpu_count() or 1)
+    assert core_share(10_000) == 1
+
+
+def test_threads_split_the_cores():
+    pool = WorkerPool(workers=2, cores=8)
+    assert pool.threads_per_worker == 4
+    assert WorkerPool(cores=3).workers == 3
+
+
+def test_queued_tasks_do_not_time_out():
+    # Only the first task can run at once; the others wait for the worker
+    pool = WorkerPool(workers=1, task_timeout=1)
+    results = run_all(pool, *[(sleep_for, 0.6)] * 4)
+    assert results == [0.6] * 4
+    assert pool.restarts == 0
+    assert pool.timed_out == 0
+
+
+def test_running_task_that_overruns_restarts_the_pool():
+    pool = WorkerPool(workers=1, task_timeout=0.5)
+    results = run_all(pool, (sleep_for, 3), (sleep_for, 0.1))
+    assert isinstance(results[0], WorkerTaskTimeout)
+    assert results[1] == 0.1
+    assert pool.restarts == 1
+
+
+def test_crashed_worker_is_replaced():
+    pool = WorkerPool(workers=1, task_timeout=5)
+    results = run_all(pool, (crash,), (sleep_for, 0.1))
+    assert results[1] == 0.1
+    assert pool.restarts >= 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_stats_count_every_task(workers):
+    pool = WorkerPool(workers=workers, task_timeout=5)
+    run_all(pool, *[(sleep_for, 0.05)] * 5)
+    stats = pool.stats()
+    assert stats["submitted"] == stats["completed"] == 5
+    assert stats["in_flight"] == 0
@@ -0,0 +1,50 @@
+"""
+Background job worker.
+
+Runs queued jobs (such as transcribing uploaded recordings) without
+serving the API. API processes run jobs too unless JOB_WORKER_CONCURRENCY
+is 0; start as many workers on as many nodes as needed, since a job is
+only ever claimed by one of them.
+
+Usage (from backend/):
+    python worker.py
+"""
+import asyncio
+import logging
+import signal
+
+from core.config import settings
+from core.workers import core_share
+from services.aws import aws_clients
+from services.database import close_mongo_connection, connect_to_mongo, ensure_indexes
+from services.jobs import job_runner
+from services.transcription import local_asr  # also registers the transcription job handler
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    await connect_to_mongo()
+    await ensure_indexes()
+    aws_clients.start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    if settings.ASR_ENGINE == "local":
+        # No NLP workers run here, so decoding gets every core
+        local_asr.start(cores=settings.ASR_CORES or core_share(1))
+    job_runner.start()
+    await stopping.wait()
+    logger.info("Stopping job worker...")
+    await job_runner.stop(grace_seconds=settings.JOB_LEASE_SECONDS)
+    local_asr.shutdown()
+    close_mongo_connection()
+    aws_clients.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())